@@ -0,0 +1,206 @@
+"""Row-level access scopes per role.
+
+Admins and principals see every row. Scoped roles see one slice:
+
+    Department Head       teachers of one Subject, the performance rows of
+                          those teachers and the students in those rows
+    Section Coordinator   teachers whose Sections_Taught is one section, the
+                          students of that section and their performance rows
+    Teacher               their own teacher row and performance rows
+
+A section has two meanings in the data. A coordinator's teachers are the ones
+assigned to teach it (teachers.Sections_Taught); the students are the ones
+enrolled in it (students.Section), with their performance rows whoever taught
+them. The analytics group 'section' is the enrolled one. ROLE_SCOPES carries
+a description of each slice, and the dashboard shows both next to the counts.
+
+AccessIndex partitions the tables once per data version: teacher and
+student row positions per group value, and performance row numbers per
+teacher, subject and section in CSR form (rows sorted by group code plus an
+offsets array), like the student index. The performance partitions are
+plain arrays (arrays()) that a published version can hand to every process
+instead of each one building them. Resolving a scope at login is a
+handful of slices; the resulting RowScope holds the allowed row index
+arrays, the sliced tables and a columnar view of its performance rows, and
+is cached so every rerun of every session with that scope reuses it.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analytics import GROUPS
+from data_loader import data_path
+from validation import validate_table
+
+FULL_ACCESS_ROLES = ['Admin', 'Principal']
+
+# Role -> teacher column that defines its slice, the matching group name
+# used by the aggregator, score sketches and leaderboards, and what each
+# part of the slice holds
+ROLE_SCOPES = {
+    'Department Head': {'column': 'Subject', 'group': 'subject', 'label': 'Subject',
+                        'teachers': 'teachers of the subject',
+                        'students': 'students they assessed',
+                        'records': 'performance records of those teachers'},
+    'Section Coordinator': {'column': 'Sections_Taught', 'group': 'section', 'label': 'Section',
+                            'teachers': 'teachers assigned to the section (Sections_Taught)',
+                            'students': 'students enrolled in it (Section)',
+                            'records': 'performance records of those students'},
+    'Teacher': {'column': 'Teacher_ID', 'group': 'teacher', 'label': 'Teacher',
+                'teachers': 'teacher', 'students': 'students assessed',
+                'records': 'own performance records'},
+}
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def load_staff_credentials():
+    """Validated staff_credentials.csv (username, password, Role, Scope)"""
+    clean, _, _ = validate_table('staff', pd.read_csv(data_path('staff')), {})
+    return clean
+
+
+def _partition(codes, n):
+    # CSR partition: rows of code c are order[offsets[c]:offsets[c + 1]], ascending
+    order = np.argsort(codes, kind='stable')
+    order = order[np.count_nonzero(codes < 0):]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes[codes >= 0], minlength=n), out=offsets[1:])
+    return order, offsets
+
+
+def _lookup(mapping, categories):
+    # Code of mapping[category] for every category (-1 when unmapped) plus the sorted values
+    mapped = pd.Series(np.asarray(categories, dtype=object)).map(mapping)
+    codes, values = pd.factorize(mapped, sort=True)
+    return codes, np.asarray(values, dtype=str)
+
+
+class RowScope:
+    """Allowed rows of one role and scope value, with the sliced tables (row arrays are None for full access)"""
+
+    def __init__(self, role, value, group, teacher_rows, student_rows, perf_rows, teachers, students, columns):
+        self.role = role
+        self.value = value
+        self.group = group
+        self.teacher_rows = teacher_rows
+        self.student_rows = student_rows
+        self.perf_rows = perf_rows
+        self.teachers = teachers
+        self.students = students
+        self.columns = columns
+
+    @property
+    def full(self):
+        return self.group == 'all'
+
+    @property
+    def label(self):
+        return 'All rows' if self.full else f"{ROLE_SCOPES[self.role]['label']} {self.value}"
+
+    def describe(self):
+        """Row counts of the slice, each labelled with what it holds"""
+        spec = ROLE_SCOPES[self.role]
+        return (f"{len(self.teachers)} {spec['teachers']}, {len(self.students)} {spec['students']}, "
+                f"{len(self.columns)} {spec['records']}")
+
+    def summary(self, aggregator, metric, stats, last=None):
+        """PerformanceAggregator.summary restricted to this scope's group value"""
+        if self.full:
+            return aggregator.summary(metric, 'day', stats, last=last)
+        result = aggregator.summary(metric, 'day', stats, group=self.group, last=last)
+        group_col = GROUPS[self.group]
+        return result[result[group_col] == self.value].drop(columns=group_col).reset_index(drop=True)
+
+
+class AccessIndex:
+    """Group partitions of the teacher, student and performance rows, and cached scopes"""
+
+    PERF_GROUPS = ['teacher', 'subject', 'section']
+
+    def __init__(self, teachers_df, students_df, columns, arrays=None):
+        self.teachers_df = teachers_df
+        self.students_df = students_df
+        self.columns = columns
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+        # Teacher and student row positions per group value
+        self.teacher_groups = {spec['group']: teachers_df.groupby(spec['column'], sort=False).indices
+                               for spec in ROLE_SCOPES.values()}
+        self.student_sections = students_df.groupby('Section', sort=False).indices
+
+        if arrays is not None:
+            self.perf_values = {group: arrays[f'{group}_values'] for group in self.PERF_GROUPS}
+            self.perf_partitions = {group: (arrays[f'{group}_order'], arrays[f'{group}_offsets'])
+                                    for group in self.PERF_GROUPS}
+            self.student_position = arrays['student_position']
+            return
+
+        # Performance rows per teacher, subject and section
+        teacher_codes = np.asarray(columns['Teacher_ID'])
+        student_codes = np.asarray(columns['Student_ID'])
+        teacher_ids = np.asarray(columns.categories('Teacher_ID'), dtype=str)
+        subject_of, subjects = _lookup(teachers_df.set_index('Teacher_ID')['Subject'], teacher_ids)
+        section_of, sections = _lookup(students_df.set_index('Student_ID')['Section'],
+                                       columns.categories('Student_ID'))
+        self.perf_values = {'teacher': teacher_ids, 'subject': subjects, 'section': sections}
+        self.perf_partitions = {
+            'teacher': _partition(teacher_codes, len(teacher_ids)),
+            'subject': _partition(np.where(teacher_codes >= 0, subject_of[teacher_codes], -1), len(subjects)),
+            'section': _partition(np.where(student_codes >= 0, section_of[student_codes], -1), len(sections)),
+        }
+
+        # Student_ID code -> row position in students_df
+        self.student_position = pd.Index(students_df['Student_ID']).get_indexer(columns.categories('Student_ID'))
+
+    def arrays(self):
+        """The performance partitions by name, to share with other processes"""
+        arrays = {'student_position': self.student_position}
+        for group in self.PERF_GROUPS:
+            arrays[f'{group}_values'] = self.perf_values[group]
+            arrays[f'{group}_order'], arrays[f'{group}_offsets'] = self.perf_partitions[group]
+        return arrays
+
+    def scope(self, role, value=None):
+        """Cached RowScope of a role; admins and principals get every row"""
+        key = (role, None) if role in FULL_ACCESS_ROLES else (role, value)
+        with self._lock:
+            cached = self._scopes.get(key)
+        if cached is not None:
+            return cached
+        scope = self._full_scope(role) if role in FULL_ACCESS_ROLES else self._resolve(role, value)
+        with self._lock:
+            return self._scopes.setdefault(key, scope)
+
+    def _full_scope(self, role):
+        return RowScope(role, None, 'all', None, None, None, self.teachers_df, self.students_df, self.columns)
+
+    def perf_rows(self, group, value):
+        """Performance row numbers of one group value, ascending"""
+        values = self.perf_values[group]
+        order, offsets = self.perf_partitions[group]
+        code = np.searchsorted(values, value)
+        if code >= len(values) or values[code] != value:
+            return _EMPTY
+        return order[offsets[code]:offsets[code + 1]]
+
+    def _resolve(self, role, value):
+        if role not in ROLE_SCOPES:
+            raise ValueError(f"Unknown role '{role}', expected one of {FULL_ACCESS_ROLES + list(ROLE_SCOPES)}")
+        group = ROLE_SCOPES[role]['group']
+        teacher_rows = np.sort(self.teacher_groups[group].get(value, _EMPTY))
+        perf_rows = self.perf_rows(group, value)
+        if group == 'section':
+            student_rows = np.sort(self.student_sections.get(value, _EMPTY))
+        else:
+            codes = np.unique(self.columns['Student_ID'][perf_rows])
+            positions = self.student_position[codes[codes >= 0]]
+            student_rows = np.sort(positions[positions >= 0])
+        return RowScope(
+            role, value, group, teacher_rows, student_rows, perf_rows,
+            self.teachers_df.iloc[teacher_rows].reset_index(drop=True),
+            self.students_df.iloc[student_rows].reset_index(drop=True),
+            self.columns.take(perf_rows),
+        )
@@ -0,0 +1,155 @@
+"""Time-series aggregation engine over performance.csv.
+
+All dashboard trends read from one PerformanceAggregator built per data
+version. Rows are sorted once on a DatetimeIndex; every query is a
+vectorized resample/rolling call and its result is cached per
+(kind, metric, grain, window, group, stat) key.
+"""
+import threading
+
+import pandas as pd
+
+from data_loader import normalize_ids
+
+METRICS = {
+    'score': 'Score',
+    'attendance_rate': 'Present',
+    'late': 'Late_Count',
+}
+
+GRAINS = {
+    'day': 'D',
+    'week': 'W',
+    'month': 'MS',
+}
+
+# Calendar days covered by one period, used for time-based rolling windows
+GRAIN_DAYS = {'day': 1, 'week': 7, 'month': 30}
+
+GROUPS = {
+    'teacher': 'Teacher_ID',
+    'student': 'Student_ID',
+    'section': 'Section',
+    'subject': 'Subject',
+}
+
+
+class PerformanceAggregator:
+    """Rolling and per-period aggregates of score, attendance rate and late counts"""
+
+    def __init__(self, performance_df, teachers_df=None, students_df=None):
+        frame = performance_df[['Student_ID', 'Teacher_ID', 'Score', 'Late_Count']].copy()
+        frame['Present'] = (performance_df['Attendance'] == 'Present').astype(float)
+        frame['Date'] = pd.to_datetime(performance_df['Date'], errors='coerce')
+
+        if students_df is not None:
+            frame['Student_ID'] = normalize_ids(frame['Student_ID'], students_df['Student_ID'])
+            sections = students_df.set_index('Student_ID')['Section']
+            frame['Section'] = frame['Student_ID'].map(sections)
+        if teachers_df is not None:
+            subjects = teachers_df.set_index('Teacher_ID')['Subject']
+            frame['Subject'] = frame['Teacher_ID'].map(subjects)
+
+        self.frame = frame.dropna(subset=['Date']).sort_values('Date', kind='stable').set_index('Date')
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Aggregator over a frame already prepared by __init__ (e.g. attached from shared memory)"""
+        aggregator = cls.__new__(cls)
+        aggregator.frame = frame
+        aggregator._cache = {}
+        aggregator._lock = threading.Lock()
+        return aggregator
+
+    # ==================== VALIDATION ====================
+
+    def _column(self, metric):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {list(METRICS)}")
+        return METRICS[metric]
+
+    def _group_column(self, group):
+        if group is None:
+            return None
+        if group not in GROUPS or GROUPS[group] not in self.frame.columns:
+            raise ValueError(f"Unknown or unavailable group '{group}'")
+        return GROUPS[group]
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        result = compute()
+        with self._lock:
+            self._cache[key] = result
+        return result
+
+    # ==================== QUERIES ====================
+
+    def summary(self, metric, grain='day', stats=('mean',), group=None, last=None):
+        """Per-period statistics of a metric, optionally per group.
+
+        Returns a long DataFrame with a Date column, the group column (if any)
+        and one column per stat. Periods without rows are dropped. ``last``
+        keeps only the trailing N calendar periods before the latest date.
+        """
+        column, group_col = self._column(metric), self._group_column(group)
+        stats = tuple(stats)
+        key = ('summary', metric, grain, stats, group)
+
+        def compute():
+            source = self.frame if group_col is None else self.frame.groupby(group_col)
+            result = source[column].resample(GRAINS[grain]).agg(list(stats) + ['count'])
+            result = result[result['count'] > 0].drop(columns='count')
+            return result.reset_index()
+
+        result = self._cached(key, compute)
+        if last is not None and len(result) > 0:
+            cutoff = pd.Period(result['Date'].max(), GRAINS[grain] if grain != 'month' else 'M') - (last - 1)
+            result = result[result['Date'] >= cutoff.start_time]
+        return result
+
+    def rolling(self, metric, grain='day', window=7, group=None, stat='mean'):
+        """Rolling statistic of a metric sampled once per period.
+
+        ``window`` counts periods of ``grain``. ``stat`` is 'mean' (weighted by
+        row count) or a percentile such as 'p50' or 'p90'. Returns a long
+        DataFrame with Date, the group column (if any) and ``value``.
+        """
+        column, group_col = self._column(metric), self._group_column(group)
+        key = ('rolling', metric, grain, window, group, stat)
+
+        def compute():
+            if stat == 'mean':
+                return self._rolling_mean(column, grain, window, group_col)
+            if stat.startswith('p') and stat[1:].isdigit():
+                return self._rolling_percentile(column, grain, window, group_col, int(stat[1:]) / 100)
+            raise ValueError(f"Unknown stat '{stat}', expected 'mean' or 'p<0-100>'")
+
+        return self._cached(key, compute)
+
+    def _rolling_mean(self, column, grain, window, group_col):
+        source = self.frame if group_col is None else self.frame.groupby(group_col)
+        periods = source[column].resample(GRAINS[grain]).agg(['sum', 'count'])
+        if group_col is None:
+            sums = periods.rolling(window, min_periods=1).sum()
+        else:
+            sums = periods.groupby(level=group_col).rolling(window, min_periods=1).sum().droplevel(0)
+        value = (sums['sum'] / sums['count']).where(sums['count'] > 0)
+        return value.rename('value').dropna().reset_index()
+
+    def _rolling_percentile(self, column, grain, window, group_col, q):
+        span = f"{window * GRAIN_DAYS[grain]}D"
+        if group_col is None:
+            rolled = self.frame[column].rolling(span).quantile(q)
+            value = rolled.resample(GRAINS[grain]).last()
+        else:
+            rolled = self.frame.groupby(group_col)[column].rolling(span).quantile(q)
+            value = rolled.groupby(level=group_col).resample(GRAINS[grain], level='Date').last()
+        return value.rename('value').dropna().reset_index()
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,372 @@
+"""Streaming anomaly detection on late arrivals and absences.
+
+Every teacher and every section has an EWMA control chart per signal (late
+count and absence). One performance row updates the charts of its teacher
+and its student's section in O(1):
+
+    chart     fast EWMA of the signal (alpha 0.3), the monitored statistic
+    baseline  slow EWMA of the signal and of its square (alpha 0.05), giving
+              the entity's usual level and spread
+
+z = (chart - baseline mean) / (baseline std * sqrt(a / (2 - a))) is the
+chart's distance from its usual level in units of the chart's own standard
+deviation. An alert is recorded when z rises above the threshold after the
+warm-up, once per excursion. The state is five floats per entity and signal
+whatever the history length, and only the most recent alerts are kept.
+
+History is replayed once at startup with vectorized grouped EWMAs that give
+the same values as the row-by-row update. After that, follow() reads only
+the bytes appended to performance.csv since its last call. A file that was
+replaced (new inode), truncated, or rewritten in place (the bytes just
+before the read position changed) counts as already seen, and following
+resumes from its end.
+
+start() runs follow() on a background ticker, and readers get the charts
+and alerts published after the last ingest without waiting for one in
+progress. The ticker can also write them to a file, which AnomalyFeed
+serves to other processes (serve.py workers) with the same reads, so one
+monitor follows the CSV per host.
+"""
+import io
+import math
+import os
+import pickle
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from data_loader import data_path
+from validation import validate_table
+
+ENTITIES = {
+    'teacher': 'Teacher_ID',
+    'section': 'Section',
+}
+
+# Bytes before the read position compared on every follow() to notice a rewrite
+MARK_BYTES = 256
+
+# Seconds between two reads of performance.csv
+FOLLOW_INTERVAL = 5.0
+
+ALERT_COLUMNS = ['Date', 'Entity', 'ID', 'Signal', 'Value', 'Baseline', 'Z']
+
+SIGNALS = {
+    'late': {'column': 'Late_Count', 'min_std': 0.5, 'label': 'Late Arrivals'},
+    'absent': {'column': 'Absent', 'min_std': 0.1, 'label': 'Absences'},
+}
+
+
+class EWMADetector:
+    """EWMA control chart per entity with constant state and O(1) updates"""
+
+    def __init__(self, baseline_alpha=0.05, chart_alpha=0.3, threshold=3.0, warmup=10, min_std=0.5):
+        self.baseline_alpha = baseline_alpha
+        self.chart_alpha = chart_alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self._chart_scale = math.sqrt(chart_alpha / (2 - chart_alpha))
+        self.state = {}    # entity -> [rows, mean, mean_sq, chart, z]
+
+    def update(self, entity, x):
+        """Fold one value in, returning (z, previous z, baseline mean); z is nan during warm-up"""
+        state = self.state.get(entity)
+        if state is None:
+            self.state[entity] = [1, x, x * x, x, math.nan]
+            return math.nan, math.nan, x
+        rows, mean, mean_sq, chart, previous = state
+        chart += self.chart_alpha * (x - chart)
+        std = max(math.sqrt(max(mean_sq - mean * mean, 0.0)), self.min_std)
+        z = (chart - mean) / (std * self._chart_scale) if rows >= self.warmup else math.nan
+        baseline = mean
+        mean += self.baseline_alpha * (x - mean)
+        mean_sq += self.baseline_alpha * (x * x - mean_sq)
+        state[:] = [rows + 1, mean, mean_sq, chart, z]
+        return z, previous, baseline
+
+    def replay(self, entities, values):
+        """Vectorized update() over rows in time order, starting from empty state.
+
+        Returns (z, previous z, baseline mean, chart) arrays aligned with the rows.
+        """
+        if self.state:
+            raise ValueError("replay() needs an empty detector; use update() for new rows")
+        frame = pd.DataFrame({'entity': np.asarray(entities), 'x': np.asarray(values, dtype=np.float64)})
+        frame['x_sq'] = frame['x'] ** 2
+        groups = frame.groupby('entity', sort=False)
+
+        def ewm(column, alpha):
+            smoothed = groups[column].ewm(alpha=alpha, adjust=False).mean()
+            return smoothed.droplevel(0).reindex(frame.index)
+
+        mean = ewm('x', self.baseline_alpha)
+        mean_sq = ewm('x_sq', self.baseline_alpha)
+        chart = ewm('x', self.chart_alpha)
+        frame['mean'], frame['mean_sq'] = mean, mean_sq
+        shifted = frame.groupby('entity', sort=False)[['mean', 'mean_sq']].shift(1)
+        rows = groups.cumcount()
+
+        std = np.sqrt((shifted['mean_sq'] - shifted['mean'] ** 2).clip(lower=0)).clip(lower=self.min_std)
+        z = ((chart - shifted['mean']) / (std * self._chart_scale)).where(rows >= self.warmup)
+        previous = z.groupby(frame['entity'], sort=False).shift(1)
+
+        last = frame.assign(chart=chart, z=z).groupby('entity', sort=False).tail(1)
+        sizes = groups.size()
+        for row in last.itertuples(index=False):
+            self.state[row.entity] = [int(sizes[row.entity]), row.mean, row.mean_sq, row.chart, row.z]
+        baseline = shifted['mean'].fillna(frame['x'])
+        return z.to_numpy(), previous.to_numpy(), baseline.to_numpy(), chart.to_numpy()
+
+    def current(self):
+        """Latest state per entity as a DataFrame, highest z first"""
+        if not self.state:
+            return pd.DataFrame(columns=['ID', 'Rows', 'Baseline', 'Current', 'Z'])
+        frame = pd.DataFrame([(entity, rows, mean, chart, z) for entity, (rows, mean, _, chart, z) in self.state.items()],
+                             columns=['ID', 'Rows', 'Baseline', 'Current', 'Z'])
+        return frame.sort_values('Z', ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+
+
+class AnomalyMonitor:
+    """Detectors per entity kind and signal over the performance row stream, plus recent alerts"""
+
+    def __init__(self, teachers_df, students_df, csv_path=None, history=1000, **detector_args):
+        self.csv_path = csv_path or data_path('performance')
+        self.reference = {'teachers': teachers_df, 'students': students_df}
+        self.sections = students_df.set_index('Student_ID')['Section']
+        self.detectors = {(kind, signal): EWMADetector(min_std=spec['min_std'], **detector_args)
+                          for kind in ENTITIES for signal, spec in SIGNALS.items()}
+        self.alerts = deque(maxlen=history)
+        self.rows = 0
+        self._offset = 0
+        self._inode = None        # (st_dev, st_ino) of the followed file
+        self._mark = b''          # bytes just before _offset, to notice an in-place rewrite
+        self._header = None
+        self._last_follow = 0.0
+        # Reentrant: follow() holds it from the offset check through ingest()
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._published = self._snapshot(0)
+
+    @property
+    def threshold(self):
+        return next(iter(self.detectors.values())).threshold
+
+    def _prepare(self, rows):
+        frame = pd.DataFrame({
+            'Date': pd.to_datetime(rows['Date'], errors='coerce'),
+            'Teacher_ID': rows['Teacher_ID'].to_numpy(),
+            'Section': rows['Student_ID'].map(self.sections).fillna('N/A').to_numpy(),
+            'Late_Count': pd.to_numeric(rows['Late_Count'], errors='coerce').fillna(0).to_numpy(dtype=np.float64),
+            'Absent': (rows['Attendance'] == 'Absent').to_numpy(dtype=np.float64),
+        })
+        return frame.dropna(subset=['Date']).sort_values('Date', kind='stable').reset_index(drop=True)
+
+    def _alert(self, date, kind, entity, signal, value, baseline, z):
+        self.alerts.append({'Date': date, 'Entity': kind, 'ID': entity, 'Signal': SIGNALS[signal]['label'],
+                            'Value': value, 'Baseline': baseline, 'Z': z})
+
+    def _snapshot(self, rows):
+        return {
+            'current': {key: detector.current() for key, detector in self.detectors.items()},
+            'alerts': pd.DataFrame(list(self.alerts), columns=ALERT_COLUMNS),
+            'rows': rows,
+            'threshold': self.threshold,
+        }
+
+    # ==================== INGEST ====================
+
+    def bootstrap(self, performance_df):
+        """Replay the validated history once (vectorized) and follow the CSV from its current end"""
+        frame = self._prepare(performance_df)
+        with self._lock:
+            found = []
+            for (kind, signal), detector in self.detectors.items():
+                z, previous, baseline, chart = detector.replay(frame[ENTITIES[kind]], frame[SIGNALS[signal]['column']])
+                onset = np.flatnonzero((z >= detector.threshold) & ~(previous >= detector.threshold))
+                for i in onset[-self.alerts.maxlen:]:
+                    found.append((frame['Date'].iat[i], kind, frame[ENTITIES[kind]].iat[i], signal,
+                                  chart[i], baseline[i], z[i]))
+            for alert in sorted(found, key=lambda a: a[0])[-self.alerts.maxlen:]:
+                self._alert(*alert)
+            self.rows = len(frame)
+            if os.path.exists(self.csv_path):
+                self._skip_to_end(os.stat(self.csv_path))
+            self._published = self._snapshot(self.rows)
+        return self
+
+    def ingest(self, rows):
+        """Update every detector with each new validated row, in date order; O(1) per row"""
+        frame = self._prepare(rows)
+        with self._lock:
+            for row in frame.itertuples(index=False):
+                for (kind, signal), detector in self.detectors.items():
+                    entity = getattr(row, ENTITIES[kind])
+                    x = getattr(row, SIGNALS[signal]['column'])
+                    z, previous, baseline = detector.update(entity, x)
+                    if z >= detector.threshold and not previous >= detector.threshold:
+                        self._alert(row.Date, kind, entity, signal, detector.state[entity][3], baseline, z)
+            if len(frame):
+                self._published = self._snapshot(self.rows + len(frame))
+            self.rows += len(frame)
+        return len(frame)
+
+    def start(self, interval=FOLLOW_INTERVAL, publish_to=None):
+        """Follow performance.csv from a background thread every `interval` seconds.
+
+        With publish_to, the charts and alerts are also written to that file
+        now and after every ingest, for AnomalyFeed readers.
+        """
+        if publish_to:
+            self.write(publish_to)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._tick, args=(interval, publish_to),
+                                                name='anomaly-follower', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop following, after a tick in progress has finished"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _tick(self, interval, publish_to):
+        while not self._stopped.wait(interval):
+            try:
+                if self.follow(min_interval=0) and publish_to:
+                    self.write(publish_to)
+            except (OSError, ValueError):
+                # The file is being replaced or a chunk did not parse; try again on the next tick
+                continue
+
+    def _skip_to_end(self, stat):
+        self._inode = (stat.st_dev, stat.st_ino)
+        self._offset = stat.st_size
+        self._header = None
+        start = max(0, self._offset - MARK_BYTES)
+        with open(self.csv_path, 'rb') as f:
+            f.seek(start)
+            self._mark = f.read(self._offset - start)
+
+    def _rewritten(self, stat):
+        if self._inode is None:
+            # Created after bootstrap: every row is new
+            self._inode = (stat.st_dev, stat.st_ino)
+            return False
+        if (stat.st_dev, stat.st_ino) != self._inode or stat.st_size < self._offset:
+            return True
+        with open(self.csv_path, 'rb') as f:
+            f.seek(self._offset - len(self._mark))
+            return f.read(len(self._mark)) != self._mark
+
+    def follow(self, min_interval=FOLLOW_INTERVAL):
+        """Ingest the rows appended to performance.csv since the last call, returning how many"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_follow < min_interval or not os.path.exists(self.csv_path):
+                return 0
+            self._last_follow = now
+            stat = os.stat(self.csv_path)
+            if self._rewritten(stat):
+                # Replaced or rewritten (e.g. compacted): its rows were already seen, only later appends are new
+                self._skip_to_end(stat)
+                return 0
+            if stat.st_size == self._offset:
+                return 0
+            with open(self.csv_path, 'rb') as f:
+                if self._header is None:
+                    self._header = f.readline()
+                f.seek(self._offset)
+                chunk = f.read(stat.st_size - self._offset)
+            complete = chunk[:chunk.rfind(b'\n') + 1]   # a row still being written waits for the next call
+            if not complete:
+                return 0
+            self._offset += len(complete)
+            self._mark = (self._mark + complete)[-MARK_BYTES:]
+            rows = pd.read_csv(io.BytesIO(self._header + complete))
+            clean, _, _ = validate_table('performance', rows, self.reference)
+            return self.ingest(clean)
+
+    # ==================== READS ====================
+
+    def current(self, kind, signal, ids=None):
+        """Latest chart value and z per entity, highest z first, optionally limited to some IDs"""
+        return _current(self._published, kind, signal, ids)
+
+    def recent(self, teacher_ids=None, sections=None):
+        """Recorded alerts, newest first, optionally limited to some teachers and sections"""
+        return _recent(self._published, teacher_ids, sections)
+
+    def write(self, path):
+        """Write the published charts and alerts to a file, replacing it atomically"""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(self._published, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+def _current(published, kind, signal, ids):
+    current = published['current'][(kind, signal)]
+    if ids is not None:
+        return current[current['ID'].isin(ids)].reset_index(drop=True)
+    return current.copy()
+
+
+def _recent(published, teacher_ids, sections):
+    alerts = published['alerts']
+    keep = pd.Series(True, index=alerts.index)
+    if teacher_ids is not None:
+        keep &= (alerts['Entity'] != 'teacher') | alerts['ID'].isin(teacher_ids)
+    if sections is not None:
+        keep &= (alerts['Entity'] != 'section') | alerts['ID'].isin(sections)
+    return alerts[keep].iloc[::-1].reset_index(drop=True)
+
+
+class AnomalyFeed:
+    """AnomalyMonitor reads over the file a monitor in another process writes (see start(publish_to=...))"""
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        detector = EWMADetector()
+        self._published = {
+            'current': {(kind, signal): detector.current() for kind in ENTITIES for signal in SIGNALS},
+            'alerts': pd.DataFrame(columns=ALERT_COLUMNS),
+            'rows': 0,
+            'threshold': detector.threshold,
+        }
+
+    def _latest(self):
+        # Reloaded only when the writer has replaced the file
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+            if stamp != self._stamp:
+                with open(self.path, 'rb') as f:
+                    self._published = pickle.load(f)
+                self._stamp = stamp
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        return self._published
+
+    @property
+    def rows(self):
+        return self._latest()['rows']
+
+    @property
+    def threshold(self):
+        return self._latest()['threshold']
+
+    def current(self, kind, signal, ids=None):
+        """Latest chart value and z per entity, highest z first, optionally limited to some IDs"""
+        return _current(self._latest(), kind, signal, ids)
+
+    def recent(self, teacher_ids=None, sections=None):
+        """Recorded alerts, newest first, optionally limited to some teachers and sections"""
+        return _recent(self._latest(), teacher_ids, sections)
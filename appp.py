@@ -1,4 +1,5 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -6,6 +7,26 @@ from datetime import datetime
 from PIL import Image
 import os
 import base64
+import hashlib
+
+import charts
+from access import FULL_ACCESS_ROLES, AccessIndex, load_staff_credentials
+from audit import AUDIT_EVENTS, AuditLog
+from analytics import PerformanceAggregator
+from anomalies import SIGNALS, AnomalyFeed, AnomalyMonitor
+from archive import PerformanceArchive, daily_summary, yoy_trend
+from columnar_cache import open_performance_cache
+from data_loader import data_fingerprint, data_version
+from jobs import JobScheduler
+from leaderboards import LEADERBOARD_GROUPS, LEADERBOARD_METRICS, LeaderboardIndex
+from session_manager import SessionResourceManager
+from shared_data import (SHARED_ENV, anomalies_path, attach_access_index, attach_aggregator, attach_columns,
+                         attach_leaderboards, attach_sketches, attach_student_index, attach_tables, latest,
+                         published_version, release_others)
+from sketches import SKETCH_GROUPS, ScoreSketchIndex
+from student_index import StudentIndex
+import templates
+from validation import QUARANTINE_DIR, load_clean_tables
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -16,80 +37,249 @@ st.set_page_config(
 )
 
 # ==================== LOAD CUSTOM CSS ====================
+STYLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'styles.css')
+
+@st.cache_resource
 def load_css():
-    """Load external CSS file"""
+    """Load external CSS file once, with a content hash for cache busting"""
     try:
-        with open('styles.css', 'r') as f:
-            return f.read()
+        with open(STYLES_PATH, 'r') as f:
+            css = f.read()
     except FileNotFoundError:
-        st.error("❌ styles.css file not found!")
-        return ""
+        return "", None
+    return css, hashlib.sha1(css.encode()).hexdigest()[:12]
 
-custom_css = load_css()
-st.markdown(f"<style>{custom_css}</style>", unsafe_allow_html=True)
+custom_css, css_version = load_css()
+if css_version is None:
+    st.error("❌ static/styles.css file not found!")
+elif st.get_option('server.enableStaticServing'):
+    # Served once from ./static and cached by the browser; only this tag is resent per rerun
+    st.markdown(f'<link rel="stylesheet" href="./app/static/styles.css?v={css_version}">', unsafe_allow_html=True)
+else:
+    st.markdown(f"<style>{custom_css}</style>", unsafe_allow_html=True)
 
 # ==================== DATA LOADING ====================
 
-@st.cache_data
-def load_data():
-    """Load all required data files"""
+# Multi-worker mode (serve.py): data, indexes, job results and anomalies are published once per host
+WORKER_MODE = bool(os.environ.get(SHARED_ENV))
+
+def current_data_key():
+    """What the loaded data is keyed on: the latest published version in worker mode, the files' stats otherwise"""
+    if WORKER_MODE:
+        return latest(os.environ[SHARED_ENV])
+    try:
+        return data_fingerprint()
+    except FileNotFoundError:
+        return None
+
+# Every loader below is keyed on it, so changed files reload all of them together
+data_key = current_data_key()
+
+@st.cache_resource(max_entries=1)
+def load_data(data_key):
+    """Load all required data files once per data version, validated and shared read-only by all sessions"""
     try:
-        teachers_df = pd.read_csv('teachers.csv')
-        students_df = pd.read_csv('students.csv')
-        performance_df = pd.read_csv('performance.csv')
-        teacher_credentials = pd.read_csv('teacher_login_credentials.csv')
-        return teachers_df, students_df, performance_df, teacher_credentials
+        if WORKER_MODE:
+            # Tables were validated once by serve.py and are memory-mapped here
+            tables, report = attach_tables(data_key)
+            version = published_version(data_key)
+            release_others(data_key)
+        else:
+            version = data_version()
+            tables, report = load_clean_tables()
+            if data_fingerprint() != data_key:
+                version = None  # files changed while being read; the next rerun loads them again
+        return (*tables, report, version)
     except FileNotFoundError as e:
         st.error(f"❌ Error loading data files: {e}")
-        return None, None, None, None
+        return None, None, None, None, None, None
+
+teachers_df, students_df, performance_df, teacher_credentials, validation_report, data_version_loaded = load_data(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_aggregator(data_key):
+    """Shared time-series aggregation engine for all sessions"""
+    if WORKER_MODE:
+        return attach_aggregator(data_key)
+    return PerformanceAggregator(performance_df, teachers_df, students_df)
+
+aggregator = get_aggregator(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_archive(data_key):
+    """Cold tier of older terms: daily summaries in memory, Parquet partitions read on demand"""
+    return PerformanceArchive()
+
+archive = get_archive(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_hot_summary(data_key):
+    """Daily summary of the hot tier in the archive's layout, for trends spanning both tiers"""
+    return daily_summary(aggregator.frame)
+
+hot_summary = get_hot_summary(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_score_sketches(data_key):
+    """Score sketches per teacher/section/subject and day, built once at ingestion"""
+    if WORKER_MODE:
+        return attach_sketches(data_key)
+    return ScoreSketchIndex(SKETCH_GROUPS).ingest(aggregator.frame.reset_index())
+
+score_sketches = get_score_sketches(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_performance_columns(data_key):
+    """Memory-mapped columnar view of performance.csv shared by all sessions"""
+    if WORKER_MODE:
+        return attach_columns(data_key)
+    return open_performance_cache(frame=performance_df)
+
+perf_columns = get_performance_columns(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_leaderboards(published_dir):
+    """Top-k teacher leaderboards per metric and subject/qualification/section/status"""
+    if published_dir:
+        return attach_leaderboards(published_dir, teachers_df)
+    return LeaderboardIndex(teachers_df)
+
+# Worker mode starts each version from its published ranking
+leaderboards = get_leaderboards(data_key if WORKER_MODE else None)
+# A reloaded teachers table reaches the leaderboards incrementally, without a rebuild
+leaderboards.refresh(teachers_df)
+
+@st.cache_resource(max_entries=1)
+def get_student_index(data_key):
+    """Student search keys and CSR offsets of performance rows per Student_ID"""
+    if WORKER_MODE:
+        return attach_student_index(data_key, students_df, perf_columns)
+    return StudentIndex(students_df, perf_columns)
+
+student_index = get_student_index(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_staff_credentials(data_key):
+    """Department head and section coordinator logins with their Subject or section"""
+    return load_staff_credentials()
+
+staff_credentials = get_staff_credentials(data_key)
+
+@st.cache_resource(max_entries=1)
+def get_access_index(data_key):
+    """Row partitions per subject, section and teacher, and the resolved scope of each login"""
+    if WORKER_MODE:
+        return attach_access_index(data_key, teachers_df, students_df, perf_columns)
+    return AccessIndex(teachers_df, students_df, perf_columns)
+
+access_index = get_access_index(data_key)
+
+@st.cache_resource
+def get_anomaly_monitor():
+    """Streaming late/absence detectors per teacher and section, history replayed once, following the CSV in the background"""
+    if WORKER_MODE:
+        # serve.py runs the one monitor of the host; workers read what it writes
+        return AnomalyFeed(anomalies_path(data_key))
+    return AnomalyMonitor(teachers_df, students_df).bootstrap(performance_df).start()
+
+anomaly_monitor = get_anomaly_monitor()
+
+@st.cache_resource(max_entries=1)
+def get_job_data(data_key):
+    """What background jobs compute from: the loaded tables and engines, never a second copy"""
+    return {
+        'version': data_version_loaded,
+        'tables': (teachers_df, students_df, performance_df, teacher_credentials),
+        'teachers': teachers_df,
+        'aggregator': aggregator,
+        'columns': perf_columns,
+    }
 
-teachers_df, students_df, performance_df, teacher_credentials = load_data()
+@st.cache_resource
+def get_scheduler():
+    """Background precompute jobs (trends, risk drivers, snapshot report) shared by all sessions"""
+    if WORKER_MODE:
+        # serve.py runs the jobs once per host; workers only read the results
+        return JobScheduler()
+    return JobScheduler().start()
+
+scheduler = get_scheduler()
+# Jobs and their results follow the data version this process serves
+if WORKER_MODE:
+    scheduler.set_version(data_version_loaded)
+else:
+    scheduler.set_data(get_job_data(data_key))
+
+@st.cache_resource
+def get_session_manager():
+    """Memory budget and LRU eviction of per-session derived data"""
+    return SessionResourceManager()
+
+session_manager = get_session_manager()
+
+@st.cache_resource(max_entries=1)
+def register_shared_data(data_key):
+    """Report the loaded tables as shared data, replacing those of the previous version"""
+    for name, table in [('teachers', teachers_df), ('students', students_df),
+                        ('performance', performance_df), ('credentials', teacher_credentials),
+                        ('aggregator', aggregator.frame)]:
+        session_manager.register_shared(name, table)
+
+register_shared_data(data_key)
+ctx = get_script_run_ctx()
+session_id = ctx.session_id if ctx is not None else 'local'
+
+@st.cache_resource
+def get_audit_log():
+    """Access audit trail written in the background by one writer thread"""
+    return AuditLog()
+
+audit_log = get_audit_log()
 
 # ==================== HELPER FUNCTIONS ====================
 
-def filter_non_null_info(data_dict):
-    """Remove null/empty values from dictionary"""
-    return {k: v for k, v in data_dict.items() if pd.notna(v) and v != '' and str(v).lower() != 'nan'}
+# Keyed widgets inside the main tabs, kept while their tab is closed
+TAB_WIDGET_KEYS = [
+    'yoy_metric', 'teacher_search', 'teacher_status', 'teacher_subject', 'teacher_qualification',
+    'lb_metric', 'lb_group', 'lb_value', 'anomaly_signal', 'compare_mode', 'compare_teachers',
+    'compare_subject', 'compare_section', 'student_search', 'student_pick',
+    'audit_window', 'audit_events', 'audit_user',
+]
 
-def create_radar_chart(teacher):
-    """Create a radar chart for teacher performance"""
-    categories = ['TD Estimated', 'TD Current', 'CCA', 'Stakeholder']
-    values = [
-        teacher['Teaching_Score_External'] if pd.notna(teacher['Teaching_Score_External']) else 0,
-        teacher['Teaching_Score_Internal'] if pd.notna(teacher['Teaching_Score_Internal']) else 0,
-        teacher['Contribution_CoCurricular_%'] if pd.notna(teacher['Contribution_CoCurricular_%']) else 0,
-        (teacher['Alignment_Head_Rating'] + teacher['Alignment_Peer_Rating'] + 
-         teacher['Alignment_Student_Rating'] + teacher['Alignment_Parent_Rating']) / 4 * 20
-    ]
+
+def audit(event, user=None, role=None, **detail):
+    """Queue an audit event for this session (never blocks the rerun)"""
+    audit_log.log(event, session=session_id,
+                  user=user or st.session_state.get('username'),
+                  role=role or st.session_state.get('role'), **detail)
+
+
+def filter_teachers(teachers, search, status_filter, subject_filter, qualification_filter):
+    """Teachers matching the directory search and filters"""
+    filtered = teachers
     
-    fig = go.Figure(data=go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        name='Performance',
-        line=dict(color='#00ff88', width=3),
-        fillcolor='rgba(0, 255, 136, 0.2)'
-    ))
+    if search:
+        filtered = filtered[
+            (filtered['Teacher_Name'].str.lower().str.contains(search.lower(), na=False)) |
+            (filtered['Teacher_ID'].str.lower().str.contains(search.lower(), na=False))
+        ]
     
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                tickfont=dict(color='#bdc3c7', size=10),
-                gridcolor='rgba(197, 0, 255, 0.2)'
-            ),
-            angularaxis=dict(tickfont=dict(color='#bdc3c7', size=10))
-        ),
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#bdc3c7'),
-        height=400,
-        showlegend=False,
-        margin=dict(l=60, r=60, t=60, b=60)
-    )
+    if status_filter != "All":
+        filtered = filtered[filtered['Status'] == status_filter]
     
-    return fig
+    if subject_filter != "All":
+        filtered = filtered[filtered['Subject'] == subject_filter]
+
+    if qualification_filter != "All":
+        filtered = filtered[filtered['Qualification'] == qualification_filter]
+    
+    return filtered
+
+def scoped_trend(scope, job, metric, stats):
+    """30-day trend from its background job for full access, from the scope's group partition otherwise"""
+    if scope.full:
+        return scheduler.result(job)
+    return scope.summary(aggregator, metric, stats, last=30)
 
 # ==================== AUTHENTICATION ====================
 if 'authenticated' not in st.session_state:
@@ -97,6 +287,7 @@ if 'authenticated' not in st.session_state:
     st.session_state.username = None
     st.session_state.role = None
     st.session_state.teacher_id = None
+    st.session_state.scope = None
 
 # ==================== LOGIN PAGE ====================
 if not st.session_state.authenticated:
@@ -128,7 +319,7 @@ if not st.session_state.authenticated:
         
         username = st.text_input("👤 Username", placeholder="Enter your username", key="login_username")
         password = st.text_input("🔑 Password", type="password", placeholder="Enter your password", key="login_password")
-        role = st.selectbox("👥 Select Role", ["Admin", "Principal", "Teacher"])
+        role = st.selectbox("👥 Select Role", ["Admin", "Principal", "Department Head", "Section Coordinator", "Teacher"])
         
         if st.button("🔓 Login Now", use_container_width=True):
             USERS = {
@@ -136,15 +327,36 @@ if not st.session_state.authenticated:
                 'principal': 'principal123'
             }
             
-            if role in ["Admin", "Principal"]:
+            if role in FULL_ACCESS_ROLES:
                 if username in USERS and USERS[username] == password:
                     st.session_state.authenticated = True
                     st.session_state.username = username
                     st.session_state.role = role
                     st.session_state.teacher_id = None
+                    st.session_state.scope = None
+                    audit('login', outcome='success')
                     st.success("✅ Login successful! Redirecting...")
                     st.rerun()
                 else:
+                    audit('login', user=username, role=role, outcome='failure', reason='invalid_credentials')
+                    st.error("❌ Invalid username or password. Please try again.")
+            
+            elif role in ["Department Head", "Section Coordinator"]:
+                staff = staff_credentials[(staff_credentials['username'] == username) &
+                                          (staff_credentials['Role'] == role)]
+                if len(staff) > 0 and str(staff.iloc[0]['password']) == str(password):
+                    st.session_state.authenticated = True
+                    st.session_state.username = username
+                    st.session_state.role = role
+                    st.session_state.teacher_id = None
+                    st.session_state.scope = staff.iloc[0]['Scope']
+                    # Resolve the allowed rows once; later reruns get the cached scope
+                    access_index.scope(role, st.session_state.scope)
+                    audit('login', outcome='success', scope=st.session_state.scope)
+                    st.success("✅ Login successful! Redirecting...")
+                    st.rerun()
+                else:
+                    audit('login', user=username, role=role, outcome='failure', reason='invalid_credentials')
                     st.error("❌ Invalid username or password. Please try again.")
             
             elif role == "Teacher":
@@ -156,11 +368,16 @@ if not st.session_state.authenticated:
                         st.session_state.username = username
                         st.session_state.role = role
                         st.session_state.teacher_id = teacher_creds.iloc[0]['Teacher_ID']
+                        st.session_state.scope = st.session_state.teacher_id
+                        access_index.scope(role, st.session_state.scope)
+                        audit('login', outcome='success')
                         st.success("✅ Login successful! Redirecting...")
                         st.rerun()
                     else:
+                        audit('login', user=username, role=role, outcome='failure', reason='invalid_password')
                         st.error("❌ Invalid password. Please try again.")
                 else:
+                    audit('login', user=username, role=role, outcome='failure', reason='unknown_user')
                     st.error("❌ Username not found. Please contact administration.")
         
         st.markdown("""
@@ -173,6 +390,8 @@ if not st.session_state.authenticated:
                 <div class="demo-title">📋 Demo Credentials</div>
                 <div class="demo-item"><span class="demo-label">🔹 Admin:</span> admin / admin123</div>
                 <div class="demo-item"><span class="demo-label">🔹 Principal:</span> principal / principal123</div>
+                <div class="demo-item"><span class="demo-label">🔹 Dept. Head:</span> hod_math / math123</div>
+                <div class="demo-item"><span class="demo-label">🔹 Coordinator:</span> coord_c / sectionc123</div>
                 <div class="demo-item"><span class="demo-label">🔹 Teacher:</span> T001 / 9593</div>
                 <div class="demo-item"><span class="demo-label">🔹 Teacher:</span> T002 / 4663</div>
             </div>
@@ -186,29 +405,72 @@ else:
         st.markdown("<h1 class='dashboard-title'>🎓 MY SCHOOL Dashboard</h1>", unsafe_allow_html=True)
         st.markdown("<p class='dashboard-subtitle'>📊 Comprehensive Management System</p>", unsafe_allow_html=True)
     
+    # Allowed rows of this login, resolved at login and cached per (role, scope)
+    scope = access_index.scope(st.session_state.role, st.session_state.get('scope'))
+    teachers = scope.teachers
+    
     with header_col3:
         col_logout, col_user = st.columns([1, 1])
         with col_logout:
             if st.button("🚪 Logout"):
+                audit('logout')
+                session_manager.release(session_id)
                 st.session_state.authenticated = False
                 st.session_state.username = None
                 st.session_state.role = None
                 st.session_state.teacher_id = None
+                st.session_state.scope = None
                 st.rerun()
         
         st.markdown(f"""
             <div class="user-info">
                 <div class="user-name">👤 {st.session_state.username.upper()}</div>
-                <div class="user-role">Role: {st.session_state.role}</div>
+                <div class="user-role">Role: {st.session_state.role}{f" · {scope.label}" if not scope.full else ""}</div>
             </div>
         """, unsafe_allow_html=True)
     
+    session_manager.touch(session_id)
+    session_manager.evict_idle()
+    
+    if st.session_state.role == "Admin":
+        with st.sidebar:
+            with st.expander("🧠 Session Memory", expanded=False):
+                usage = session_manager.usage()
+                st.metric("Active Sessions", usage['sessions'])
+                st.metric("Derived Data", f"{usage['derived_bytes'] / 1024 / 1024:.1f} MB",
+                          f"Budget {usage['global_budget'] / 1024 / 1024:.0f} MB")
+                st.metric("Shared Data", f"{usage['shared_bytes'] / 1024 / 1024:.1f} MB", "All sessions")
+                st.caption(f"Per-session budget {usage['session_budget'] / 1024 / 1024:.0f} MB · "
+                           f"{usage['evictions']} evictions")
+            
+            with st.expander("⚙️ Background Jobs", expanded=False):
+                jobs_status = pd.DataFrame(scheduler.status(limit=15))
+                if len(jobs_status) > 0:
+                    jobs_status['took_s'] = (jobs_status['finished'] - jobs_status['started']).round(2)
+                    jobs_status['queued_at'] = pd.to_datetime(jobs_status['enqueued'], unit='s').dt.strftime('%H:%M:%S')
+                    st.dataframe(jobs_status[['name', 'status', 'trigger', 'priority', 'queued_at', 'took_s', 'error']],
+                                 use_container_width=True, hide_index=True)
+                runner = f"{scheduler.workers} workers" if scheduler.running else "jobs run in serve.py"
+                st.caption(f"Data version {scheduler.version} · {runner}")
+                if scheduler.running and st.button("🔄 Recompute All", key="jobs_run_all", use_container_width=True):
+                    scheduler.submit_all(trigger='manual', force=True)
+                    st.success("✅ Jobs queued")
+    
     st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
     st.divider()
     
     # ==================== DYNAMIC TABS ====================
-    if st.session_state.role in ["Admin", "Principal"]:
-        tabs = st.tabs(["📊 Dashboard", "👨‍🏫 Teachers", "🕐 Attendance", "⚠️ Attrition"])
+    if st.session_state.role != "Teacher":
+        tab_labels = ["📊 Dashboard", "👨‍🏫 Teachers", "🕐 Attendance", "⚠️ Attrition", "⚖️ Compare", "🎒 Students"]
+        if st.session_state.role == "Admin":
+            tab_labels.append("🛡️ Audit")
+        # Stateful tabs rerun on switch so the view can be audited; only the open tab's body runs
+        tabs = st.tabs(tab_labels, key="main_tabs",
+                       on_change=lambda: audit('tab_view', tab=st.session_state.main_tabs))
+        # Widgets of closed tabs are not rendered, so carry their values over to the next run
+        for widget_key in TAB_WIDGET_KEYS:
+            if widget_key in st.session_state:
+                st.session_state[widget_key] = st.session_state[widget_key]
         teacher_role = False
     else:
         tabs = st.tabs(["👤 My Profile"])
@@ -216,486 +478,619 @@ else:
     
     # ========== DASHBOARD TAB ==========
     if not teacher_role:
-        with tabs[0]:
-            st.markdown("## 📊 MS Dashboard Overview")
-            st.markdown("_Real-time monitoring of school performance metrics_")
-            
-            perf = performance_df.copy()
-            teachers = teachers_df.copy()
-            
-            # KPI METRICS
-            col1, col2, col3, col4, col5, col6 = st.columns(6)
-            
-            with col1:
-                st.metric("👨‍🏫 Total Teachers", len(teachers), "Staff Members")
-            
-            with col2:
-                st.metric("👥 Total Students", len(students_df), "Enrolled")
-            
-            with col3:
-                at_risk_count = len(teachers[teachers['Status'] == 'At Risk'])
-                st.metric("⚠️ At Risk", at_risk_count, "Teachers")
-            
-            with col4:
-                compliance = round(teachers['Compliance_Score'].mean(), 2)
-                st.metric("✓ Compliance", compliance, "Out of 10")
-            
-            with col5:
-                teaching = round(teachers['Teaching_Score_Internal'].mean(), 2)
-                st.metric("📈 Teaching", teaching, "Score")
-            
-            with col6:
-                att_rate = round((perf['Attendance'] == 'Present').sum() / len(perf) * 100, 1) if len(perf) > 0 else 0
-                st.metric("📊 Attendance", f"{att_rate}%", "Present")
-            
-            st.divider()
-            
-            # CHARTS
-            st.markdown("### 📈 Performance Analytics")
-            
-            chart_col1, chart_col2 = st.columns(2)
-            
-            with chart_col1:
-                st.markdown("#### Performance Trend (Last 30 Days)")
-                perf_trend = perf.sort_values('Date').tail(30)
-                trend_data = perf_trend.groupby('Date')['Score'].agg(['mean', 'min', 'max']).reset_index()
-                
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=trend_data['Date'], y=trend_data['mean'],
-                    mode='lines+markers', name='Average Score',
-                    line=dict(color='#c500ff', width=4),
-                    marker=dict(size=8, color='#c500ff'),
-                    fill='tozeroy', fillcolor='rgba(197, 0, 255, 0.15)'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=trend_data['Date'], y=trend_data['max'],
-                    mode='lines', name='Max Score',
-                    line=dict(color='#00ff88', width=2, dash='dash')
-                ))
-                fig.add_trace(go.Scatter(
-                    x=trend_data['Date'], y=trend_data['min'],
-                    mode='lines', name='Min Score',
-                    line=dict(color='#ff006b', width=2, dash='dash')
-                ))
-                
-                fig.update_layout(
-                    template='plotly_dark', hovermode='x unified',
-                    height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=30, b=20, l=20, r=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with chart_col2:
-                st.markdown("#### Score Distribution Analysis")
-                score_dist = {
-                    'Excellent (90-100)': len(perf[perf['Score'] >= 90]),
-                    'Good (75-89)': len(perf[(perf['Score'] >= 75) & (perf['Score'] < 90)]),
-                    'Average (60-74)': len(perf[(perf['Score'] >= 60) & (perf['Score'] < 75)]),
-                    'Below Average (<60)': len(perf[perf['Score'] < 60])
-                }
+        if tabs[0].open:
+            with tabs[0]:
+                st.markdown("## 📊 MS Dashboard Overview")
+                st.markdown("_Real-time monitoring of school performance metrics_")
                 
-                fig = go.Figure(data=[go.Pie(
-                    labels=list(score_dist.keys()),
-                    values=list(score_dist.values()),
-                    marker=dict(colors=['#00ff88', '#c500ff', '#ff006b', '#ff9500']),
-                    hole=0.35,
-                    textinfo='label+percent',
-                    hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=400, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=30, b=20, l=20, r=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # MORE ANALYTICS
-            st.markdown("### 📚 Subject & Status Analytics")
-            
-            anal_col1, anal_col2 = st.columns(2)
-            
-            with anal_col1:
-                st.markdown("#### Teachers Distribution by Subject")
-                subject_dist = teachers['Subject'].value_counts().sort_values()
-                
-                fig = go.Figure(data=[go.Bar(
-                    y=subject_dist.index,
-                    x=subject_dist.values,
-                    orientation='h',
-                    marker=dict(
-                        color=subject_dist.values,
-                        colorscale='purples',
-                        line=dict(color='#c500ff', width=2)
-                    ),
-                    text=subject_dist.values,
-                    textposition='auto',
-                    hovertemplate='<b>%{y}</b><br>Teachers: %{x}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=20, b=20, l=100, r=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with anal_col2:
-                st.markdown("#### Teacher Status Distribution")
-                status_dist = teachers['Status'].value_counts()
-                colors_map = {'Active': '#00ff88', 'At Risk': '#ff9500', 'Left': '#ff006b'}
-                
-                fig = go.Figure(data=[go.Pie(
-                    labels=status_dist.index,
-                    values=status_dist.values,
-                    marker=dict(colors=[colors_map.get(s, '#c500ff') for s in status_dist.index]),
-                    hole=0.35,
-                    textinfo='label+value',
-                    hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=20, b=20, l=20, r=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # ATTENDANCE IMPACT
-            st.markdown("### 📊 Attendance Impact Analysis")
-            
-            imp_col1, imp_col2 = st.columns(2)
+                quarantined = sum(info['rows_quarantined'] for info in validation_report['tables'].values())
+                if quarantined > 0 and scope.full:
+                    st.warning(f"⚠️ {quarantined} invalid rows were quarantined at load. See {os.path.join(QUARANTINE_DIR, 'validation_report.json')}")
+                
+                if not scope.full:
+                    st.info(f"🔒 Showing {scope.label}: {scope.describe()}")
+                
+                # KPI METRICS
+                kpi_cols = st.columns(6)
+                for col, (label, value, delta) in zip(kpi_cols, charts.dashboard_kpis(teachers, scope.students, scope.columns)):
+                    with col:
+                        st.metric(label, value, delta)
+                
+                st.divider()
+                
+                # CHARTS
+                st.markdown("### 📈 Performance Analytics")
+                
+                chart_col1, chart_col2 = st.columns(2)
+                
+                with chart_col1:
+                    st.markdown("#### Performance Trend (Last 30 Days)")
+                    trend_data = scoped_trend(scope, 'score_trend', 'score', ('mean', 'min', 'max'))
+                    if trend_data is None:
+                        st.info("⏳ Trend is being computed in the background.")
+                    else:
+                        st.plotly_chart(charts.create_performance_trend_chart(trend_data), use_container_width=True)
+                
+                with chart_col2:
+                    st.markdown("#### Score Distribution Analysis")
+                    score_sketch = score_sketches.query(scope.group, scope.value)
+                    score_dist = charts.score_distribution(score_sketch)
+                    st.plotly_chart(charts.create_score_distribution_chart(score_dist), use_container_width=True)
+                
+                dist_col1, dist_col2 = st.columns(2)
+                
+                with dist_col1:
+                    if scope.full or scope.group == 'section':
+                        st.markdown("#### Median & P90 Score by Section")
+                        st.plotly_chart(charts.create_section_percentile_chart(
+                            score_sketches, values=None if scope.full else [scope.value]), use_container_width=True)
+                    else:
+                        st.markdown("#### Median & P90 Score by Teacher")
+                        st.plotly_chart(charts.create_section_percentile_chart(
+                            score_sketches, 'teacher', teachers['Teacher_ID']), use_container_width=True)
+                
+                with dist_col2:
+                    st.markdown("#### Score Histogram")
+                    st.plotly_chart(charts.create_score_histogram_chart(score_sketch), use_container_width=True)
+                
+                # MORE ANALYTICS
+                st.markdown("### 📚 Subject & Status Analytics")
+                
+                anal_col1, anal_col2 = st.columns(2)
+                
+                with anal_col1:
+                    st.markdown("#### Teachers Distribution by Subject")
+                    st.plotly_chart(charts.create_subject_distribution_chart(teachers), use_container_width=True)
+                
+                with anal_col2:
+                    st.markdown("#### Teacher Status Distribution")
+                    st.plotly_chart(charts.create_status_distribution_chart(teachers), use_container_width=True)
+                
+                # ATTENDANCE IMPACT
+                st.markdown("### 📊 Attendance Impact Analysis")
+                
+                imp_col1, imp_col2 = st.columns(2)
+                
+                with imp_col1:
+                    st.markdown("#### Attendance vs Performance Score")
+                    attend_impact = scope.columns.group_mean('Score', 'Attendance')
+                    st.plotly_chart(charts.create_attendance_impact_chart(attend_impact), use_container_width=True)
+                
+                with imp_col2:
+                    st.markdown("#### Late Arrival Trend (30 Days)")
+                    late_trend = scoped_trend(scope, 'late_trend', 'late', ('sum', 'mean'))
+                    if late_trend is None:
+                        st.info("⏳ Trend is being computed in the background.")
+                    else:
+                        st.plotly_chart(charts.create_late_trend_chart(late_trend), use_container_width=True)
             
-            with imp_col1:
-                st.markdown("#### Attendance vs Performance Score")
-                attend_impact = perf.groupby('Attendance').agg({'Score': 'mean', 'Late_Count': 'mean'}).reset_index()
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(
-                    x=attend_impact['Attendance'],
-                    y=attend_impact['Score'],
-                    name='Avg Score',
-                    marker=dict(color='#c500ff'),
-                    text=attend_impact['Score'].round(1),
-                    textposition='auto',
-                    yaxis='y'
-                ))
-                
-                fig.update_layout(
-                    template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=20, b=20, l=20, r=20),
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # YEAR OVER YEAR
+                st.markdown("### 📅 Year-over-Year Trend")
+                
+                yoy_col1, yoy_col2 = st.columns([1, 3])
+                
+                with yoy_col1:
+                    yoy_metric = st.radio("Metric", list(charts.YOY_LABELS), format_func=charts.YOY_LABELS.get,
+                                          key="yoy_metric")
+                    if len(archive) > 0:
+                        st.caption(f"📦 {len(archive):,} archived records in {len(archive.partitions())} monthly "
+                                   f"partitions · 🔥 current term in memory since {archive.hot_start:%d %b %Y}")
+                    else:
+                        st.caption("🔥 All history is in memory. Run `python archive.py compact` to archive older terms.")
+                
+                with yoy_col2:
+                    # Archived terms come from the precomputed daily summaries only
+                    yoy = yoy_trend([archive.summary, hot_summary], yoy_metric,
+                                    subject=scope.value if scope.group == 'subject' else None,
+                                    section=scope.value if scope.group == 'section' else None)
+                    st.plotly_chart(charts.create_yoy_chart(yoy, yoy_metric), use_container_width=True)
             
-            with imp_col2:
-                st.markdown("#### Late Arrival Trend (30 Days)")
-                late_trend = perf.sort_values('Date').tail(30).groupby('Date')['Late_Count'].sum()
-                
-                fig = go.Figure(data=[go.Scatter(
-                    x=late_trend.index, y=late_trend.values,
-                    mode='lines+markers', name='Late Arrivals',
-                    line=dict(color='#ff9500', width=4),
-                    marker=dict(size=10, color='#ff9500'),
-                    fill='tozeroy', fillcolor='rgba(255, 149, 0, 0.15)',
-                    hovertemplate='<b>%{x}</b><br>Late Count: %{y}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11),
-                    margin=dict(t=20, b=20, l=20, r=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-        
         # ========== TEACHERS TAB ==========
-        with tabs[1]:
-            st.markdown("## 👨‍🏫 Teacher Management System")
-            st.markdown("_Search, filter and manage teacher performance data_")
-            
-            # FILTERS
-            filter_col1, filter_col2, filter_col3, filter_col4, filter_col5 = st.columns(5)
-            
-            with filter_col1:
-                search = st.text_input("🔍 Search by Name or ID", placeholder="Type name...")
-            
-            with filter_col2:
-                status_filter = st.selectbox("Filter by Status", ["All", "Active", "At Risk", "Left"])
-            
-            with filter_col3:
-                subject_list = ["All"] + sorted(teachers_df['Subject'].unique().tolist())
-                subject_filter = st.selectbox("Filter by Subject", subject_list)
+        if tabs[1].open:
+            with tabs[1]:
+                st.markdown("## 👨‍🏫 Teacher Management System")
+                st.markdown("_Search, filter and manage teacher performance data_")
+                
+                # FILTERS
+                filter_col1, filter_col2, filter_col3, filter_col4, filter_col5 = st.columns(5)
+                
+                with filter_col1:
+                    search = st.text_input("🔍 Search by Name or ID", placeholder="Type name...", key="teacher_search")
+                
+                with filter_col2:
+                    status_filter = st.selectbox("Filter by Status", ["All", "Active", "At Risk", "Left"], key="teacher_status")
+                
+                with filter_col3:
+                    subject_list = ["All"] + sorted(teachers['Subject'].unique().tolist())
+                    subject_filter = st.selectbox("Filter by Subject", subject_list, key="teacher_subject")
 
-            with filter_col4:
-                Qualification_list = ["All"] + sorted(teachers_df['Qualification'].unique().tolist())
-                Qualification_filter = st.selectbox("Filter by Qualification", Qualification_list)
+                with filter_col4:
+                    Qualification_list = ["All"] + sorted(teachers['Qualification'].unique().tolist())
+                    Qualification_filter = st.selectbox("Filter by Qualification", Qualification_list,
+                                                        key="teacher_qualification")
 
-            with filter_col5:
-                st.write("")
-                apply_btn = st.button("🔎 Apply Filters", use_container_width=True)
-            
-            # FILTER DATA
-            filtered_teachers = teachers_df.copy()
-            
-            if search:
-                filtered_teachers = filtered_teachers[
-                    (filtered_teachers['Teacher_Name'].str.lower().str.contains(search.lower(), na=False)) |
-                    (filtered_teachers['Teacher_ID'].str.lower().str.contains(search.lower(), na=False))
-                ]
-            
-            if status_filter != "All":
-                filtered_teachers = filtered_teachers[filtered_teachers['Status'] == status_filter]
-            
-            if subject_filter != "All":
-                filtered_teachers = filtered_teachers[filtered_teachers['Subject'] == subject_filter]
-
-            if Qualification_filter != "All":
-                filtered_teachers = filtered_teachers[filtered_teachers['Qualification'] == Qualification_filter]
-            
-            # STATS
-            st.markdown("---")
-            stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
-            
-            with stat_col1:
-                st.metric("📊 Total Found", len(filtered_teachers))
-            
-            with stat_col2:
-                st.metric("✓ Active", len(filtered_teachers[filtered_teachers['Status'] == 'Active']))
-            
-            with stat_col3:
-                st.metric("⚠️ At Risk", len(filtered_teachers[filtered_teachers['Status'] == 'At Risk']))
-            
-            with stat_col4:
-                st.metric("🚪 Left", len(filtered_teachers[filtered_teachers['Status'] == 'Left']))
-            
-            # TABLE
-            st.markdown("### 📋 Teacher Directory")
-            
-            if len(filtered_teachers) > 0:
-                display_df = filtered_teachers[[
-                    'Teacher_ID', 'Teacher_Name', 'Subject','Qualification', 'Total_Experience_Years',
-                    'Teaching_Score_Internal', 'Compliance_Score', 'Status'
-                ]].head(50).copy()
+                with filter_col5:
+                    st.write("")
+                    apply_btn = st.button("🔎 Apply Filters", use_container_width=True)
+                
+                # FILTER DATA
+                filter_key = ('filtered_teachers', scope.value, search, status_filter, subject_filter, Qualification_filter)
+                if search or (status_filter, subject_filter, Qualification_filter) != ("All", "All", "All"):
+                    filtered_teachers = session_manager.get_or_compute(
+                        session_id, filter_key,
+                        lambda: filter_teachers(teachers, search, status_filter, subject_filter, Qualification_filter))
+                else:
+                    # Unfiltered: the scope's shared frame, nothing this session derived
+                    filtered_teachers = teachers
+                
+                # STATS
+                st.markdown("---")
+                stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
+                
+                with stat_col1:
+                    st.metric("📊 Total Found", len(filtered_teachers))
+                
+                with stat_col2:
+                    st.metric("✓ Active", len(filtered_teachers[filtered_teachers['Status'] == 'Active']))
                 
-                display_df.columns = ['ID', 'Name', 'Subject','Qualification', 'Experience', 'Teaching Score', 'Compliance', 'Status']
+                with stat_col3:
+                    st.metric("⚠️ At Risk", len(filtered_teachers[filtered_teachers['Status'] == 'At Risk']))
                 
-                st.dataframe(display_df, use_container_width=True, height=400, hide_index=True)
+                with stat_col4:
+                    st.metric("🚪 Left", len(filtered_teachers[filtered_teachers['Status'] == 'Left']))
+                
+                # TABLE
+                st.markdown("### 📋 Teacher Directory")
+                
+                if len(filtered_teachers) > 0:
+                    display_df = filtered_teachers[[
+                        'Teacher_ID', 'Teacher_Name', 'Subject','Qualification', 'Total_Experience_Years',
+                        'Teaching_Score_Internal', 'Compliance_Score', 'Status'
+                    ]].head(50).copy()
+                    
+                    display_df.columns = ['ID', 'Name', 'Subject','Qualification', 'Experience', 'Teaching Score', 'Compliance', 'Status']
+                    
+                    st.dataframe(display_df, use_container_width=True, height=400, hide_index=True)
 
-                csv = filtered_teachers.to_csv(index=False).encode('utf-8')
+                    csv = session_manager.get_or_compute(
+                        session_id, filter_key + ('csv',),
+                        lambda: filtered_teachers.to_csv(index=False).encode('utf-8'))
 
-                st.download_button(
-                    label="⬇️ Download Filtered Data (CSV)",
-                    data=csv,
-                    file_name="filtered_teachers.csv",
-                    mime="text/csv",
-                    use_container_width=True)
+                    st.download_button(
+                        label="⬇️ Download Filtered Data (CSV)",
+                        data=csv,
+                        file_name="filtered_teachers.csv",
+                        mime="text/csv",
+                        use_container_width=True,
+                        on_click=audit, args=('export',),
+                        kwargs=dict(file='filtered_teachers.csv', rows=len(filtered_teachers),
+                                    filters=dict(search=search, status=status_filter, subject=subject_filter,
+                                                 qualification=Qualification_filter)))
 
-            else:
-                st.warning("❌ No teachers found matching your criteria.")
-            
-            # TOP PERFORMERS
-            st.markdown("---")
-            st.markdown("### ⭐ Top 5 Performing Teachers")
-            
-            top_teachers = teachers_df.nlargest(5, 'Teaching_Score_Internal')
+                else:
+                    st.warning("❌ No teachers found matching your criteria.")
+                
+                # TOP PERFORMERS
+                st.markdown("---")
+                st.markdown("### ⭐ Top 5 Performing Teachers")
+                
+                # Scoped logins read the precomputed leaderboard slice of their subject or section
+                lb_scope = 'all' if scope.full else scope.group
+                top_teachers = leaderboards.top_frame('Teaching_Score_Internal', lb_scope, scope.value, n=5)
+                
+                top_cols = st.columns(5)
+                for idx, (_, teacher) in enumerate(top_teachers.iterrows()):
+                    with top_cols[idx]:
+                        st.markdown(templates.render(
+                            'teacher_card',
+                            avatar_url=teacher['Avatar_URL'],
+                            name=teacher['Teacher_Name'][:20],
+                            subject=teacher['Subject'],
+                            score=f"{teacher['Teaching_Score_Internal']:.1f}",
+                            label='Teaching Score'
+                        ), unsafe_allow_html=True)
+                
+                # LEADERBOARDS
+                st.markdown("---")
+                st.markdown("### 🏆 Leaderboards")
+                
+                lb_col1, lb_col2, lb_col3 = st.columns(3)
+                
+                with lb_col1:
+                    lb_metric = st.selectbox("Metric", list(LEADERBOARD_METRICS),
+                                             format_func=LEADERBOARD_METRICS.get, key="lb_metric")
+                
+                with lb_col2:
+                    lb_group = st.selectbox("Group By", list(LEADERBOARD_GROUPS) if scope.full else [lb_scope],
+                                            format_func=lambda g: g.title(), key="lb_group")
+                
+                with lb_col3:
+                    if not scope.full:
+                        lb_values = [scope.value]
+                    elif LEADERBOARD_GROUPS[lb_group]:
+                        lb_values = leaderboards.group_values(lb_group)
+                    else:
+                        lb_values = ["All Teachers"]
+                    lb_value = st.selectbox("Slice", lb_values, key="lb_value")
+                
+                leaderboard = leaderboards.top_frame(lb_metric, lb_group, lb_value)
+                
+                if len(leaderboard) > 0:
+                    lb_display = leaderboard[['Teacher_ID', 'Teacher_Name', 'Subject', 'Qualification', 'Sections_Taught', lb_metric]].copy()
+                    lb_display.insert(0, 'Rank', range(1, len(lb_display) + 1))
+                    lb_display.columns = ['Rank', 'ID', 'Name', 'Subject', 'Qualification', 'Section', LEADERBOARD_METRICS[lb_metric]]
+                    st.dataframe(lb_display, use_container_width=True, hide_index=True)
+                else:
+                    st.warning("❌ No teachers in this leaderboard.")
             
-            top_cols = st.columns(5)
-            for idx, (_, teacher) in enumerate(top_teachers.iterrows()):
-                with top_cols[idx]:
-                    st.markdown(f"""
-                        <div class="teacher-card">
-                            <img src="{teacher['Avatar_URL']}" class="teacher-avatar">
-                            <div class="teacher-name">{teacher['Teacher_Name'][:20]}</div>
-                            <div class="teacher-subject">{teacher['Subject']}</div>
-                            <div class="teacher-score">{teacher['Teaching_Score_Internal']:.1f}</div>
-                            <div class="teacher-label">Teaching Score</div>
-                        </div>
-                    """, unsafe_allow_html=True)
-        
         # ========== ATTENDANCE TAB ==========
-        with tabs[2]:
-            st.markdown("## 🕐 Attendance & Punctuality")
-            st.markdown("_Track attendance patterns and late arrivals_")
-            
-            perf = performance_df.copy()
-            
-            # KPI METRICS
-            kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
-            
-            present_rate = round((perf['Attendance'] == 'Present').sum() / len(perf) * 100, 1)
-            absent_rate = round((perf['Attendance'] == 'Absent').sum() / len(perf) * 100, 1)
-            
-            with kpi_col1:
-                st.metric("✓ Present Rate", f"{present_rate}%", "Today")
-            
-            with kpi_col2:
-                st.metric("✗ Absent Rate", f"{absent_rate}%", "Today")
-            
-            with kpi_col3:
-                st.metric("⏰ Avg Late Count", f"{perf['Late_Count'].mean():.2f}", "Times/Month")
-            
-            with kpi_col4:
-                st.metric("📊 Max Late Count", int(perf['Late_Count'].max()), "Times")
-            
-            st.divider()
-            
-            # ATTENDANCE CHARTS
-            att_chart1, att_chart2, att_chart3 = st.columns(3)
-            
-            with att_chart1:
-                st.markdown("#### Attendance Status")
-                att_status = perf['Attendance'].value_counts()
-                
-                fig = go.Figure(data=[go.Pie(
-                    labels=att_status.index, values=att_status.values,
-                    marker=dict(colors=['#00ff88', '#ff006b']),
-                    hole=0.4, textinfo='label+value',
-                    hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+        if tabs[2].open:
+            with tabs[2]:
+                st.markdown("## 🕐 Attendance & Punctuality")
+                st.markdown("_Track attendance patterns and late arrivals_")
+                
+                perf = scope.columns
+                
+                # KPI METRICS
+                kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
+                
+                present_rate = round(perf.rate_equal('Attendance', 'Present'), 1)
+                absent_rate = round(perf.rate_equal('Attendance', 'Absent'), 1)
+                
+                with kpi_col1:
+                    st.metric("✓ Present Rate", f"{present_rate}%", "Today")
+                
+                with kpi_col2:
+                    st.metric("✗ Absent Rate", f"{absent_rate}%", "Today")
+                
+                with kpi_col3:
+                    st.metric("⏰ Avg Late Count", f"{perf.mean('Late_Count'):.2f}", "Times/Month")
+                
+                with kpi_col4:
+                    st.metric("📊 Max Late Count", int(perf.max('Late_Count')), "Times")
+                
+                st.divider()
+                
+                # ATTENDANCE CHARTS
+                att_chart1, att_chart2, att_chart3 = st.columns(3)
+                
+                with att_chart1:
+                    st.markdown("#### Attendance Status")
+                    att_status = perf.value_counts('Attendance')
+                    
+                    fig = go.Figure(data=[go.Pie(
+                        labels=att_status.index, values=att_status.values,
+                        marker=dict(colors=['#00ff88', '#ff006b']),
+                        hole=0.4, textinfo='label+value',
+                        hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
+                    )])
+                    
+                    fig.update_layout(
+                        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='#bdc3c7', size=11)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with att_chart2:
+                    st.markdown("#### Late Arrival Trend")
+                    late_analysis = scoped_trend(scope, 'late_trend', 'late', ('sum', 'mean'))
+                    if late_analysis is None:
+                        st.info("⏳ Trend is being computed in the background.")
+                    else:
+                        fig = go.Figure(data=[go.Scatter(
+                            x=late_analysis['Date'], y=late_analysis['mean'],
+                            mode='lines+markers', name='Avg Late',
+                            line=dict(color='#ff9500', width=3),
+                            marker=dict(size=8, color='#ff9500'),
+                            fill='tozeroy', fillcolor='rgba(255, 149, 0, 0.15)',
+                            hovertemplate='<b>%{x}</b><br>Avg Late: %{y:.2f}<extra></extra>'
+                        )])
+                    
+                        fig.update_layout(
+                            template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+                            font=dict(color='#bdc3c7', size=11)
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                
+                with att_chart3:
+                    st.markdown("#### Performance vs Attendance")
+                    attend_vs_score = perf.group_mean('Score', 'Attendance')
+                    
+                    fig = go.Figure(data=[go.Bar(
+                        x=attend_vs_score['Attendance'],
+                        y=attend_vs_score['Score'],
+                        marker=dict(
+                            color=attend_vs_score['Score'],
+                            colorscale='purples',
+                            line=dict(color='#c500ff', width=2)
+                        ),
+                        text=attend_vs_score['Score'].round(1),
+                        textposition='auto',
+                        hovertemplate='<b>%{x}</b><br>Avg Score: %{y:.1f}<extra></extra>'
+                    )])
+                    
+                    fig.update_layout(
+                        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='#bdc3c7', size=11)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
             
-            with att_chart2:
-                st.markdown("#### Late Arrival Trend")
-                late_analysis = perf.sort_values('Date').tail(30).groupby('Date')['Late_Count'].mean()
-                
-                fig = go.Figure(data=[go.Scatter(
-                    x=late_analysis.index, y=late_analysis.values,
-                    mode='lines+markers', name='Avg Late',
-                    line=dict(color='#ff9500', width=3),
-                    marker=dict(size=8, color='#ff9500'),
-                    fill='tozeroy', fillcolor='rgba(255, 149, 0, 0.15)',
-                    hovertemplate='<b>%{x}</b><br>Avg Late: %{y:.2f}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # ANOMALIES
+                st.markdown("---")
+                st.markdown("### 🚨 Anomalies")
+                st.markdown("_Teachers and sections whose late arrivals or absences rise well above their usual level_")
+                
+                teacher_scope = None if scope.full else teachers['Teacher_ID'].tolist()
+                section_scope = None if scope.full else ([scope.value] if scope.group == 'section' else [])
+                
+                anomaly_signal = st.radio("Signal", list(SIGNALS), format_func=lambda s: SIGNALS[s]['label'],
+                                          horizontal=True, key="anomaly_signal")
+                
+                teacher_now = anomaly_monitor.current('teacher', anomaly_signal, teacher_scope)
+                section_now = anomaly_monitor.current('section', anomaly_signal, section_scope)
+                alerts = anomaly_monitor.recent(teacher_scope, section_scope)
+                
+                anom_kpi_cols = st.columns(4)
+                anomaly_kpis = [
+                    ("👨‍🏫 Teachers Alarming", int((teacher_now['Z'] >= anomaly_monitor.threshold).sum()),
+                     f"of {len(teacher_now)} monitored"),
+                    ("🏫 Sections Alarming", int((section_now['Z'] >= anomaly_monitor.threshold).sum()),
+                     f"of {len(section_now)} monitored"),
+                    ("🔔 Alerts Recorded", len(alerts), "Most recent kept"),
+                    ("📥 Rows Processed", f"{anomaly_monitor.rows:,}", "Streamed"),
+                ]
+                for col, (label, value, delta) in zip(anom_kpi_cols, anomaly_kpis):
+                    with col:
+                        st.metric(label, value, delta)
+                
+                anom_col1, anom_col2 = st.columns(2)
+                
+                with anom_col1:
+                    st.markdown(f"#### Teachers: {SIGNALS[anomaly_signal]['label']}")
+                    st.plotly_chart(charts.create_anomaly_chart(teacher_now, anomaly_monitor.threshold, 'Teacher'),
+                                    use_container_width=True)
+                
+                with anom_col2:
+                    st.markdown(f"#### Sections: {SIGNALS[anomaly_signal]['label']}")
+                    if len(section_now) > 0:
+                        st.plotly_chart(charts.create_anomaly_chart(section_now, anomaly_monitor.threshold, 'Section'),
+                                        use_container_width=True)
+                    else:
+                        st.info("ℹ️ Section detectors are not part of this login's scope.")
+                
+                if len(alerts) > 0:
+                    st.markdown("#### 🔔 Recent Alerts")
+                    alerts['Date'] = alerts['Date'].dt.strftime('%Y-%m-%d')
+                    st.dataframe(alerts.round(2), use_container_width=True, height=300, hide_index=True)
+                else:
+                    st.success("✅ No anomalies detected.")
             
-            with att_chart3:
-                st.markdown("#### Performance vs Attendance")
-                attend_vs_score = perf.groupby('Attendance').agg({'Score': 'mean'}).reset_index()
-                
-                fig = go.Figure(data=[go.Bar(
-                    x=attend_vs_score['Attendance'],
-                    y=attend_vs_score['Score'],
-                    marker=dict(
-                        color=attend_vs_score['Score'],
-                        colorscale='purples',
-                        line=dict(color='#c500ff', width=2)
-                    ),
-                    text=attend_vs_score['Score'].round(1),
-                    textposition='auto',
-                    hovertemplate='<b>%{x}</b><br>Avg Score: %{y:.1f}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-        
         # ========== ATTRITION TAB ==========
-        with tabs[3]:
-            st.markdown("## ⚠️ Attrition & Risk Analysis")
-            st.markdown("_Monitor teacher retention and identify at-risk employees_")
-            
-            t = teachers_df.copy()
-            
-            # KPI METRICS
-            atr_kpi1, atr_kpi2, atr_kpi3, atr_kpi4 = st.columns(4)
-            
-            at_risk_count = len(t[t['Status'] == 'At Risk'])
-            high_risk_count = len(t[t['Attrition_Risk_Score'] >= 4.5])
-            
-            with atr_kpi1:
-                st.metric("👥 Total Teachers", len(t), "Staff")
-            
-            with atr_kpi2:
-                st.metric("⚠️ At Risk", at_risk_count, "Teachers")
-            
-            with atr_kpi3:
-                st.metric("🔴 High Risk", high_risk_count, "Critical")
-            
-            with atr_kpi4:
-                st.metric("📈 Avg Risk Score", f"{t['Attrition_Risk_Score'].mean():.2f}", "Out of 5")
-            
-            st.divider()
-            
-            # RISK ANALYSIS CHARTS
-            risk_chart1, risk_chart2 = st.columns(2)
-            
-            with risk_chart1:
-                st.markdown("#### Risk Distribution")
-                
-                risk_dist = {
-                    'Low': len(t[t['Attrition_Risk_Score'] < 1.5]),
-                    'Medium': len(t[(t['Attrition_Risk_Score'] >= 1.5) & (t['Attrition_Risk_Score'] < 3.0)]),
-                    'High': len(t[(t['Attrition_Risk_Score'] >= 3.0) & (t['Attrition_Risk_Score'] < 4.5)]),
-                    'Critical': len(t[t['Attrition_Risk_Score'] >= 4.5])
-                }
+        if tabs[3].open:
+            with tabs[3]:
+                st.markdown("## ⚠️ Attrition & Risk Analysis")
+                st.markdown("_Monitor teacher retention and identify at-risk employees_")
                 
-                fig = go.Figure(data=[go.Pie(
-                    labels=list(risk_dist.keys()),
-                    values=list(risk_dist.values()),
-                    marker=dict(colors=['#00ff88', '#ff9500', '#ff006b', '#c500ff']),
-                    hole=0.4, textinfo='label+value',
-                    hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with risk_chart2:
-                st.markdown("#### Teachers by Risk Level")
-                
-                fig = go.Figure(data=[go.Bar(
-                    x=['Low', 'Medium', 'High', 'Critical'],
-                    y=[risk_dist['Low'], risk_dist['Medium'], risk_dist['High'], risk_dist['Critical']],
-                    marker=dict(color=['#00ff88', '#ff9500', '#ff006b', '#c500ff']),
-                    text=[risk_dist['Low'], risk_dist['Medium'], risk_dist['High'], risk_dist['Critical']],
-                    textposition='auto',
-                    hovertemplate='<b>%{x}</b><br>Count: %{y}<extra></extra>'
-                )])
-                
-                fig.update_layout(
-                    template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#bdc3c7', size=11)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # HIGH RISK TEACHERS
-            st.markdown("---")
-            st.markdown("### 🚨 High Risk Teachers - Immediate Attention Required")
-            
-            high_risk_teachers = t[(t['Attrition_Risk_Score'] >= 3.5) & 
-                                   (t['Status'] == "At Risk")].nlargest(10, 'Attrition_Risk_Score')
-            
-            if len(high_risk_teachers) > 0:
-                hr_display = high_risk_teachers[[
-                    'Teacher_ID', 'Teacher_Name', 'Subject', 'Attrition_Risk_Score',
-                    'Compliance_Score', 'Teaching_Score_Internal', 'Late_Count_Current_Month', 'Status'
-                ]].copy()
+                t = teachers
+                
+                # KPI METRICS
+                atr_kpi_cols = st.columns(4)
+                for col, (label, value, delta) in zip(atr_kpi_cols, charts.attrition_kpis(t)):
+                    with col:
+                        st.metric(label, value, delta)
                 
-                hr_display.columns = ['ID', 'Name', 'Subject', 'Attrition Risk', 'Compliance', 'Teaching Score', 'Late Count', 'Status']
+                st.divider()
                 
-                st.dataframe(hr_display, use_container_width=True, height=400, hide_index=True)
+                # RISK ANALYSIS CHARTS
+                risk_chart1, risk_chart2 = st.columns(2)
+                risk_dist = charts.risk_distribution(t)
                 
-                st.warning(f"⚠️ {len(high_risk_teachers)} teachers require immediate attention and intervention.")
-            else:
-                st.success("✅ No high-risk teachers identified! Great work on employee retention.")
+                with risk_chart1:
+                    st.markdown("#### Risk Distribution")
+                    st.plotly_chart(charts.create_risk_pie_chart(risk_dist), use_container_width=True)
+                
+                with risk_chart2:
+                    st.markdown("#### Teachers by Risk Level")
+                    st.plotly_chart(charts.create_risk_bar_chart(risk_dist), use_container_width=True)
+                
+                # RISK DRIVERS
+                st.markdown("---")
+                st.markdown("### 🔍 What Drives Attrition Risk")
+                driver_analysis = scheduler.result('risk_drivers')
+                if driver_analysis is None:
+                    st.info("⏳ Driver analysis is being computed in the background.")
+                else:
+                    st.caption(f"Standardized effects of every teacher metric and performance rollup on the risk score "
+                               f"across {driver_analysis.n:,} teachers (R² = {driver_analysis.r_squared:.2f}). "
+                               f"Red raises risk, green lowers it.")
+                    if not scope.full:
+                        st.caption("ℹ️ Drivers are fitted school-wide; one slice has too few teachers for a stable fit.")
+                
+                    driver_chart1, driver_chart2 = st.columns([3, 2])
+                
+                    with driver_chart1:
+                        st.markdown("#### Feature Importance")
+                        st.plotly_chart(charts.create_driver_importance_chart(driver_analysis), use_container_width=True)
+                
+                    with driver_chart2:
+                        st.markdown("#### Correlation Matrix")
+                        st.plotly_chart(charts.create_driver_correlation_chart(driver_analysis), use_container_width=True)
+                
+                # HIGH RISK TEACHERS
+                st.markdown("---")
+                st.markdown("### 🚨 High Risk Teachers - Immediate Attention Required")
+                
+                hr_display = charts.high_risk_table(
+                    leaderboards.top_frame('Attrition_Risk_Score', 'status', 'At Risk') if scope.full else t)
+                
+                if len(hr_display) > 0:
+                    st.dataframe(hr_display, use_container_width=True, height=400, hide_index=True)
+                    
+                    st.warning(f"⚠️ {len(hr_display)} teachers require immediate attention and intervention.")
+                else:
+                    st.success("✅ No high-risk teachers identified! Great work on employee retention.")
+        
+        # ========== COMPARE TAB ==========
+        if tabs[4].open:
+            with tabs[4]:
+                st.markdown("## ⚖️ Teacher Comparison")
+                st.markdown(f"_Compare up to {charts.MAX_COMPARE} teachers side by side_")
+                
+                compare_col1, compare_col2 = st.columns([1, 3])
+                
+                with compare_col1:
+                    compare_mode = st.radio("Compare by", ["Teachers", "Subject", "Section"], key="compare_mode")
+                
+                with compare_col2:
+                    if compare_mode == "Teachers":
+                        teacher_options = teachers['Teacher_ID'].tolist()
+                        teacher_names = dict(zip(teachers['Teacher_ID'], teachers['Teacher_Name']))
+                        st.session_state.setdefault("compare_teachers", teacher_options[:3])
+                        selected_ids = st.multiselect(
+                            "Select Teachers", teacher_options,
+                            format_func=lambda tid: f"{teacher_names[tid]} ({tid})",
+                            max_selections=charts.MAX_COMPARE, key="compare_teachers"
+                        )
+                        compared = teachers[teachers['Teacher_ID'].isin(selected_ids)]
+                    elif compare_mode == "Subject":
+                        compare_subject = st.selectbox("Select Subject", sorted(teachers['Subject'].unique().tolist()),
+                                                       key="compare_subject")
+                        compared = teachers[teachers['Subject'] == compare_subject]
+                    else:
+                        compare_section = st.selectbox("Select Section", sorted(teachers['Sections_Taught'].unique().tolist()),
+                                                       key="compare_section")
+                        compared = teachers[teachers['Sections_Taught'] == compare_section]
+                
+                if len(compared) > charts.MAX_COMPARE:
+                    st.info(f"ℹ️ Showing the top {charts.MAX_COMPARE} of {len(compared)} teachers by teaching score.")
+                    compared = compared.nlargest(charts.MAX_COMPARE, 'Teaching_Score_Internal')
+                
+                if len(compared) > 0:
+                    st.markdown("#### Performance Radar")
+                    st.plotly_chart(charts.create_comparison_radar_chart(compared), use_container_width=True)
+                    
+                    cmp_col1, cmp_col2 = st.columns(2)
+                    
+                    with cmp_col1:
+                        st.markdown("#### Teaching Score Comparison")
+                        st.plotly_chart(charts.create_score_comparison_chart(compared), use_container_width=True)
+                    
+                    with cmp_col2:
+                        st.markdown("#### Rating Scores Comparison")
+                        st.plotly_chart(charts.create_rating_comparison_chart(compared), use_container_width=True)
+                else:
+                    st.warning("❌ Select at least one teacher to compare.")
+            
+        # ========== STUDENTS TAB ==========
+        if tabs[5].open:
+            with tabs[5]:
+                st.markdown("## 🎒 Student Drill-down")
+                st.markdown("_Search a student and review their score, attendance and late history_")
+                
+                stu_col1, stu_col2 = st.columns([1, 2])
+                
+                with stu_col1:
+                    student_query = st.text_input("🔍 Search student by name or ID", placeholder="e.g. S0042 or Harsh",
+                                                  key="student_search")
+                
+                matches = student_index.search(student_query, within=scope.student_rows)
+                
+                with stu_col2:
+                    if len(matches) > 0:
+                        match_labels = dict(zip(matches['Student_ID'],
+                                                matches['Student_Name'] + " · Section " + matches['Section'].astype(str)))
+                        selected_student = st.selectbox("Select Student", matches['Student_ID'].tolist(),
+                                                        format_func=lambda sid: f"{match_labels[sid]} ({sid})",
+                                                        key="student_pick",
+                                                        on_change=lambda: audit('student_view',
+                                                                                student_id=st.session_state.student_pick))
+                    else:
+                        selected_student = None
+                        st.warning("❌ No students found matching your search.")
+                
+                if selected_student is not None:
+                    student = student_index.student(selected_student)
+                    history = student_index.history(selected_student, within=scope.perf_rows)
+                    
+                    stu_kpi_cols = st.columns(5)
+                    present_rate = (history['Attendance'] == 'Present').mean() * 100 if len(history) > 0 else 0
+                    student_kpis = [
+                        ("🎒 Section", student['Section'], f"Since {student['Admission_Date']}"),
+                        ("📋 Records", len(history), "Performance rows"),
+                        ("📈 Avg Score", f"{history['Score'].mean():.1f}" if len(history) > 0 else "N/A", "Out of 100"),
+                        ("✅ Attendance", f"{present_rate:.1f}%", "Present"),
+                        ("🕐 Late Total", int(history['Late_Count'].sum()), "Times"),
+                    ]
+                    for col, (label, value, delta) in zip(stu_kpi_cols, student_kpis):
+                        with col:
+                            st.metric(label, value, delta)
+                    
+                    if len(history) > 0:
+                        hist_col1, hist_col2 = st.columns(2)
+                        
+                        with hist_col1:
+                            st.markdown("#### Score History")
+                            st.plotly_chart(charts.create_student_score_chart(history), use_container_width=True)
+                        
+                        with hist_col2:
+                            st.markdown("#### Late Arrival History")
+                            st.plotly_chart(charts.create_student_late_chart(history), use_container_width=True)
+                        
+                        st.markdown("#### 👨‍🏫 By Teacher")
+                        breakdown = StudentIndex.teacher_breakdown(history, teachers_df)
+                        breakdown = breakdown[['Teacher_ID', 'Teacher_Name', 'Subject', 'Records', 'Avg_Score',
+                                               'Attendance_Rate', 'Late_Total', 'Last_Seen']]
+                        breakdown.columns = ['ID', 'Teacher', 'Subject', 'Records', 'Avg Score',
+                                             'Attendance %', 'Late Total', 'Last Record']
+                        st.dataframe(breakdown.round(1), use_container_width=True, hide_index=True)
+                        
+                        with st.expander("📋 All Records"):
+                            st.dataframe(history, use_container_width=True, hide_index=True)
+                    else:
+                        st.info("ℹ️ No performance records for this student yet.")
+            
+        # ========== AUDIT TAB (Admin only) ==========
+        if st.session_state.role == "Admin" and tabs[6].open:
+            with tabs[6]:
+                st.markdown("## 🛡️ Access Audit Log")
+                st.markdown("_Logins, tab views, student lookups and exports across all sessions_")
+                
+                audit_col1, audit_col2, audit_col3 = st.columns([1, 2, 1])
+                
+                with audit_col1:
+                    st.session_state.setdefault("audit_window", "Last 24 hours")
+                    audit_window = st.selectbox("Time Window", ["Last hour", "Last 24 hours", "Last 7 days", "All"],
+                                                key="audit_window")
+                with audit_col2:
+                    st.session_state.setdefault("audit_events", AUDIT_EVENTS)
+                    audit_events = st.multiselect("Events", AUDIT_EVENTS, key="audit_events")
+                with audit_col3:
+                    audit_user = st.text_input("User", placeholder="Any user", key="audit_user")
+                
+                window_seconds = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "All": None}
+                window = window_seconds[audit_window]
+                events = audit_log.query(start=datetime.now().timestamp() - window if window else None,
+                                         events=audit_events, user=audit_user.strip() or None, limit=1000)
+                
+                audit_kpi_cols = st.columns(4)
+                failed_logins = sum(1 for e in events if e['event'] == 'login' and e.get('outcome') == 'failure')
+                audit_kpis = [
+                    ("📜 Events", len(events), audit_window),
+                    ("🔐 Failed Logins", failed_logins, "Attempts"),
+                    ("⬇️ Exports", sum(1 for e in events if e['event'] == 'export'), "Downloads"),
+                    ("👥 Users", len({e.get('user') for e in events}), "Distinct"),
+                ]
+                for col, (label, value, delta) in zip(audit_kpi_cols, audit_kpis):
+                    with col:
+                        st.metric(label, value, delta)
+                
+                if events:
+                    audit_df = pd.DataFrame(events)
+                    audit_df.insert(0, 'time', [datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+                                                for ts in audit_df.pop('ts')])
+                    st.dataframe(audit_df.astype(str), use_container_width=True, height=400, hide_index=True)
+                else:
+                    st.info("ℹ️ No audit events in this window.")
     
     # ========== TEACHER PROFILE TAB (Only for Teachers) ==========
         # ========== TEACHER PROFILE TAB (Enhanced with more columns) ==========
@@ -704,8 +1099,8 @@ else:
             st.markdown("## 👤 My Profile")
             st.markdown("_Your personal teaching profile and performance analytics_")
             
-            # Get current teacher's data using teacher_id
-            current_teacher_data = teachers_df[teachers_df['Teacher_ID'] == st.session_state.teacher_id]
+            # Own teacher row, resolved into the login's access scope
+            current_teacher_data = scope.teachers
             
             if len(current_teacher_data) > 0:
                 teacher = current_teacher_data.iloc[0]
@@ -714,40 +1109,25 @@ else:
                 profile_col1, profile_col2, profile_col3 = st.columns([1, 2, 1])
                 
                 with profile_col1:
-                    st.markdown(f"""
-                        <div style='text-align: center; padding: 20px;'>
-                            <img src="{teacher['Avatar_URL']}" style='width: 150px; height: 150px; border-radius: 50%; border: 4px solid #c500ff;'>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(templates.render('avatar', avatar_url=teacher['Avatar_URL'],
+                                                 name=teacher['Teacher_Name']), unsafe_allow_html=True)
                 
                 with profile_col2:
-                    st.markdown(f"""
-                        <div style='padding: 20px;'>
-                            <h2 style='color: #c500ff; margin: 0;'>{teacher['Teacher_Name']}</h2>
-                            <p style='color: #00ff88; font-size: 18px; margin: 5px 0;'>📚 {teacher['Subject']}</p>
-                            <p style='color: #bdc3c7; margin: 10px 0;'>🆔 ID: {teacher['Teacher_ID']}</p>
-                            <p style='color: #bdc3c7; margin: 5px 0;'>📍 Status: 
-                                <span style='color: #00ff88;'>{teacher['Status']}</span>
-                            </p>
-                            <p style='color: #bdc3c7; margin: 5px 0;'>🎓 Qualification: 
-                                <span style='color: #ff9500;'>{teacher['Qualification']}</span>
-                            </p>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(templates.render(
+                        'profile_header',
+                        name=teacher['Teacher_Name'],
+                        subject=teacher['Subject'],
+                        teacher_id=teacher['Teacher_ID'],
+                        status=teacher['Status'],
+                        qualification=teacher['Qualification']
+                    ), unsafe_allow_html=True)
                 
                 with profile_col3:
-                    st.markdown(f"""
-                        <div style='text-align: center; padding: 20px; background: rgba(197, 0, 255, 0.1); border-radius: 10px; border: 1px solid #c500ff;'>
-                            <div style='font-size: 12px; color: #bdc3c7;'>Total Experience</div>
-                            <div style='font-size: 32px; color: #c500ff; font-weight: bold;'>{teacher['Total_Experience_Years']}</div>
-                            <div style='font-size: 12px; color: #bdc3c7;'>Years</div>
-                            <div style='margin-top: 15px; padding-top: 15px; border-top: 1px solid rgba(197, 0, 255, 0.5);'>
-                                <div style='font-size: 12px; color: #bdc3c7;'>At Current School</div>
-                                <div style='font-size: 24px; color: #00ff88; font-weight: bold;'>{teacher['Experience_Current_School_Years']}</div>
-                                <div style='font-size: 12px; color: #bdc3c7;'>Years</div>
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(templates.render(
+                        'experience',
+                        total=teacher['Total_Experience_Years'],
+                        current=teacher['Experience_Current_School_Years']
+                    ), unsafe_allow_html=True)
                 
                 st.divider()
                 
@@ -801,138 +1181,62 @@ else:
                 # ==================== CLASSES & SECTIONS ====================
                 st.markdown("### 📚 Assignment Information")
                 
-                classes_sections_col1, classes_sections_col2, classes_sections_col3 = st.columns(3)
-                
-                with classes_sections_col1:
-                    st.markdown(f"""
-                        <div style='background: rgba(0, 255, 136, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #00ff88;'>
-                            <b style='color: #00ff88;'>📖 Classes Taught</b><br>
-                            <p style='color: #c500ff; font-size: 24px; margin: 8px 0; font-weight: bold;'>{teacher['Classes_Taught']}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with classes_sections_col2:
-                    st.markdown(f"""
-                        <div style='background: rgba(255, 149, 0, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #ff9500;'>
-                            <b style='color: #ff9500;'>👥 Sections Taught</b><br>
-                            <p style='color: #c500ff; font-size: 24px; margin: 8px 0; font-weight: bold;'>{teacher['Sections_Taught']}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with classes_sections_col3:
-                    st.markdown(f"""
-                        <div style='background: rgba(197, 0, 255, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #c500ff;'>
-                            <b style='color: #c500ff;'>📋 Subject</b><br>
-                            <p style='color: #00ff88; font-size: 20px; margin: 8px 0; font-weight: bold;'>{teacher['Subject']}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
+                assignment_cards = [
+                    dict(accent='green', title='📖 Classes Taught', value=teacher['Classes_Taught'], tone='purple', size='lg'),
+                    dict(accent='orange', title='👥 Sections Taught', value=teacher['Sections_Taught'], tone='purple', size='lg'),
+                    dict(accent='purple', title='📋 Subject', value=teacher['Subject'], tone='green', size='md'),
+                ]
+                for col, card in zip(st.columns(3), assignment_cards):
+                    with col:
+                        st.markdown(templates.render('info_card', note='', **card), unsafe_allow_html=True)
                 
                 st.divider()
                 
                 # ==================== PROFESSIONAL DEVELOPMENT ====================
                 st.markdown("### 🎓 Professional Development")
                 
-                prof_dev_col1, prof_dev_col2, prof_dev_col3 = st.columns(3)
-                
-                with prof_dev_col1:
-                    st.markdown(f"""
-                        <div style='background: rgba(0, 255, 136, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #00ff88;'>
-                            <b style='color: #00ff88;'>📚 Training Hours</b><br>
-                            <p style='color: #c500ff; font-size: 28px; margin: 8px 0; font-weight: bold;'>{teacher['Training_Hours_Completed']}</p>
-                            <p style='color: #bdc3c7; font-size: 12px;'>Hours Completed</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with prof_dev_col2:
-                    completion_rate = teacher['Assignment_Completion_Rate_%']
-                    st.markdown(f"""
-                        <div style='background: rgba(197, 0, 255, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #c500ff;'>
-                            <b style='color: #c500ff;'>✅ Assignment Completion</b><br>
-                            <p style='color: #00ff88; font-size: 28px; margin: 8px 0; font-weight: bold;'>{completion_rate:.1f}%</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with prof_dev_col3:
-                    st.markdown(f"""
-                        <div style='background: rgba(255, 149, 0, 0.1); padding: 20px; border-radius: 8px; border-left: 4px solid #ff9500;'>
-                            <b style='color: #ff9500;'>🎯 Co-Curricular</b><br>
-                            <p style='color: #c500ff; font-size: 28px; margin: 8px 0; font-weight: bold;'>{teacher['Contribution_CoCurricular_%']:.1f}%</p>
-                            <p style='color: #bdc3c7; font-size: 12px;'>Contribution</p>
-                        </div>
-                    """, unsafe_allow_html=True)
+                development_cards = [
+                    dict(accent='green', title='📚 Training Hours', value=teacher['Training_Hours_Completed'],
+                         tone='purple', note='Hours Completed'),
+                    dict(accent='purple', title='✅ Assignment Completion',
+                         value=f"{teacher['Assignment_Completion_Rate_%']:.1f}%", tone='green', note=''),
+                    dict(accent='orange', title='🎯 Co-Curricular',
+                         value=f"{teacher['Contribution_CoCurricular_%']:.1f}%", tone='purple', note='Contribution'),
+                ]
+                for col, card in zip(st.columns(3), development_cards):
+                    with col:
+                        st.markdown(templates.render('info_card', size='xl', **card), unsafe_allow_html=True)
                 
                 st.divider()
                 
                 # ==================== ALIGNMENT RATINGS ====================
                 st.markdown("### ⭐ Alignment & Rating Scores")
                 
-                alignment_col1, alignment_col2, alignment_col3 = st.columns(3)
-                
-                with alignment_col1:
-                    head_rating = teacher['Alignment_Head_Rating']
-                    peer_rating = teacher['Alignment_Peer_Rating']
-                    st.markdown(f"""
-                        <div style='background: rgba(0, 255, 136, 0.1); padding: 20px; border-radius: 8px;'>
-                            <b style='color: #00ff88;'>👔 Head Rating</b><br>
-                            <div style='font-size: 24px; color: #c500ff; margin: 8px 0; font-weight: bold;'>{head_rating}/5</div>
-                            <div style='color: #bdc3c7; font-size: 12px;'>{'⭐' * int(head_rating)}</div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with alignment_col2:
-                    student_rating = teacher['Alignment_Student_Rating']
-                    st.markdown(f"""
-                        <div style='background: rgba(197, 0, 255, 0.1); padding: 20px; border-radius: 8px;'>
-                            <b style='color: #c500ff;'>👨‍🎓 Student Rating</b><br>
-                            <div style='font-size: 24px; color: #00ff88; margin: 8px 0; font-weight: bold;'>{student_rating}/5</div>
-                            <div style='color: #bdc3c7; font-size: 12px;'>{'⭐' * int(student_rating)}</div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with alignment_col3:
-                    parent_rating = teacher['Alignment_Parent_Rating']
-                    st.markdown(f"""
-                        <div style='background: rgba(255, 149, 0, 0.1); padding: 20px; border-radius: 8px;'>
-                            <b style='color: #ff9500;'>👨‍👩‍👧‍👦 Parent Rating</b><br>
-                            <div style='font-size: 24px; color: #c500ff; margin: 8px 0; font-weight: bold;'>{parent_rating}/5</div>
-                            <div style='color: #bdc3c7; font-size: 12px;'>{'⭐' * int(parent_rating)}</div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                rating_cards = [
+                    ('green', '👔 Head Rating', teacher['Alignment_Head_Rating'], 'purple'),
+                    ('purple', '👨‍🎓 Student Rating', teacher['Alignment_Student_Rating'], 'green'),
+                    ('orange', '👨‍👩‍👧‍👦 Parent Rating', teacher['Alignment_Parent_Rating'], 'purple'),
+                ]
+                for col, (accent, title, rating, tone) in zip(st.columns(3), rating_cards):
+                    with col:
+                        st.markdown(templates.render('rating_card', accent=accent, title=title, rating=rating,
+                                                     tone=tone, stars='⭐' * int(rating)), unsafe_allow_html=True)
                 
                 st.divider()
                 
                 # ==================== PERSONAL INFORMATION ====================
                 st.markdown("### 👤 Personal Information")
                 
-                personal_col1, personal_col2, personal_col3 = st.columns(3)
-                
-                with personal_col1:
-                    dob = teacher.get('Date_of_Birth', 'N/A')
-                    st.markdown(f"""
-                        <div style='background: rgba(0, 255, 136, 0.1); padding: 15px; border-radius: 8px; border-left: 4px solid #00ff88;'>
-                            <b style='color: #00ff88;'>🎂 Date of Birth</b><br>
-                            <p style='color: #bdc3c7; margin: 8px 0;'>{dob}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with personal_col2:
-                    qualification = teacher['Qualification']
-                    st.markdown(f"""
-                        <div style='background: rgba(197, 0, 255, 0.1); padding: 15px; border-radius: 8px; border-left: 4px solid #c500ff;'>
-                            <b style='color: #c500ff;'>🎓 Qualification</b><br>
-                            <p style='color: #00ff88; margin: 8px 0;'>{qualification}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                with personal_col3:
-                    status = teacher['Status']
-                    status_color = "#00ff88" if status == "Active" else "#ff006b" if status == "At Risk" else "#ff9500"
-                    st.markdown(f"""
-                        <div style='background: rgba({status_color}, 0.1); padding: 15px; border-radius: 8px; border-left: 4px solid {status_color};'>
-                            <b style='color: {status_color};'>📊 Current Status</b><br>
-                            <p style='color: #bdc3c7; margin: 8px 0;'>{status}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
+                status = teacher['Status']
+                status_accent = 'green' if status == 'Active' else 'pink' if status == 'At Risk' else 'orange'
+                personal_cards = [
+                    dict(accent='green', title='🎂 Date of Birth', value=teacher.get('Date_of_Birth', 'N/A'), tone='muted'),
+                    dict(accent='purple', title='🎓 Qualification', value=teacher['Qualification'], tone='green'),
+                    dict(accent=status_accent, title='📊 Current Status', value=status, tone='muted'),
+                ]
+                for col, card in zip(st.columns(3), personal_cards):
+                    with col:
+                        st.markdown(templates.render('info_card', size='sm', note='', **card), unsafe_allow_html=True)
                 
                 st.divider()
                 
@@ -1020,40 +1324,32 @@ else:
                     risk_score = teacher['Attrition_Risk_Score']
                     if risk_score >= 4.5:
                         risk_status = "🚨 Critical"
-                        risk_color = "#c500ff"
+                        risk_accent = 'purple'
                         risk_message = "Immediate action required. Please contact HR."
                     elif risk_score >= 3:
                         risk_status = "⚠️ High"
-                        risk_color = "#ff006b"
+                        risk_accent = 'pink'
                         risk_message = "We recommend discussing your concerns with management."
                     elif risk_score >= 1.5:
                         risk_status = "ℹ️ Medium"
-                        risk_color = "#ff9500"
+                        risk_accent = 'orange'
                         risk_message = "Monitor your performance and engagement levels."
                     else:
                         risk_status = "✅ Low"
-                        risk_color = "#00ff88"
+                        risk_accent = 'green'
                         risk_message = "Keep up the excellent work!"
                     
-                    st.markdown(f"""
-                        <div style='background: rgba({risk_color}, 0.1); padding: 20px; border-radius: 8px; border: 2px solid {risk_color};'>
-                            <h4 style='color: {risk_color}; margin-top: 0;'>Risk Score: {risk_score:.2f}/5</h4>
-                            <p style='color: #bdc3c7;'>{risk_message}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(templates.render('risk_card', accent=risk_accent, score=f"{risk_score:.2f}",
+                                                 message=risk_message), unsafe_allow_html=True)
                 
                 with risk_col2:
-                    st.markdown(f"""
-                        <div style='background: rgba(197, 0, 255, 0.1); padding: 20px; border-radius: 8px; border: 1px solid #c500ff;'>
-                            <h4 style='color: #c500ff; margin-top: 0;'>📊 Quick Stats</h4>
-                            <ul style='color: #bdc3c7; margin: 10px 0;'>
-                                <li>Late Count: <b style='color: #ff9500;'>{int(teacher['Late_Count_Current_Month'])} times</b></li>
-                                <li>Assignment Completion: <b style='color: #00ff88;'>{teacher['Assignment_Completion_Rate_%']:.1f}%</b></li>
-                                <li>Training Hours: <b style='color: #c500ff;'>{teacher['Training_Hours_Completed']}</b></li>
-                                <li>Co-Curricular Contribution: <b style='color: #ff006b;'>{teacher['Contribution_CoCurricular_%']:.1f}%</b></li>
-                            </ul>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(templates.render(
+                        'quick_stats',
+                        late=int(teacher['Late_Count_Current_Month']),
+                        completion=f"{teacher['Assignment_Completion_Rate_%']:.1f}",
+                        training=teacher['Training_Hours_Completed'],
+                        cocurricular=f"{teacher['Contribution_CoCurricular_%']:.1f}"
+                    ), unsafe_allow_html=True)
                 
                 st.divider()
                 
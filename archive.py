@@ -0,0 +1,279 @@
+"""Tiered storage for performance data: hot current term, compacted cold archive.
+
+Usage:
+    python archive.py compact [--keep-terms 1] [--dry-run]
+    python archive.py stats
+
+The school year has two terms, starting in April and October. performance.csv
+(the hot tier) keeps only the latest `--keep-terms` terms and is what the
+dashboard loads into memory. `compact` moves every older, valid row into the
+cold tier:
+
+    archive/performance/year=<YYYY>/month=<MM>/part.parquet
+                              zstd-compressed rows of one month, each
+                              compaction's rows appended sorted by Date
+    archive/daily_summary-<n>.parquet
+                              rows, score sum/min/max, present count and late
+                              sum per Date, Subject and Section
+    archive/manifest.json     hot tier start, rows per partition, summary file
+
+Historical queries read the daily summary (a few rows per day, loaded once)
+or, through PerformanceArchive.read, only the month partitions overlapping
+the requested dates. Rows that fail validation stay in performance.csv so
+the validation report keeps showing them.
+
+Rows are never deduplicated: performance records have no key, and identical
+rows are separate records. Idempotency comes from the hot_start boundary
+instead. After a compaction no valid row older than hot_start is left in the
+CSV, so running it again moves nothing, and rows backfilled later are moved
+once. The manifest counts the committed rows of every partition and is
+written just before the CSV is replaced. Rows past that count were left by an
+interrupted run whose source rows are still in the CSV, so they are ignored
+by reads and dropped by the next compaction. Every compaction writes its
+daily summary to a new file that the manifest names, so the summary in use
+always matches the committed rows.
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analytics import PerformanceAggregator
+from data_loader import OUTPUT_DIR, data_path, read_tables
+from validation import validate_table
+
+ARCHIVE_DIR = os.environ.get('DASHBOARD_ARCHIVE_DIR', os.path.join(OUTPUT_DIR, 'archive'))
+
+# Months in which a term starts (April and October)
+TERM_START_MONTHS = (4, 10)
+
+SUMMARY_COLUMNS = ['Date', 'Subject', 'Section', 'Records', 'Score_Sum', 'Score_Min', 'Score_Max',
+                   'Present', 'Late_Sum']
+
+# Monthly value of each metric from the summed daily summary
+YOY_METRICS = {
+    'score': ('Score_Sum', 1),
+    'attendance_rate': ('Present', 100),
+    'late': ('Late_Sum', 1),
+}
+
+# ==================== TERMS ====================
+
+def term_start(ts, terms_back=0):
+    """First day of the term containing ts, or of the term `terms_back` terms before it"""
+    ts = pd.Timestamp(ts)
+    index = ts.year * 2 + sum(ts.month >= m for m in TERM_START_MONTHS) - 1 - terms_back
+    year, slot = divmod(index, 2)
+    return pd.Timestamp(year=year, month=TERM_START_MONTHS[slot], day=1)
+
+
+def term_label(ts):
+    """Academic term of a date, e.g. '2024-25 T1' for 2024-05-10"""
+    start = term_start(ts)
+    return f"{start.year}-{str(start.year + 1)[-2:]} T{TERM_START_MONTHS.index(start.month) + 1}"
+
+# ==================== SUMMARIES ====================
+
+def daily_summary(frame):
+    """Daily summary rows per Subject and Section of a PerformanceAggregator frame (Date index)"""
+    work = frame.reset_index()
+    work['Date'] = work['Date'].dt.normalize()
+    for col in ('Subject', 'Section'):
+        if col not in work.columns:
+            work[col] = 'N/A'
+        work[col] = work[col].fillna('N/A').astype(str)
+    summary = work.groupby(['Date', 'Subject', 'Section'], sort=True).agg(
+        Records=('Score', 'size'),
+        Score_Sum=('Score', 'sum'),
+        Score_Min=('Score', 'min'),
+        Score_Max=('Score', 'max'),
+        Present=('Present', 'sum'),
+        Late_Sum=('Late_Count', 'sum'),
+    ).reset_index()
+    return summary[SUMMARY_COLUMNS]
+
+
+def yoy_trend(summaries, metric='score', subject=None, section=None):
+    """Monthly value of a metric per year from daily summaries, as Year, Month, Value, Records"""
+    column, scale = YOY_METRICS[metric]
+    parts = [s for s in summaries if s is not None and len(s) > 0]
+    summary = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=SUMMARY_COLUMNS)
+    if subject is not None:
+        summary = summary[summary['Subject'] == subject]
+    if section is not None:
+        summary = summary[summary['Section'] == section]
+    dates = pd.to_datetime(summary['Date'])
+    monthly = summary.groupby([dates.dt.year.rename('Year'), dates.dt.month.rename('Month')])[
+        ['Records', column]].sum().reset_index()
+    monthly['Value'] = monthly[column] / monthly['Records'] * scale
+    return monthly[['Year', 'Month', 'Value', 'Records']]
+
+# ==================== COLD TIER ====================
+
+SUMMARY_FILE = 'daily_summary-{}.parquet'
+
+def _partition_path(archive_dir, year, month):
+    return os.path.join(archive_dir, 'performance', f'year={year:04d}', f'month={month:02d}', 'part.parquet')
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path + '.tmp', index=False, compression='zstd')
+    os.replace(path + '.tmp', path)
+
+
+class PerformanceArchive:
+    """Read side of the cold tier: daily summaries in memory, month partitions on demand"""
+
+    def __init__(self, archive_dir=None):
+        self.archive_dir = archive_dir or ARCHIVE_DIR
+        try:
+            with open(os.path.join(self.archive_dir, 'manifest.json')) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {'hot_start': None, 'partitions': {}}
+        # The summary named by the manifest; one written by an interrupted run is never read
+        summary_name = self.manifest.get('summary')
+        if summary_name:
+            self.summary = pd.read_parquet(os.path.join(self.archive_dir, summary_name))
+        else:
+            self.summary = pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    def __len__(self):
+        return sum(self.manifest['partitions'].values())
+
+    @property
+    def hot_start(self):
+        return pd.Timestamp(self.manifest['hot_start']) if self.manifest['hot_start'] else None
+
+    def partitions(self, start=None, end=None):
+        """(year, month) of the archived months overlapping [start, end]"""
+        start = pd.Timestamp(start).to_period('M') if start is not None else None
+        end = pd.Timestamp(end).to_period('M') if end is not None else None
+        months = []
+        for key in sorted(self.manifest['partitions']):
+            period = pd.Period(key, 'M')
+            if (start is None or period >= start) and (end is None or period <= end):
+                months.append((period.year, period.month))
+        return months
+
+    def read(self, start=None, end=None, columns=None):
+        """Archived rows with start <= Date <= end, reading only the month partitions in range"""
+        # Only the committed rows of each partition (see the module docstring)
+        frames = [pd.read_parquet(_partition_path(self.archive_dir, year, month), columns=columns)
+                  .iloc[:self.manifest['partitions'][f'{year:04d}-{month:02d}']]
+                  for year, month in self.partitions(start, end)]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        rows = pd.concat(frames, ignore_index=True)
+        if 'Date' in rows.columns:
+            dates = pd.to_datetime(rows['Date'])
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= (dates >= pd.Timestamp(start)).to_numpy()
+            if end is not None:
+                keep &= (dates <= pd.Timestamp(end)).to_numpy()
+            rows = rows[keep].reset_index(drop=True)
+        return rows
+
+# ==================== COMPACTION ====================
+
+def compact(archive_dir=None, csv_path=None, keep_terms=1, dry_run=False):
+    """Move valid rows older than the kept terms from the CSV into the archive, returning a summary dict"""
+    archive_dir = archive_dir or ARCHIVE_DIR
+    csv_path = csv_path or data_path('performance')
+    teachers_raw, students_raw, _, _ = read_tables()
+    raw = pd.read_csv(csv_path)
+
+    dates = pd.to_datetime(raw['Date'], errors='coerce', format='ISO8601')
+    if dates.notna().sum() == 0:
+        return {'hot_start': None, 'archived': 0, 'kept': len(raw), 'months': []}
+    hot_start = term_start(dates.max(), terms_back=keep_terms - 1)
+    cold = raw[(dates < hot_start).to_numpy()]
+
+    # Only valid rows go to the archive; the rest stay hot for the validation report
+    clean = {}
+    for name, table in (('teachers', teachers_raw), ('students', students_raw)):
+        clean[name], _, _ = validate_table(name, table, clean)
+    cold_clean, cold_rejected, _ = validate_table('performance', cold, clean)
+    archived_index = cold.index.difference(cold_rejected.index)
+
+    cold_clean['Date'] = pd.to_datetime(cold_clean['Date'])
+    months = cold_clean['Date'].dt.to_period('M')
+    result = {
+        'hot_start': hot_start.strftime('%Y-%m-%d'),
+        'hot_term': term_label(hot_start),
+        'archived': len(archived_index),
+        'kept': len(raw) - len(archived_index),
+        'months': sorted(str(m) for m in months.unique()),
+    }
+    if dry_run or len(archived_index) == 0:
+        return result
+
+    archive = PerformanceArchive(archive_dir)
+    manifest, summary = archive.manifest, archive.summary
+    rebuilt = []
+    for period, rows in cold_clean.groupby(months, sort=True):
+        path = _partition_path(archive_dir, period.year, period.month)
+        rows = rows.sort_values('Date', kind='stable')
+        committed = manifest['partitions'].get(str(period), 0)
+        if committed:
+            rows = pd.concat([pd.read_parquet(path).iloc[:committed], rows], ignore_index=True)
+        rows = rows.reset_index(drop=True)
+        _write_parquet(rows, path)
+        manifest['partitions'][str(period)] = len(rows)
+        frame = PerformanceAggregator(rows, clean['teachers'], clean['students']).frame
+        rebuilt.append((period, daily_summary(frame)))
+
+    # Replace the summary rows of every rewritten month
+    if len(summary) > 0:
+        summary_months = pd.to_datetime(summary['Date']).dt.to_period('M')
+        summary = summary[~summary_months.isin([period for period, _ in rebuilt])]
+    summary = pd.concat([summary] + [part for _, part in rebuilt], ignore_index=True)
+    previous_summary = manifest.get('summary')
+    manifest['generation'] = manifest.get('generation', 0) + 1
+    manifest['summary'] = SUMMARY_FILE.format(manifest['generation'])
+    _write_parquet(summary.sort_values(['Date', 'Subject', 'Section']).reset_index(drop=True),
+                   os.path.join(archive_dir, manifest['summary']))
+
+    # The hot tier is written before the manifest commits the new rows and replaced right after,
+    # so a failure before the commit leaves every row in the CSV and no committed duplicate
+    raw.drop(index=archived_index).to_csv(csv_path + '.tmp', index=False)
+    manifest['hot_start'] = result['hot_start']
+    manifest['compacted'] = datetime.now().isoformat(timespec='seconds')
+    with open(os.path.join(archive_dir, 'manifest.json.tmp'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(archive_dir, 'manifest.json.tmp'), os.path.join(archive_dir, 'manifest.json'))
+    os.replace(csv_path + '.tmp', csv_path)
+    if previous_summary:
+        os.remove(os.path.join(archive_dir, previous_summary))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact older terms of performance.csv into the archive")
+    sub = parser.add_subparsers(dest='command', required=True)
+    compact_parser = sub.add_parser('compact', help="Move terms before the kept ones into the archive")
+    compact_parser.add_argument('--keep-terms', type=int, default=1, help="Terms kept hot (default: 1)")
+    compact_parser.add_argument('--dry-run', action='store_true', help="Only report what would move")
+    sub.add_parser('stats', help="Show the archived partitions")
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        result = compact(keep_terms=args.keep_terms, dry_run=args.dry_run)
+        verb = "Would archive" if args.dry_run else "Archived"
+        print(f"📦 {verb} {result['archived']} rows ({', '.join(result['months']) or 'none'}); "
+              f"{result['kept']} rows kept hot from {result['hot_start']}")
+    else:
+        archive = PerformanceArchive()
+        print(f"🔥 Hot tier from {archive.hot_start.date() if archive.hot_start is not None else 'the first row'}")
+        for key, rows in sorted(archive.manifest['partitions'].items()):
+            print(f"  {key}  {rows:>10} rows")
+        print(f"📦 {len(archive)} archived rows, {len(archive.summary)} daily summary rows")
+
+
+if __name__ == '__main__':
+    main()
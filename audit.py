@@ -0,0 +1,209 @@
+"""Access audit trail with a non-blocking append writer.
+
+Reruns only put events on an in-memory queue; a background thread drains
+it in batches and appends them to JSONL files, so audit writes never add
+disk latency to a rerun. Each event is one line:
+
+    {"ts": 1729290000.12, "event": "login", "session": "...", "user": "admin",
+     "role": "Admin", "outcome": "success", ...}
+
+Files are append-only and rotate per day and when they reach the size limit:
+
+    audit/audit-<YYYYMMDD>-<pid>-<seq>.jsonl
+    audit/index-<YYYYMMDD>-<pid>.jsonl     one [first_ts, file, byte_offset] per batch
+
+The index is the time index used by query(): for every file it seeks to the
+last batch that starts at or before the requested start time and reads
+forward until the end time, so a query reads only the batches in its range.
+Index files are per day, so a query only opens the days it covers, and each
+AuditLog keeps what it parsed and reads only lines appended since. Days
+older than the retention period are deleted, events and index together.
+One writer per process keeps every file in time order, and several worker
+processes can share the directory.
+
+Settings come from the environment:
+    DASHBOARD_AUDIT_DIR              audit directory (default audit/)
+    DASHBOARD_AUDIT_MAX_MB           rotate files at this size (default 50)
+    DASHBOARD_AUDIT_RETENTION_DAYS   delete days older than this (default 90)
+"""
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from data_loader import DATA_DIR
+
+AUDIT_DIR = os.environ.get('DASHBOARD_AUDIT_DIR', os.path.join(DATA_DIR, 'audit'))
+
+AUDIT_EVENTS = ['login', 'logout', 'tab_view', 'export', 'student_view']
+
+
+def _day_of(name):
+    """YYYYMMDD of an audit-<day>-... or index-<day>-... file name, None for other files"""
+    parts = name.split('-')
+    if len(parts) >= 3 and parts[0] in ('audit', 'index') and len(parts[1]) == 8 and parts[1].isdigit():
+        return parts[1]
+    return None
+
+
+class AuditLog:
+    """Queue-backed audit writer with rotating JSONL files and a time index"""
+
+    def __init__(self, audit_dir=None, max_bytes=None, flush_interval=1.0, batch_size=1000, retention_days=None):
+        self.audit_dir = audit_dir or AUDIT_DIR
+        self.max_bytes = max_bytes or int(float(os.environ.get('DASHBOARD_AUDIT_MAX_MB', 50)) * 1024 * 1024)
+        self.retention_days = retention_days or int(os.environ.get('DASHBOARD_AUDIT_RETENTION_DAYS', 90))
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        os.makedirs(self.audit_dir, exist_ok=True)
+
+        self._queue = queue.Queue()
+        self._pid = os.getpid()
+        self._index_path = None
+        self._path = None
+        self._day = None
+        self._seq = 0
+        self.dropped = 0
+        self._index = {}          # index file name -> (bytes parsed, {audit file: [(first_ts, offset)]})
+        self._index_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    # ==================== PRODUCERS ====================
+
+    def log(self, event, session=None, user=None, role=None, **detail):
+        """Queue one event; never blocks on disk"""
+        self._queue.put({'ts': time.time(), 'event': event, 'session': session,
+                         'user': user, 'role': role, **detail})
+
+    def flush(self):
+        """Block until every queued event is on disk"""
+        self._queue.join()
+
+    # ==================== WRITER ====================
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except OSError:
+                # Never let a full disk or permission error kill the writer
+                self.dropped += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _target(self, ts):
+        day = datetime.fromtimestamp(ts).strftime('%Y%m%d')
+        if day != self._day:
+            self._day, self._seq = day, 0
+            self._path = None
+            self._index_path = os.path.join(self.audit_dir, f'index-{day}-{self._pid}.jsonl')
+            self._trim(day)
+        if self._path is None or (os.path.exists(self._path) and os.path.getsize(self._path) >= self.max_bytes):
+            while True:
+                self._seq += 1
+                path = os.path.join(self.audit_dir, f'audit-{day}-{self._pid}-{self._seq:03d}.jsonl')
+                if not os.path.exists(path) or os.path.getsize(path) < self.max_bytes:
+                    break
+            self._path = path
+        return self._path
+
+    def _write(self, batch):
+        path = self._target(batch[0]['ts'])
+        lines = ''.join(json.dumps(event, separators=(',', ':'), default=str) + '\n' for event in batch)
+        with open(path, 'a', encoding='utf-8') as f:
+            offset = f.tell()
+            f.write(lines)
+        with open(self._index_path, 'a') as f:
+            f.write(json.dumps([batch[0]['ts'], os.path.basename(path), offset]) + '\n')
+
+    def _trim(self, today):
+        """Delete event and index files of days past the retention period"""
+        cutoff = (datetime.strptime(today, '%Y%m%d') - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+        for name in os.listdir(self.audit_dir):
+            day = _day_of(name)
+            if day is not None and day < cutoff:
+                try:
+                    os.remove(os.path.join(self.audit_dir, name))
+                except OSError:
+                    pass  # already removed by another worker
+
+    # ==================== QUERIES ====================
+
+    def _load_index(self, start, end):
+        """Batches per audit file of the days between start and end, parsing only new index lines"""
+        # A batch is indexed under the day it starts, so the day before start may still reach into it
+        first_day = datetime.fromtimestamp(start - 86400).strftime('%Y%m%d')
+        last_day = datetime.fromtimestamp(end).strftime('%Y%m%d')
+        batches = {}
+        with self._index_lock:
+            names = [name for name in os.listdir(self.audit_dir) if name.startswith('index-')]
+            for name in set(self._index) - set(names):
+                del self._index[name]  # trimmed
+            for name in names:
+                day = _day_of(name)
+                if day is None or not first_day <= day <= last_day:
+                    continue
+                parsed, files = self._index.get(name, (0, {}))
+                try:
+                    with open(os.path.join(self.audit_dir, name), 'rb') as f:
+                        f.seek(parsed)
+                        data = f.read()
+                except OSError:
+                    continue
+                # Leave a partially written last line for the next query
+                data = data[:data.rfind(b'\n') + 1]
+                for line in data.splitlines():
+                    try:
+                        ts, file_name, offset = json.loads(line)
+                    except ValueError:
+                        continue
+                    files.setdefault(file_name, []).append((ts, offset))
+                self._index[name] = (parsed + len(data), files)
+                batches.update((file_name, list(entries)) for file_name, entries in files.items())
+        return batches
+
+    def query(self, start=None, end=None, events=None, user=None, limit=500):
+        """Events between start and end (epoch seconds), newest first"""
+        start = start if start is not None else 0.0
+        end = end if end is not None else time.time() + 1
+        results = []
+        for file_name, batches in self._load_index(start, end).items():
+            if batches[0][0] > end:
+                continue
+            times = [ts for ts, _ in batches]
+            first = max(bisect.bisect_right(times, start) - 1, 0)
+            try:
+                f = open(os.path.join(self.audit_dir, file_name), encoding='utf-8')
+            except FileNotFoundError:
+                continue  # trimmed
+            with f:
+                f.seek(batches[first][1])
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    if event['ts'] > end:
+                        break
+                    if event['ts'] < start:
+                        continue
+                    if events and event['event'] not in events:
+                        continue
+                    if user and event.get('user') != user:
+                        continue
+                    results.append(event)
+        results.sort(key=lambda e: e['ts'], reverse=True)
+        return results[:limit]
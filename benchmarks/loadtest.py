@@ -0,0 +1,334 @@
+"""Concurrent-session load test for appp.py.
+
+Usage:
+    python benchmarks/loadtest.py --sessions 20 --label baseline
+    python benchmarks/loadtest.py --sessions 20 --label after --compare benchmarks/results/<file>.json
+
+Every simulated session drives the real script through Streamlit's AppTest
+runner inside this process, so sessions share one interpreter, one GIL and
+the same st.cache_* caches exactly like sessions on a single Streamlit server.
+Network and browser rendering are not included in the timings.
+
+Flows (picked round-robin from --roles):
+    Admin / Principal: login, tab switches, search, status/subject/qualification
+                       filters, apply, CSV export, clear filters
+    Department Head /  the Admin flow, logged in with a row of
+    Section Coordinator  staff_credentials.csv (rows scoped to one slice)
+    Teacher:           login with a row of teacher_login_credentials.csv,
+                       profile refreshes
+
+The main tabs are stateful and only the open tab's body runs, so a tab switch
+is a full rerun on the server. The flow switches to another tab and back to
+Teachers, and the export step clicks the real download button (its audit
+callback and rerun). Peak RSS is sampled by a monitor thread during the run.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import data_path  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, 'appp.py')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+TEACHERS_TAB = "👨‍🏫 Teachers"
+OTHER_TABS = ["📊 Dashboard", "🕐 Attendance", "⚠️ Attrition", "⚖️ Compare", "🎒 Students"]
+
+ADMIN_USERS = {
+    'Admin': ('admin', 'admin123'),
+    'Principal': ('principal', 'principal123'),
+}
+
+# ==================== MEASUREMENT ====================
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, 0 elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return 0.0
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RssMonitor:
+    """Background thread sampling the resident set size, to catch the peak during a run"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-monitor', daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+class Recorder:
+    """Thread-safe collection of (step, latency) samples"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+        self.errors = []
+
+    def timed_run(self, at, step):
+        start = time.perf_counter()
+        at.run()
+        elapsed = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.samples.append((step, elapsed))
+            if len(at.exception) > 0:
+                self.errors.append((step, at.exception[0].value))
+        return at
+
+# ==================== SESSION FLOWS ====================
+
+def _widget(elements, label):
+    """First widget with the given label"""
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"Widget not found: {label}")
+
+
+def login(at, recorder, role, username, password):
+    at.text_input(key="login_username").input(username)
+    at.text_input(key="login_password").input(password)
+    at.selectbox[0].select(role)
+    at.button[0].click()
+    recorder.timed_run(at, 'login')
+    # st.rerun() after a successful login triggers a second script run
+    recorder.timed_run(at, 'login_redirect')
+
+
+def switch_tab(at, recorder, label):
+    at.session_state['main_tabs'] = label
+    recorder.timed_run(at, 'tab_switch')
+
+
+def admin_flow(at, recorder, rng, iterations):
+    switch_tab(at, recorder, TEACHERS_TAB)
+    subjects = [o for o in _widget(at.selectbox, "Filter by Subject").options if o != "All"]
+    qualifications = [o for o in _widget(at.selectbox, "Filter by Qualification").options if o != "All"]
+    for _ in range(iterations):
+        switch_tab(at, recorder, rng.choice(OTHER_TABS))
+        switch_tab(at, recorder, TEACHERS_TAB)
+
+        _widget(at.text_input, "🔍 Search by Name or ID").input(rng.choice(['a', 'kav', 'sh', 'T0', 'ya']))
+        recorder.timed_run(at, 'search')
+
+        _widget(at.selectbox, "Filter by Status").select(rng.choice(["Active", "At Risk", "Left"]))
+        recorder.timed_run(at, 'filter_status')
+
+        _widget(at.selectbox, "Filter by Subject").select(rng.choice(subjects))
+        recorder.timed_run(at, 'filter_subject')
+
+        _widget(at.selectbox, "Filter by Qualification").select(rng.choice(qualifications))
+        recorder.timed_run(at, 'filter_qualification')
+
+        _widget(at.button, "🔎 Apply Filters").click()
+        recorder.timed_run(at, 'apply_filters')
+
+        # Only shown when the filters match some teachers; the browser download itself is free
+        try:
+            _widget(at.get('download_button'), "⬇️ Download Filtered Data (CSV)").click()
+        except LookupError:
+            pass
+        else:
+            recorder.timed_run(at, 'export_csv')
+
+        _widget(at.text_input, "🔍 Search by Name or ID").input("")
+        for label in ("Filter by Status", "Filter by Subject", "Filter by Qualification"):
+            _widget(at.selectbox, label).select("All")
+        recorder.timed_run(at, 'clear_filters')
+
+
+def teacher_flow(at, recorder, rng, iterations):
+    for _ in range(iterations):
+        recorder.timed_run(at, 'profile_refresh')
+
+
+def run_session(role, credentials, staff, recorder, seed, iterations, timeout):
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    recorder.timed_run(at, 'first_load')
+    if role == 'Teacher':
+        row = credentials.iloc[rng.randrange(len(credentials))]
+        login(at, recorder, role, str(row['username']), str(row['password']))
+        teacher_flow(at, recorder, rng, iterations)
+    elif role not in ADMIN_USERS:
+        rows = staff[staff['Role'] == role]
+        row = rows.iloc[rng.randrange(len(rows))]
+        login(at, recorder, role, str(row['username']), str(row['password']))
+        admin_flow(at, recorder, rng, iterations)
+    else:
+        username, password = ADMIN_USERS[role]
+        login(at, recorder, role, username, password)
+        admin_flow(at, recorder, rng, iterations)
+    return at
+
+# ==================== DRIVER ====================
+
+def run_load_test(sessions, roles, iterations, seed=0, timeout=120):
+    """Run all sessions concurrently and return the summary dict"""
+    credentials = pd.read_csv(data_path('credentials'))
+    staff = pd.read_csv(data_path('staff'))
+    recorder = Recorder()
+    apps = []
+    failures = []
+
+    def worker(idx):
+        role = roles[idx % len(roles)]
+        try:
+            apps.append(run_session(role, credentials, staff, recorder, seed + idx, iterations, timeout))
+        except Exception as e:  # keep the other sessions running
+            failures.append(f"session {idx} ({role}): {e!r}")
+
+    # Warm the shared caches once so the first session does not skew p99
+    AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    rss_baseline = current_rss_mb()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+    with RssMonitor() as rss:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+    rss_peak = rss.peak
+
+    latencies = [ms for _, ms in recorder.samples]
+    per_step = {}
+    for step, ms in recorder.samples:
+        per_step.setdefault(step, []).append(ms)
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_rev': _git_rev(),
+        'sessions': sessions,
+        'roles': roles,
+        'iterations': iterations,
+        'reruns': len(latencies),
+        'wall_seconds': round(wall, 3),
+        'throughput_reruns_per_s': round(len(latencies) / wall, 2) if wall > 0 else 0,
+        'latency_ms': _latency_summary(latencies),
+        'per_step_latency_ms': {step: _latency_summary(v) for step, v in sorted(per_step.items())},
+        'rss_baseline_mb': round(rss_baseline, 1),
+        'rss_peak_mb': round(rss_peak, 1),
+        'memory_per_session_mb': round((rss_peak - rss_baseline) / max(len(apps), 1), 2),
+        'app_exceptions': [f"{step}: {msg}" for step, msg in recorder.errors][:20],
+        'failed_sessions': failures,
+    }
+
+
+def _latency_summary(values):
+    return {
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'mean': round(statistics.fmean(values), 2) if values else 0.0,
+        'count': len(values),
+    }
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ==================== REPORTING ====================
+
+def save_results(results, label, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(out_dir, f"loadtest-{label}-{stamp}.json")
+    results = dict(results, label=label)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def print_report(results, baseline=None):
+    lat = results['latency_ms']
+    print(f"Sessions: {results['sessions']}  Reruns: {results['reruns']}  Wall: {results['wall_seconds']}s")
+    print(f"Throughput: {results['throughput_reruns_per_s']} reruns/s")
+    print(f"Rerun latency ms  p50={lat['p50']}  p95={lat['p95']}  p99={lat['p99']}")
+    print(f"Memory per session: {results['memory_per_session_mb']} MB "
+          f"(RSS {results['rss_baseline_mb']} -> {results['rss_peak_mb']} MB)")
+    for step, summary in results['per_step_latency_ms'].items():
+        print(f"  {step:<22} p50={summary['p50']:>8}  p95={summary['p95']:>8}  n={summary['count']}")
+    if results['failed_sessions'] or results['app_exceptions']:
+        print("⚠️ Errors:", *results['failed_sessions'], *results['app_exceptions'], sep='\n  ')
+
+    if baseline:
+        print(f"\nCompared with {baseline.get('label')} ({baseline.get('git_rev')}):")
+        for key in ('throughput_reruns_per_s', 'memory_per_session_mb'):
+            print(f"  {key}: {baseline[key]} -> {results[key]}")
+        for q in ('p50', 'p95', 'p99'):
+            print(f"  latency {q}: {baseline['latency_ms'][q]} -> {lat[q]} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit app")
+    parser.add_argument('--sessions', type=int, default=10, help="Simultaneous sessions (default: 10)")
+    parser.add_argument('--roles', default='Admin,Principal,Teacher',
+                        help="Comma separated role mix, assigned round-robin")
+    parser.add_argument('--iterations', type=int, default=3, help="Flow repetitions per session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument('--label', default='run', help="Name stored with the saved results")
+    parser.add_argument('--out', default=RESULTS_DIR, help="Directory for result JSON files")
+    parser.add_argument('--compare', help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    roles = [r.strip() for r in args.roles.split(',') if r.strip()]
+    results = run_load_test(args.sessions, roles, args.iterations, args.seed, args.timeout)
+    path = save_results(results, args.label, args.out)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"\n✅ Results saved to {path}")
+
+
+if __name__ == '__main__':
+    main()
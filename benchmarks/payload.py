@@ -0,0 +1,115 @@
+"""Per-rerun payload size benchmark.
+
+Usage:
+    python benchmarks/payload.py --label after [--compare benchmarks/results/<file>.json]
+
+Logs in as each role through Streamlit's AppTest runner and measures what
+one rerun sends to the browser: the serialized size of every element proto,
+the part of it that is st.markdown HTML (theme CSS plus HTML fragments), and
+the server time spent in the rerun. Results are saved as JSON next to the
+load test results.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadtest import APP_PATH, RESULTS_DIR, _git_rev  # noqa: E402
+
+ROLES = {
+    'Admin': ('admin', 'admin123'),
+    'Teacher': ('T001', '9593'),
+}
+
+
+def _elements(node):
+    """All leaf elements below an AppTest tree node"""
+    children = getattr(node, 'children', None)
+    if not children:
+        yield node
+        return
+    for child in children.values():
+        yield from _elements(child)
+
+
+def measure_rerun(at):
+    """Serialized bytes of one rerun split into total and markdown HTML"""
+    total = markdown = markdown_count = 0
+    for element in _elements(at._tree):
+        proto = getattr(element, 'proto', None)
+        if proto is None:
+            continue
+        size = len(proto.SerializeToString())
+        total += size
+        if element.type == 'markdown':
+            markdown += size
+            markdown_count += 1
+    return {'element_bytes': total, 'markdown_bytes': markdown, 'markdown_elements': markdown_count}
+
+
+def run_role(role, reruns, timeout):
+    username, password = ROLES[role]
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    at.text_input(key="login_username").input(username)
+    at.text_input(key="login_password").input(password)
+    at.selectbox[0].select(role)
+    at.button[0].click().run()
+    at.run()
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    result = measure_rerun(at)
+    result['rerun_ms_median'] = round(statistics.median(timings), 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-rerun payload size for each role")
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--out', default=RESULTS_DIR)
+    parser.add_argument('--compare', help="Earlier payload JSON to compare against")
+    args = parser.parse_args()
+
+    results = {
+        'label': args.label,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_rev': _git_rev(),
+        'roles': {role: run_role(role, args.reruns, args.timeout) for role in ROLES},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for role, r in results['roles'].items():
+        print(f"{role:<8} elements={r['element_bytes']:>8} B  markdown={r['markdown_bytes']:>7} B "
+              f"({r['markdown_elements']} blocks)  rerun={r['rerun_ms_median']} ms")
+        if baseline and role in baseline['roles']:
+            b = baseline['roles'][role]
+            print(f"{'':<8} vs {baseline['label']}: elements {b['element_bytes']} -> {r['element_bytes']} B, "
+                  f"markdown {b['markdown_bytes']} -> {r['markdown_bytes']} B, "
+                  f"rerun {b['rerun_ms_median']} -> {r['rerun_ms_median']} ms")
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"payload-{args.label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {path}")
+
+
+if __name__ == '__main__':
+    main()
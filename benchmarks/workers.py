@@ -0,0 +1,113 @@
+"""Throughput scaling across worker processes.
+
+Usage:
+    python benchmarks/workers.py --workers 1,2,4 --sessions 4 --label after
+
+For each worker count N the data is published once (shared_data.publish)
+and N processes run the load test session flows against it in parallel,
+each attached to the published directory exactly like a serve.py worker.
+Total throughput is all reruns divided by the slowest worker's wall time,
+and the per-worker proportional set size (PSS) shows how much memory the
+workers share. With perfect scaling, throughput grows linearly with N up
+to the number of cores.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadtest import RESULTS_DIR, _git_rev  # noqa: E402
+
+
+def pss_mb():
+    """Proportional set size of this process in MB (shared pages split between their users)"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float('nan')
+
+
+def _worker(shared_dir, sessions, roles, iterations, seed, queue):
+    # Must be set before appp (and columnar_cache) are imported by AppTest
+    os.environ['DASHBOARD_SHARED_DIR'] = shared_dir
+    from benchmarks.loadtest import run_load_test
+    result = run_load_test(sessions, roles, iterations, seed=seed)
+    result['pss_mb'] = round(pss_mb(), 1)
+    queue.put(result)
+
+
+def run_workers(shared_dir, workers, sessions, roles, iterations):
+    """Run the session flows in `workers` processes at once and combine their results"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(shared_dir, sessions, roles, iterations, i * 1000, queue))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    reruns = sum(r['reruns'] for r in results)
+    wall = max(r['wall_seconds'] for r in results)
+    return {
+        'workers': workers,
+        'sessions_per_worker': sessions,
+        'reruns': reruns,
+        'wall_seconds': wall,
+        'throughput_reruns_per_s': round(reruns / wall, 2) if wall > 0 else 0,
+        'p95_ms': max(r['latency_ms']['p95'] for r in results),
+        'pss_per_worker_mb': round(sum(r['pss_mb'] for r in results) / len(results), 1),
+        'errors': [e for r in results for e in r['failed_sessions'] + r['app_exceptions']][:20],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling across worker processes")
+    parser.add_argument('--workers', default='1,2,4', help="Comma separated worker counts")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent sessions per worker")
+    parser.add_argument('--roles', default='Admin,Principal,Teacher')
+    parser.add_argument('--iterations', type=int, default=2)
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--out', default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    from shared_data import publish
+    shared_dir = publish()
+    roles = args.roles.split(',')
+
+    runs = []
+    for workers in [int(w) for w in args.workers.split(',')]:
+        run = run_workers(shared_dir, workers, args.sessions, roles, args.iterations)
+        runs.append(run)
+        speedup = run['throughput_reruns_per_s'] / runs[0]['throughput_reruns_per_s'] if runs[0]['throughput_reruns_per_s'] else 0
+        print(f"{workers:>3} workers  {run['throughput_reruns_per_s']:>8} reruns/s  x{speedup:.2f}  "
+              f"p95={run['p95_ms']} ms  PSS/worker={run['pss_per_worker_mb']} MB")
+        if run['errors']:
+            print("  ⚠️", *run['errors'], sep='\n  ')
+
+    results = {
+        'label': args.label,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_rev': _git_rev(),
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"workers-{args.label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {path} (cpu_count={os.cpu_count()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,585 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# ==================== DASHBOARD ====================
+
+# Shown in place of a mean or rate when the scope has no rows
+NO_DATA = '—'
+
+
+def _mean(values, fmt='{:.2f}'):
+    return fmt.format(values.mean()) if values.notna().any() else NO_DATA
+
+
+def dashboard_kpis(teachers, students, columns):
+    """KPI metrics shown at the top of the Dashboard tab as (label, value, delta)"""
+    at_risk_count = len(teachers[teachers['Status'] == 'At Risk'])
+    compliance = _mean(teachers['Compliance_Score'])
+    teaching = _mean(teachers['Teaching_Score_Internal'])
+    att_rate = f"{columns.rate_equal('Attendance', 'Present'):.1f}%" if len(columns) > 0 else NO_DATA
+    return [
+        ("👨‍🏫 Total Teachers", len(teachers), "Staff Members"),
+        ("👥 Total Students", len(students), "Enrolled"),
+        ("⚠️ At Risk", at_risk_count, "Teachers"),
+        ("✓ Compliance", compliance, "Out of 10"),
+        ("📈 Teaching", teaching, "Score"),
+        ("📊 Attendance", att_rate, "Present"),
+    ]
+
+
+def create_performance_trend_chart(trend_data):
+    """Average/min/max score per period from PerformanceAggregator.summary"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=trend_data['Date'], y=trend_data['mean'],
+        mode='lines+markers', name='Average Score',
+        line=dict(color='#c500ff', width=4),
+        marker=dict(size=8, color='#c500ff'),
+        fill='tozeroy', fillcolor='rgba(197, 0, 255, 0.15)'
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend_data['Date'], y=trend_data['max'],
+        mode='lines', name='Max Score',
+        line=dict(color='#00ff88', width=2, dash='dash')
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend_data['Date'], y=trend_data['min'],
+        mode='lines', name='Min Score',
+        line=dict(color='#ff006b', width=2, dash='dash')
+    ))
+
+    fig.update_layout(
+        template='plotly_dark', hovermode='x unified',
+        height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=30, b=20, l=20, r=20)
+    )
+    return fig
+
+
+SCORE_BANDS = {
+    'Excellent (90-100)': (90, 101),
+    'Good (75-89)': (75, 90),
+    'Average (60-74)': (60, 75),
+    'Below Average (<60)': (0, 60),
+}
+
+
+def score_distribution(sketch):
+    """Row counts per score band, answered from a ScoreSketch histogram"""
+    return {band: sketch.histogram.count_between(lo, hi) for band, (lo, hi) in SCORE_BANDS.items()}
+
+
+def create_score_distribution_chart(score_dist):
+    """Pie chart of score bands"""
+    fig = go.Figure(data=[go.Pie(
+        labels=list(score_dist.keys()),
+        values=list(score_dist.values()),
+        marker=dict(colors=['#00ff88', '#c500ff', '#ff006b', '#ff9500']),
+        hole=0.35,
+        textinfo='label+percent',
+        hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=400, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=30, b=20, l=20, r=20)
+    )
+    return fig
+
+
+def create_section_percentile_chart(sketch_index, group='section', values=None):
+    """Median and P90 score per section (or per value of another sketch group) from the score sketch index"""
+    sections = sketch_index.values(group) if values is None else list(values)
+    label = 'Section' if group == 'section' else group.title()
+    medians, p90s = [], []
+    for section in sections:
+        sketch = sketch_index.query(group, section)
+        median, p90 = sketch.kll.quantiles([0.5, 0.9])
+        medians.append(median)
+        p90s.append(p90)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=sections, y=medians, name='Median',
+        marker=dict(color='#c500ff'),
+        hovertemplate=f'<b>{label} %{{x}}</b><br>Median: %{{y:.1f}}<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        x=sections, y=p90s, name='P90',
+        marker=dict(color='#00ff88'),
+        hovertemplate=f'<b>{label} %{{x}}</b><br>P90: %{{y:.1f}}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11), barmode='group',
+        margin=dict(t=20, b=20, l=20, r=20),
+        yaxis=dict(range=[0, 100])
+    )
+    return fig
+
+
+def create_score_histogram_chart(sketch, bin_width=5):
+    """Score histogram from a ScoreSketch, unit bins regrouped to bin_width"""
+    counts = sketch.histogram.counts
+    edges = sketch.histogram.edges()
+    starts = edges[:-1:bin_width]
+    totals = [counts[i:i + bin_width].sum() for i in range(0, len(counts), bin_width)]
+
+    fig = go.Figure(data=[go.Bar(
+        x=starts, y=totals,
+        width=bin_width * 0.9, offset=0,
+        marker=dict(color='#c500ff', line=dict(color='#c500ff', width=1)),
+        hovertemplate='<b>Score %{x}+</b><br>Count: %{y}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
+    return fig
+
+
+def create_subject_distribution_chart(teachers):
+    """Horizontal bar chart of teacher counts per subject"""
+    subject_dist = teachers['Subject'].value_counts().sort_values()
+
+    fig = go.Figure(data=[go.Bar(
+        y=subject_dist.index,
+        x=subject_dist.values,
+        orientation='h',
+        marker=dict(
+            color=subject_dist.values,
+            colorscale='purples',
+            line=dict(color='#c500ff', width=2)
+        ),
+        text=subject_dist.values,
+        textposition='auto',
+        hovertemplate='<b>%{y}</b><br>Teachers: %{x}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=100, r=20)
+    )
+    return fig
+
+
+def create_status_distribution_chart(teachers):
+    """Pie chart of teacher status"""
+    status_dist = teachers['Status'].value_counts()
+    colors_map = {'Active': '#00ff88', 'At Risk': '#ff9500', 'Left': '#ff006b'}
+
+    fig = go.Figure(data=[go.Pie(
+        labels=status_dist.index,
+        values=status_dist.values,
+        marker=dict(colors=[colors_map.get(s, '#c500ff') for s in status_dist.index]),
+        hole=0.35,
+        textinfo='label+value',
+        hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
+    return fig
+
+
+def create_attendance_impact_chart(attend_impact):
+    """Average score for present vs absent records from ColumnarPerformance.group_mean"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=attend_impact['Attendance'],
+        y=attend_impact['Score'],
+        name='Avg Score',
+        marker=dict(color='#c500ff'),
+        text=attend_impact['Score'].round(1),
+        textposition='auto',
+        yaxis='y'
+    ))
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        hovermode='x unified'
+    )
+    return fig
+
+
+def create_late_trend_chart(late_trend):
+    """Total late arrivals per period from PerformanceAggregator.summary"""
+    fig = go.Figure(data=[go.Scatter(
+        x=late_trend['Date'], y=late_trend['sum'],
+        mode='lines+markers', name='Late Arrivals',
+        line=dict(color='#ff9500', width=4),
+        marker=dict(size=10, color='#ff9500'),
+        fill='tozeroy', fillcolor='rgba(255, 149, 0, 0.15)',
+        hovertemplate='<b>%{x}</b><br>Late Count: %{y}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
+    return fig
+
+YEAR_COLORS = ['#c500ff', '#00ff88', '#ff9500', '#ff006b', '#00d4ff']
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+YOY_LABELS = {'score': 'Average Score', 'attendance_rate': 'Attendance %', 'late': 'Avg Late Count'}
+
+
+def create_yoy_chart(yoy, metric='score'):
+    """One line per year of a monthly metric from archive.yoy_trend"""
+    value_label = YOY_LABELS[metric]
+    fig = go.Figure()
+    years = sorted(yoy['Year'].unique())
+    for idx, year in enumerate(years):
+        rows = yoy[yoy['Year'] == year].sort_values('Month')
+        color = YEAR_COLORS[(len(years) - 1 - idx) % len(YEAR_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=[MONTH_LABELS[m - 1] for m in rows['Month']], y=rows['Value'],
+            mode='lines+markers', name=str(year),
+            line=dict(color=color, width=4 if year == years[-1] else 2),
+            marker=dict(size=8, color=color),
+            customdata=rows['Records'],
+            hovertemplate=f'<b>%{{x}} {year}</b><br>{value_label}: %{{y:.1f}}<br>Records: %{{customdata:,}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis=dict(categoryorder='array', categoryarray=MONTH_LABELS),
+        hovermode='x unified'
+    )
+    return fig
+
+# ==================== ANOMALIES ====================
+
+def create_anomaly_chart(current, threshold, id_label='Teacher', top=10):
+    """Current z-score of the most anomalous entities from AnomalyMonitor.current"""
+    rows = current.dropna(subset=['Z']).head(top).iloc[::-1]
+    colors = ['#ff006b' if z >= threshold else '#c500ff' for z in rows['Z']]
+
+    fig = go.Figure(data=[go.Bar(
+        x=rows['Z'], y=rows['ID'].astype(str), orientation='h',
+        marker=dict(color=colors),
+        customdata=np.stack([rows['Current'], rows['Baseline']], axis=-1) if len(rows) else None,
+        hovertemplate=f'<b>{id_label} %{{y}}</b><br>z: %{{x:.2f}}<br>'
+                      'Recent: %{customdata[0]:.2f}<br>Usual: %{customdata[1]:.2f}<extra></extra>'
+    )])
+    fig.add_vline(x=threshold, line=dict(color='#ff9500', width=2, dash='dash'))
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis=dict(title='z-score vs usual level')
+    )
+    return fig
+
+# ==================== ATTRITION ====================
+
+RISK_COLORS = ['#00ff88', '#ff9500', '#ff006b', '#c500ff']
+
+
+def attrition_kpis(t):
+    """KPI metrics shown at the top of the Attrition tab as (label, value, delta)"""
+    at_risk_count = len(t[t['Status'] == 'At Risk'])
+    high_risk_count = len(t[t['Attrition_Risk_Score'] >= 4.5])
+    return [
+        ("👥 Total Teachers", len(t), "Staff"),
+        ("⚠️ At Risk", at_risk_count, "Teachers"),
+        ("🔴 High Risk", high_risk_count, "Critical"),
+        ("📈 Avg Risk Score", _mean(t['Attrition_Risk_Score']), "Out of 5"),
+    ]
+
+
+def risk_distribution(t):
+    """Teacher counts per attrition risk bucket"""
+    return {
+        'Low': len(t[t['Attrition_Risk_Score'] < 1.5]),
+        'Medium': len(t[(t['Attrition_Risk_Score'] >= 1.5) & (t['Attrition_Risk_Score'] < 3.0)]),
+        'High': len(t[(t['Attrition_Risk_Score'] >= 3.0) & (t['Attrition_Risk_Score'] < 4.5)]),
+        'Critical': len(t[t['Attrition_Risk_Score'] >= 4.5])
+    }
+
+
+def create_risk_pie_chart(risk_dist):
+    """Pie chart of the risk buckets"""
+    fig = go.Figure(data=[go.Pie(
+        labels=list(risk_dist.keys()),
+        values=list(risk_dist.values()),
+        marker=dict(colors=RISK_COLORS),
+        hole=0.4, textinfo='label+value',
+        hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11)
+    )
+    return fig
+
+
+def create_risk_bar_chart(risk_dist):
+    """Bar chart of the risk buckets"""
+    fig = go.Figure(data=[go.Bar(
+        x=['Low', 'Medium', 'High', 'Critical'],
+        y=[risk_dist['Low'], risk_dist['Medium'], risk_dist['High'], risk_dist['Critical']],
+        marker=dict(color=RISK_COLORS),
+        text=[risk_dist['Low'], risk_dist['Medium'], risk_dist['High'], risk_dist['Critical']],
+        textposition='auto',
+        hovertemplate='<b>%{x}</b><br>Count: %{y}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=380, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11)
+    )
+    return fig
+
+
+def high_risk_table(t):
+    """Top 10 at-risk teachers with a risk score of 3.5 or more, display columns renamed"""
+    high_risk_teachers = t[(t['Attrition_Risk_Score'] >= 3.5) &
+                           (t['Status'] == "At Risk")].nlargest(10, 'Attrition_Risk_Score')
+
+    hr_display = high_risk_teachers[[
+        'Teacher_ID', 'Teacher_Name', 'Subject', 'Attrition_Risk_Score',
+        'Compliance_Score', 'Teaching_Score_Internal', 'Late_Count_Current_Month', 'Status'
+    ]].copy()
+
+    hr_display.columns = ['ID', 'Name', 'Subject', 'Attrition Risk', 'Compliance', 'Teaching Score', 'Late Count', 'Status']
+    return hr_display
+
+# ==================== ATTRITION DRIVERS ====================
+
+def create_driver_importance_chart(analysis, top=12):
+    """Standardized coefficient per feature (bars) with its plain correlation (markers)"""
+    effects = analysis.effects.head(top).iloc[::-1]
+    labels = [analysis.label(f) for f in effects['Feature']]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=effects['Std_Coefficient'], y=labels, orientation='h', name='Partial effect (β)',
+        marker=dict(color=np.where(effects['Std_Coefficient'] >= 0, '#ff006b', '#00ff88')),
+        customdata=effects['Partial_Correlation'],
+        hovertemplate='<b>%{y}</b><br>β: %{x:.3f}<br>Partial r: %{customdata:.3f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=effects['Correlation'], y=labels, mode='markers', name='Correlation (r)',
+        marker=dict(color='#c500ff', size=9, symbol='diamond'),
+        hovertemplate='<b>%{y}</b><br>r: %{x:.3f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        template='plotly_dark', height=max(350, 28 * len(effects)), paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis=dict(title='Effect on attrition risk (standardized)', zeroline=True, zerolinecolor='#bdc3c7'),
+        legend=dict(orientation='h', y=1.08)
+    )
+    return fig
+
+
+def create_driver_correlation_chart(analysis):
+    """Correlation heatmap of all driver features and the risk score"""
+    labels = [analysis.label(f) for f in analysis.correlation.columns]
+
+    fig = go.Figure(data=[go.Heatmap(
+        z=analysis.correlation.to_numpy(), x=labels, y=labels,
+        zmin=-1, zmax=1, colorscale=[[0, '#00ff88'], [0.5, '#1a0033'], [1, '#ff006b']],
+        hovertemplate='<b>%{y}</b> × <b>%{x}</b><br>r: %{z:.3f}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=520, paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=10),
+        margin=dict(t=20, b=20, l=20, r=20),
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+# ==================== TEACHER COMPARISON ====================
+
+RADAR_CATEGORIES = ['TD Estimated', 'TD Current', 'CCA', 'Stakeholder']
+RATING_COLUMNS = ['Alignment_Head_Rating', 'Alignment_Peer_Rating',
+                  'Alignment_Student_Rating', 'Alignment_Parent_Rating']
+RATERS = ['Head', 'Peer', 'Student', 'Parent']
+COMPARISON_COLORS = ['#00ff88', '#c500ff', '#ff006b', '#ff9500', '#00c8ff', '#ffe600']
+MAX_COMPARE = 50
+
+
+def radar_values(teachers):
+    """Radar axis values for every row of a teachers frame in one vectorized pass"""
+    stakeholder = teachers[RATING_COLUMNS].to_numpy(dtype=float).mean(axis=1) * 20
+    return np.column_stack([
+        teachers['Teaching_Score_External'].to_numpy(dtype=float),
+        teachers['Teaching_Score_Internal'].to_numpy(dtype=float),
+        teachers['Contribution_CoCurricular_%'].to_numpy(dtype=float),
+        stakeholder,
+    ])
+
+
+def _teacher_labels(teachers):
+    return (teachers['Teacher_Name'].astype(str) + ' (' + teachers['Teacher_ID'].astype(str) + ')').tolist()
+
+
+def _radar_layout(fig, showlegend):
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                tickfont=dict(color='#bdc3c7', size=10),
+                gridcolor='rgba(197, 0, 255, 0.2)'
+            ),
+            angularaxis=dict(tickfont=dict(color='#bdc3c7', size=10))
+        ),
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7'),
+        height=400 if not showlegend else 500,
+        showlegend=showlegend,
+        margin=dict(l=60, r=60, t=60, b=60)
+    )
+    return fig
+
+
+def create_radar_chart(teacher):
+    """Create a radar chart for teacher performance"""
+    values = radar_values(teacher.to_frame().T)[0]
+
+    fig = go.Figure(data=go.Scatterpolar(
+        r=values,
+        theta=RADAR_CATEGORIES,
+        fill='toself',
+        name='Performance',
+        line=dict(color='#00ff88', width=3),
+        fillcolor='rgba(0, 255, 136, 0.2)'
+    ))
+    return _radar_layout(fig, showlegend=False)
+
+
+def create_comparison_radar_chart(teachers):
+    """One radar trace per selected teacher, values computed in a single pass"""
+    values = radar_values(teachers)
+    # Close each polygon by repeating the first axis
+    closed = np.column_stack([values, values[:, :1]])
+    theta = RADAR_CATEGORIES + RADAR_CATEGORIES[:1]
+    fill = 'toself' if len(teachers) <= len(COMPARISON_COLORS) else 'none'
+
+    traces = [
+        go.Scatterpolar(
+            r=row, theta=theta, fill=fill, name=label,
+            line=dict(color=COMPARISON_COLORS[i % len(COMPARISON_COLORS)], width=2),
+            opacity=0.8
+        )
+        for i, (row, label) in enumerate(zip(closed, _teacher_labels(teachers)))
+    ]
+    return _radar_layout(go.Figure(data=traces), showlegend=True)
+
+
+def create_score_comparison_chart(teachers):
+    """Grouped internal vs external teaching score, one trace per score type"""
+    labels = _teacher_labels(teachers)
+    fig = go.Figure(data=[
+        go.Bar(
+            x=labels, y=teachers['Teaching_Score_Internal'], name='Internal Assessment',
+            marker=dict(color='#c500ff'),
+            hovertemplate='<b>%{x}</b><br>Internal: %{y:.1f}<extra></extra>'
+        ),
+        go.Bar(
+            x=labels, y=teachers['Teaching_Score_External'], name='External Assessment',
+            marker=dict(color='#00ff88'),
+            hovertemplate='<b>%{x}</b><br>External: %{y:.1f}<extra></extra>'
+        ),
+    ])
+
+    fig.update_layout(
+        template='plotly_dark', height=400, barmode='group',
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        yaxis=dict(range=[0, 100])
+    )
+    return fig
+
+
+def create_rating_comparison_chart(teachers):
+    """Grouped stakeholder ratings, one trace per rater"""
+    labels = _teacher_labels(teachers)
+    ratings = teachers[RATING_COLUMNS].to_numpy(dtype=float)
+    colors = ['#c500ff', '#00ff88', '#ff006b', '#ff9500']
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=labels, y=ratings[:, i], name=rater,
+            marker=dict(color=colors[i]),
+            hovertemplate='<b>%{x}</b><br>' + rater + ': %{y:.1f}/5<extra></extra>'
+        )
+        for i, rater in enumerate(RATERS)
+    ])
+
+    fig.update_layout(
+        template='plotly_dark', height=400, barmode='group',
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        yaxis=dict(range=[0, 5])
+    )
+    return fig
+
+# ==================== STUDENT DRILL-DOWN ====================
+
+def create_student_score_chart(history):
+    """Score per record of one student, marker colour by attendance"""
+    present = history['Attendance'] == 'Present'
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history['Date'], y=history['Score'],
+        mode='lines', name='Score', showlegend=False,
+        line=dict(color='#c500ff', width=3)
+    ))
+    for mask, name, color in [(present, 'Present', '#00ff88'), (~present, 'Absent', '#ff006b')]:
+        fig.add_trace(go.Scatter(
+            x=history['Date'][mask], y=history['Score'][mask],
+            mode='markers', name=name,
+            marker=dict(size=11, color=color, line=dict(color='#1a0033', width=1)),
+            customdata=history['Teacher_ID'][mask],
+            hovertemplate='<b>%{x|%Y-%m-%d}</b><br>Score: %{y:.0f}<br>Teacher: %{customdata}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20),
+        yaxis=dict(range=[0, 100])
+    )
+    return fig
+
+
+def create_student_late_chart(history):
+    """Late count per record of one student"""
+    fig = go.Figure(data=[go.Bar(
+        x=history['Date'], y=history['Late_Count'],
+        marker=dict(color='#ff9500'),
+        customdata=history['Teacher_ID'],
+        hovertemplate='<b>%{x|%Y-%m-%d}</b><br>Late: %{y:.0f}<br>Teacher: %{customdata}<extra></extra>'
+    )])
+
+    fig.update_layout(
+        template='plotly_dark', height=350, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#bdc3c7', size=11),
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
+    return fig
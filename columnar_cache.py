@@ -0,0 +1,260 @@
+"""Memory-mapped columnar cache of performance.csv.
+
+Layout of a cache directory:
+    current              name of the build readers open
+    v-<id>/meta.json     row count, source fingerprints and per-column encoding
+    v-<id>/<column>.bin  one raw little-endian array per column
+
+ID and category columns are dictionary encoded as int32 codes (categories in
+meta.json, -1 for missing), Date is stored as int32 days since 1970-01-01
+(INT32_MIN for missing) and numeric columns as float32. Arrays are opened
+read-only with np.memmap, so every Streamlit process reading the same cache
+shares the pages through the OS page cache and no Python objects are created
+per row.
+
+The cache is keyed on the size and mtime of performance.csv and of the
+teacher and student tables: the validated frame it is built from drops
+performance rows whose teacher or student is not in those tables.
+
+Builds are never modified once published. Each builder writes a private
+build-<id>.tmp directory, renames it to v-<id> and swaps the `current`
+pointer with os.replace, so concurrent builders and readers never see a
+half-written cache. Replaced builds are removed by a later publish; a
+reader that loses that race simply opens the new build.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import OUTPUT_DIR, data_path
+
+CACHE_ROOT = os.environ.get('DASHBOARD_CACHE_DIR', os.path.join(OUTPUT_DIR, '.cache'))
+
+DICTIONARY_COLUMNS = ['Student_ID', 'Teacher_ID', 'Attendance', 'Status']
+DAY_COLUMNS = ['Date']
+NUMERIC_COLUMNS = ['Score', 'Late_Count']
+
+MISSING_DAY = np.iinfo(np.int32).min
+FORMAT_VERSION = 3
+
+# Reference tables the validated performance rows depend on
+REFERENCE_FILES = ['teachers', 'students']
+
+CURRENT = 'current'
+
+# Finished builds younger than this may be about to be published by another builder
+UNPUBLISHED_BUILD_SECONDS = 60
+# Unfinished builds older than this belong to a builder that died
+ABANDONED_BUILD_SECONDS = 3600
+
+# ==================== BUILD ====================
+
+def _fingerprint(csv_path):
+    paths = {'performance': csv_path, **{name: data_path(name) for name in REFERENCE_FILES}}
+    fingerprint = {}
+    for name, path in paths.items():
+        stat = os.stat(path)
+        fingerprint[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return fingerprint
+
+
+def _write_array(path, values, dtype):
+    out = np.memmap(path, dtype=dtype, mode='w+', shape=(max(len(values), 1),))
+    out[:len(values)] = values
+    out.flush()
+    del out
+
+
+def build_cache(csv_path, cache_dir, df=None):
+    """Encode a performance CSV (or its already cleaned frame) as a new build and publish it, returning its directory"""
+    if df is None:
+        df = pd.read_csv(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Private build directory, so concurrent builders never write into each other's files
+    build_dir = tempfile.mkdtemp(prefix='build-', suffix='.tmp', dir=cache_dir)
+
+    columns = {}
+    for col in DICTIONARY_COLUMNS:
+        codes, categories = pd.factorize(df[col], sort=True)
+        _write_array(os.path.join(build_dir, f'{col}.bin'), codes, np.int32)
+        columns[col] = {'encoding': 'dictionary', 'dtype': 'int32',
+                        'categories': [str(c) for c in categories]}
+
+    for col in DAY_COLUMNS:
+        dates = pd.to_datetime(df[col], errors='coerce')
+        days = (dates.to_numpy(dtype='datetime64[D]').astype(np.int64))
+        days = np.where(dates.isna().to_numpy(), MISSING_DAY, days)
+        _write_array(os.path.join(build_dir, f'{col}.bin'), days, np.int32)
+        columns[col] = {'encoding': 'days', 'dtype': 'int32'}
+
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float32)
+        _write_array(os.path.join(build_dir, f'{col}.bin'), values, np.float32)
+        columns[col] = {'encoding': 'numeric', 'dtype': 'float32'}
+
+    meta = {
+        'format': FORMAT_VERSION,
+        'rows': len(df),
+        'source': _fingerprint(csv_path),
+        'columns': columns,
+    }
+    with open(os.path.join(build_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    final_dir = os.path.join(cache_dir, 'v-' + os.path.basename(build_dir)[len('build-'):-len('.tmp')])
+    os.rename(build_dir, final_dir)
+    os.chmod(final_dir, 0o755)
+    os.utime(final_dir)
+    _publish(cache_dir, final_dir)
+    return final_dir
+
+
+def _publish(cache_dir, build_dir):
+    pointer = os.path.join(cache_dir, f'{CURRENT}.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(pointer, 'w') as f:
+        f.write(os.path.basename(build_dir))
+    os.replace(pointer, os.path.join(cache_dir, CURRENT))
+
+    # Drop replaced and abandoned builds; builds of other live builders stay
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            continue
+        if name.startswith('v-') and path != build_dir and age > UNPUBLISHED_BUILD_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+        elif name.startswith('build-') and age > ABANDONED_BUILD_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_build(cache_dir):
+    """Directory of the published build, None if nothing was published yet"""
+    try:
+        with open(os.path.join(cache_dir, CURRENT)) as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    return os.path.join(cache_dir, name) if name else None
+
+
+def _is_fresh(csv_path, build_dir):
+    try:
+        with open(os.path.join(build_dir, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get('format') == FORMAT_VERSION and meta.get('source') == _fingerprint(csv_path)
+
+
+def open_performance_cache(csv_path=None, cache_dir=None, frame=None, attempts=5):
+    """Open the performance cache, (re)building it first if the CSV or a reference table changed.
+
+    ``frame`` is the validated performance DataFrame to encode instead of the
+    raw CSV; the cache is keyed on the CSV and the reference table fingerprints.
+    """
+    csv_path = csv_path or data_path('performance')
+    cache_dir = cache_dir or os.path.join(CACHE_ROOT, 'performance')
+    for attempt in range(attempts):
+        build_dir = current_build(cache_dir)
+        if build_dir is None or not _is_fresh(csv_path, build_dir):
+            build_dir = build_cache(csv_path, cache_dir, frame)
+        try:
+            return ColumnarPerformance(build_dir)
+        except FileNotFoundError:
+            # A concurrent builder replaced and removed this build while it was being opened
+            if attempt + 1 == attempts:
+                raise
+
+# ==================== READ ====================
+
+class ColumnarPerformance:
+    """Read-only zero-copy view of one build (or of the current build of a cache directory)"""
+
+    def __init__(self, cache_dir):
+        cache_dir = current_build(cache_dir) or cache_dir
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.cache_dir = cache_dir
+        self.rows = self.meta['rows']
+        self.arrays = {}
+        self._sorted_categories = {}
+        for col, info in self.meta['columns'].items():
+            mapped = np.memmap(os.path.join(cache_dir, f'{col}.bin'), dtype=info['dtype'], mode='r')
+            self.arrays[col] = mapped[:self.rows]
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, col):
+        return self.arrays[col]
+
+    def categories(self, col):
+        return self.meta['columns'][col]['categories']
+
+    def take(self, rows):
+        """In-memory view of a subset of rows with the same aggregations"""
+        view = ColumnarPerformance.__new__(ColumnarPerformance)
+        view.meta = self.meta
+        view.cache_dir = self.cache_dir
+        view.rows = len(rows)
+        view.arrays = {col: values[rows] for col, values in self.arrays.items()}
+        view._sorted_categories = self._sorted_categories
+        return view
+
+    def code_of(self, col, value):
+        """Dictionary code of a value, -1 if it never occurs"""
+        if col not in self._sorted_categories:
+            self._sorted_categories[col] = np.asarray(self.categories(col))
+        categories = self._sorted_categories[col]
+        pos = np.searchsorted(categories, value)
+        return int(pos) if pos < len(categories) and categories[pos] == value else -1
+
+    # ==================== AGGREGATIONS ====================
+
+    def count_equal(self, col, value):
+        code = self.code_of(col, value)
+        return int(np.count_nonzero(self.arrays[col] == code)) if code >= 0 else 0
+
+    def rate_equal(self, col, value):
+        """Percentage of rows where col == value"""
+        return self.count_equal(col, value) / self.rows * 100 if self.rows else 0.0
+
+    def mean(self, col):
+        return float(np.nanmean(self.arrays[col], dtype=np.float64)) if self.rows else float('nan')
+
+    def max(self, col):
+        return float(np.nanmax(self.arrays[col])) if self.rows else float('nan')
+
+    def value_counts(self, col):
+        """Row count per category, largest first like Series.value_counts"""
+        codes = self.arrays[col]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories(col)))
+        series = pd.Series(counts, index=self.categories(col), name='count')
+        return series[series > 0].sort_values(ascending=False, kind='stable')
+
+    def group_mean(self, value_col, by_col):
+        """Mean of value_col per category of by_col as a two-column DataFrame"""
+        codes = self.arrays[by_col]
+        values = self.arrays[value_col]
+        valid = (codes >= 0) & ~np.isnan(values)
+        n = len(self.categories(by_col))
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=n)
+        counts = np.bincount(codes[valid], minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        result = pd.DataFrame({by_col: self.categories(by_col), value_col: means})
+        return result[counts > 0].reset_index(drop=True)
+
+    def dates(self):
+        """Date column as datetime64[D] (NaT for missing)"""
+        days = self.arrays['Date']
+        out = days.astype('datetime64[D]')
+        out[days == MISSING_DAY] = np.datetime64('NaT')
+        return out
@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# ==================== DATA FILES ====================
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where the data files live; point it at another data set such as generate_data.py output
+DATA_FILES_DIR = os.environ.get('DASHBOARD_DATA_DIR', DATA_DIR)
+
+# Where files derived from the data (quarantine, archive, caches, job results) are written
+OUTPUT_DIR = os.environ.get('DASHBOARD_OUTPUT_DIR', DATA_FILES_DIR)
+
+DATA_FILES = {
+    'teachers': 'teachers.csv',
+    'students': 'students.csv',
+    'performance': 'performance.csv',
+    'credentials': 'teacher_login_credentials.csv',
+    'staff': 'staff_credentials.csv',
+}
+
+
+def data_path(name):
+    """Absolute path of one of the data files"""
+    return os.path.join(DATA_FILES_DIR, DATA_FILES[name])
+
+
+def read_tables():
+    """Read all data files without any Streamlit dependency"""
+    teachers_df = pd.read_csv(data_path('teachers'))
+    students_df = pd.read_csv(data_path('students'))
+    performance_df = pd.read_csv(data_path('performance'))
+    teacher_credentials = pd.read_csv(data_path('credentials'))
+    return teachers_df, students_df, performance_df, teacher_credentials
+
+
+def data_fingerprint():
+    """Sizes and modification times of the data files, a cheap check for changes"""
+    fingerprint = []
+    for name in sorted(DATA_FILES):
+        stat = os.stat(data_path(name))
+        fingerprint.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def data_version():
+    """Short content hash of the data files, changes whenever any file changes"""
+    digest = hashlib.sha1()
+    for name in sorted(DATA_FILES):
+        with open(data_path(name), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def normalize_ids(ids, reference):
+    """Zero-pad IDs like 'S050' to the digit width used in reference IDs ('S0001')"""
+    width = int(reference.astype(str).str.extract(r'(\d+)$')[0].str.len().max())
+    parts = ids.astype(str).str.extract(r'^([A-Za-z]+)(\d+)$')
+    padded = parts[0] + parts[1].str.zfill(width)
+    return padded.where(parts[1].notna(), ids)
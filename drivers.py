@@ -0,0 +1,118 @@
+"""Attrition driver analysis.
+
+Every numeric teacher metric, together with per-teacher rollups of
+performance.csv (attendance rate, average student score, average late count,
+record count), is compared against Attrition_Risk_Score:
+
+    Correlation          Pearson r with the risk score
+    Partial_Correlation  r with every other feature held fixed
+    Std_Coefficient      standardized multiple-regression coefficient (beta)
+
+The data is touched once: the rollups are bincounts over the memory-mapped
+performance columns, and the feature matrix is standardized and reduced to
+its correlation matrix with a single matrix product. Partial correlations
+and betas then come from that small (features x features) matrix, so the
+cost is O(teachers * features^2) and the result is cached by the caller.
+"""
+import numpy as np
+import pandas as pd
+
+TARGET = 'Attrition_Risk_Score'
+
+ROLLUP_FEATURES = {
+    'Attendance_Rate_%': 'Student Attendance %',
+    'Avg_Student_Score': 'Avg Student Score',
+    'Avg_Student_Late': 'Avg Student Late Count',
+    'Student_Records': 'Performance Records',
+}
+
+
+def teacher_rollups(teacher_ids, columns):
+    """Per-teacher performance rollups aligned with teacher_ids (NaN where a teacher has no records)"""
+    n = len(columns.categories('Teacher_ID'))
+    codes = columns['Teacher_ID']
+    valid = codes >= 0
+    by_teacher = codes[valid]
+
+    records = np.bincount(by_teacher, minlength=n).astype(np.float64)
+    present = np.bincount(by_teacher, weights=(columns['Attendance'][valid] == columns.code_of('Attendance', 'Present')),
+                          minlength=n)
+    score = columns['Score'][valid]
+    late = columns['Late_Count'][valid]
+    score_sum = np.bincount(by_teacher, weights=np.nan_to_num(score), minlength=n)
+    score_n = np.bincount(by_teacher, weights=~np.isnan(score), minlength=n)
+    late_sum = np.bincount(by_teacher, weights=np.nan_to_num(late), minlength=n)
+    late_n = np.bincount(by_teacher, weights=~np.isnan(late), minlength=n)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_code = {
+            'Attendance_Rate_%': present / records * 100,
+            'Avg_Student_Score': score_sum / score_n,
+            'Avg_Student_Late': late_sum / late_n,
+            'Student_Records': records,
+        }
+
+    # Map each teacher to its dictionary code; unknown teachers get NaN
+    categories = np.asarray(columns.categories('Teacher_ID'))
+    ids = np.asarray(teacher_ids, dtype=str)
+    pos = np.clip(np.searchsorted(categories, ids), 0, max(n - 1, 0))
+    known = (categories[pos] == ids) if n else np.zeros(len(ids), dtype=bool)
+    rollups = {}
+    for name, values in per_code.items():
+        aligned = np.full(len(ids), np.nan)
+        aligned[known] = values[pos[known]]
+        rollups[name] = aligned
+    return pd.DataFrame(rollups, index=getattr(teacher_ids, 'index', None))
+
+
+class DriverAnalysis:
+    """Correlation matrix and partial effects of every feature on the attrition risk score"""
+
+    def __init__(self, teachers_df, columns=None, target=TARGET):
+        features = teachers_df.select_dtypes('number').drop(columns=[target], errors='ignore')
+        if columns is not None:
+            features = features.join(teacher_rollups(teachers_df['Teacher_ID'], columns))
+        self.features = list(features.columns)
+        self.target = target
+
+        data = np.column_stack([features.to_numpy(dtype=np.float64),
+                                teachers_df[target].to_numpy(dtype=np.float64)])
+        self.n = len(data)
+        correlation = self._correlation(data)
+        self.correlation = pd.DataFrame(correlation, index=self.features + [target],
+                                        columns=self.features + [target])
+        self.effects = self._effects(correlation)
+        self.r_squared = float(np.clip(self.effects['Correlation'] @ self.effects['Std_Coefficient'], 0, 1))
+
+    @staticmethod
+    def _correlation(data):
+        # Missing values are imputed with the column mean, which adds nothing to the cross products
+        means = np.nanmean(data, axis=0)
+        z = data - means
+        np.nan_to_num(z, copy=False)
+        stds = np.sqrt((z * z).sum(axis=0) / max(len(z) - 1, 1))
+        stds[stds == 0] = 1.0
+        z /= stds
+        correlation = z.T @ z / max(len(z) - 1, 1)
+        np.fill_diagonal(correlation, 1.0)
+        return np.clip(correlation, -1.0, 1.0)
+
+    def _effects(self, correlation):
+        # pinv keeps collinear features (e.g. internal vs external scores) from blowing up
+        rxx, rxy = correlation[:-1, :-1], correlation[:-1, -1]
+        beta = np.linalg.pinv(rxx) @ rxy
+        precision = np.linalg.pinv(correlation)
+        diag = np.sqrt(np.abs(np.diag(precision)))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            partial = -precision[:-1, -1] / (diag[:-1] * diag[-1])
+        effects = pd.DataFrame({
+            'Feature': self.features,
+            'Correlation': rxy,
+            'Partial_Correlation': np.nan_to_num(np.clip(partial, -1.0, 1.0)),
+            'Std_Coefficient': beta,
+        })
+        effects['Importance'] = effects['Std_Coefficient'].abs()
+        return effects.sort_values('Importance', ascending=False, kind='stable').reset_index(drop=True)
+
+    def label(self, feature):
+        return ROLLUP_FEATURES.get(feature, feature.replace('_', ' '))
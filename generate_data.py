@@ -0,0 +1,318 @@
+"""Synthetic data generator for scale testing.
+
+Usage:
+    python generate_data.py --out generated --teachers 5000 --students 200000 --rows 100000000
+    python generate_data.py --out generated --rows 10000000 --format parquet --workers 8 --seed 7
+
+Writes every data file in the app's schemas and ID formats (T###, S####,
+padded wider when the counts need more digits):
+
+    teachers.csv, students.csv, teacher_login_credentials.csv, staff_credentials.csv
+    performance.csv                    with --format csv
+    performance/part-<NNNNN>.parquet   with --format parquet, one zstd file per chunk
+    teachers.parquet, students.parquet with --format parquet
+
+Teachers and students are built in the parent process. Performance rows are
+generated in chunks of --chunk-rows across a process pool: each worker writes
+its chunk straight to a Parquet part and a headerless CSV part, and the
+parent appends the CSV parts to performance.csv in chunk order as they
+finish. Every table and chunk draws from its own SeedSequence child, so the
+output depends only on the seed, the counts and --chunk-rows, never on the
+number of workers.
+
+Rows follow a simple model: a student's score is their ability plus the
+teacher's effect plus noise, absences follow a per-student rate, late counts
+a per-teacher rate, and each row's teacher teaches the student's section.
+Chunk i covers the i-th slice of the date range, so the file is in date
+order like a log that is only appended to. Point the app at the output with
+DASHBOARD_DATA_DIR=<out>.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from data_loader import DATA_DIR, DATA_FILES
+
+SUBJECTS = ['Biology', 'Chemistry', 'Computer Science', 'English', 'History', 'Math', 'Physics', 'Science']
+QUALIFICATIONS = ['B.A', 'B.Ed', 'B.Sc', 'M.A', 'M.Ed', 'M.Sc', 'PhD']
+CLASSES = ['VI', 'VII', 'VIII', 'IX', 'X']
+SECTIONS = ['A', 'B', 'C', 'D', 'E', 'F']
+
+FIRST_NAMES = ['Aarav', 'Aditya', 'Aishwarya', 'Ananya', 'Arjun', 'Aryan', 'Atharva', 'Divya', 'Diya', 'Harsh',
+               'Ira', 'Ishaan', 'Kavya', 'Krishna', 'Kunal', 'Meera', 'Muskan', 'Neha', 'Nikhil', 'Om', 'Pooja',
+               'Priya', 'Rahul', 'Ritika', 'Rohan', 'Sai', 'Sanjay', 'Siddhi', 'Sneha', 'Tanvi', 'Tejas', 'Vansh',
+               'Vivaan', 'Yash']
+LAST_NAMES = ['Bansal', 'Chauhan', 'Chopra', 'Deshmukh', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Kulkarni',
+              'Malhotra', 'Mehta', 'Nair', 'Pandey', 'Patel', 'Reddy', 'Sharma', 'Singh', 'Tiwari', 'Verma', 'Yadav']
+
+PERFORMANCE_COLUMNS = ['Student_ID', 'Teacher_ID', 'Date', 'Score', 'Attendance', 'Late_Count', 'Status']
+ATTENDANCE = pa.array(['Present', 'Absent'])
+STATUSES = pa.array(['Active', 'Left'])
+
+# Per-process model used by the chunk workers, set by _init_worker
+_MODEL = None
+
+
+def make_ids(prefix, count, width):
+    """IDs like T001..T200, padded to at least `width` digits"""
+    digits = max(width, len(str(count)))
+    return np.array([f'{prefix}{i:0{digits}d}' for i in range(1, count + 1)], dtype=object)
+
+
+def _names(rng, count):
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), count)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), count)]
+    return first + ' ' + last
+
+
+def _dates(rng, start, end, count):
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    return (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, count), unit='D')).strftime('%Y-%m-%d')
+
+# ==================== REFERENCE TABLES ====================
+
+def generate_teachers(rng, count):
+    """teachers.csv rows plus the hidden per-teacher effect and late rate"""
+    names = _names(rng, count)
+    current = rng.integers(1, 16, count)
+    internal = rng.uniform(60, 95, count).round(2)
+    ratings = {f'Alignment_{who}_Rating': rng.integers(1, 6, count) for who in ('Head', 'Peer', 'Student', 'Parent')}
+    late_rate = rng.gamma(2.0, 0.6, count)
+    late_month = np.minimum(rng.poisson(late_rate * 2), 5)
+    compliance = rng.uniform(5, 10, count).round(2)
+
+    # Low ratings, lateness and compliance raise the attrition risk, and the risk drives Status
+    mean_rating = np.mean(list(ratings.values()), axis=0)
+    risk = 5 * (0.5 * (5 - mean_rating) / 4 + 0.3 * late_month / 5 + 0.2 * (10 - compliance) / 5)
+    risk = np.clip(risk + rng.normal(0, 0.5, count), 0, 5).round(2)
+    pressure = risk + rng.normal(0, 1, count)
+    status = np.where(pressure > 3.3, 'Left', np.where(pressure > 2.0, 'At Risk', 'Active'))
+
+    teachers = pd.DataFrame({
+        'Teacher_ID': make_ids('T', count, 3),
+        'Teacher_Name': names,
+        'Date_of_Birth': _dates(rng, '1965-01-01', '2000-12-31', count),
+        'Qualification': rng.choice(QUALIFICATIONS, count),
+        'Subject': rng.choice(SUBJECTS, count),
+        'Experience_Current_School_Years': current,
+        'Total_Experience_Years': current + rng.integers(0, 11, count),
+        'Classes_Taught': rng.choice(CLASSES, count),
+        'Sections_Taught': rng.choice(SECTIONS, count),
+        'Compliance_Score': compliance,
+        'Training_Hours_Completed': rng.integers(5, 51, count),
+        'Assignment_Completion_Rate_%': rng.integers(60, 101, count),
+        'Teaching_Score_Internal': internal,
+        'Teaching_Score_External': np.clip(internal - rng.normal(6, 4, count), 55, 90).round(2),
+        'Contribution_CoCurricular_%': rng.integers(40, 101, count),
+        **ratings,
+        'Late_Count_Current_Month': late_month,
+        'Attrition_Risk_Score': risk,
+        'Status': status,
+        'Avatar_URL': 'https://api.dicebear.com/7.x/avataaars/png?seed=' + pd.Series(names).str.replace(' ', ''),
+    })
+    effect = (internal - 77) / 3
+    return teachers, effect, late_rate
+
+
+def generate_students(rng, count, start):
+    """students.csv rows plus the hidden per-student ability, absence rate and left flag"""
+    admitted_from = pd.Timestamp(start) - pd.DateOffset(years=5)
+    students = pd.DataFrame({
+        'Student_ID': make_ids('S', count, 4),
+        'Student_Name': _names(rng, count),
+        'Section': rng.choice(SECTIONS, count),
+        'Admission_Date': _dates(rng, admitted_from, pd.Timestamp(start) - pd.Timedelta(days=1), count),
+    })
+    ability = rng.normal(65, 12, count)
+    absence = rng.beta(2, 10, count)
+    left = rng.random(count) < 0.15
+    return students, ability, absence, left
+
+
+def generate_credentials(rng, teachers):
+    """teacher_login_credentials.csv and staff_credentials.csv for the generated tables"""
+    credentials = pd.DataFrame({
+        'Teacher_ID': teachers['Teacher_ID'],
+        'username': teachers['Teacher_ID'],
+        'password': rng.integers(1000, 10000, len(teachers)).astype(str),
+    })
+    staff = [(f"hod_{s.lower().replace(' ', '_')}", f"{s.split()[0].lower()}123", 'Department Head', s)
+             for s in SUBJECTS]
+    staff += [(f'coord_{s.lower()}', f'section{s.lower()}123', 'Section Coordinator', s) for s in SECTIONS]
+    return credentials, pd.DataFrame(staff, columns=['username', 'password', 'Role', 'Scope'])
+
+# ==================== PERFORMANCE CHUNKS ====================
+
+def _init_worker(model):
+    global _MODEL
+    # ID and date dictionaries are converted to Arrow once per process, not per chunk
+    _MODEL = dict(model, **{key: pa.array(np.asarray(model[key], dtype=object), type=pa.string())
+                            for key in ('student_ids', 'teacher_ids', 'day_labels')})
+
+
+def _dictionary(codes, values):
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), values)
+
+
+def generate_chunk(index, lo, hi, seed, out_dir, formats):
+    """Generate performance rows [lo, hi) and write them as a Parquet part and/or a CSV part"""
+    m = _MODEL
+    rng = np.random.default_rng(seed)
+    count = hi - lo
+    days = len(m['day_labels'])
+
+    # Chunk i covers the i-th slice of the date range; rows are sorted by date
+    first_day = lo * days // m['rows']
+    last_day = max(hi * days // m['rows'], first_day + 1)
+    day = np.sort(rng.integers(first_day, last_day, count))
+
+    # Each row's teacher teaches the student's section (any teacher if none does)
+    student = rng.integers(0, len(m['ability']), count)
+    order, offsets = m['section_teachers']
+    section = m['student_section'][student]
+    size = offsets[section + 1] - offsets[section]
+    pick = (rng.random(count) * np.maximum(size, 1)).astype(np.int64)
+    teacher = np.where(size > 0, order[np.minimum(offsets[section] + pick, len(order) - 1)],
+                       rng.integers(0, len(m['effect']), count))
+
+    score = m['ability'][student] + m['effect'][teacher] + rng.normal(0, 10, count)
+    absent = rng.random(count) < m['absence'][student]
+    chunk = pa.table({
+        'Student_ID': _dictionary(student, m['student_ids']),
+        'Teacher_ID': _dictionary(teacher, m['teacher_ids']),
+        'Date': _dictionary(day, m['day_labels']),
+        'Score': np.clip(np.rint(score), 0, 100).astype(np.int64),
+        'Attendance': _dictionary(absent.astype(np.int8), ATTENDANCE),
+        'Late_Count': np.minimum(rng.poisson(m['late_rate'][teacher]), 5),
+        'Status': _dictionary(m['left'][student].astype(np.int8), STATUSES),
+    })
+
+    csv_part = None
+    if 'parquet' in formats:
+        dates = (m['start_day'] + day.astype('timedelta64[D]')).astype('datetime64[ms]')
+        pq.write_table(chunk.set_column(2, 'Date', pa.array(dates)),
+                       os.path.join(out_dir, 'performance', f'part-{index:05d}.parquet'), compression='zstd')
+    if 'csv' in formats:
+        # Arrow's CSV writer is much faster than DataFrame.to_csv; it needs plain string columns
+        plain = chunk.cast(pa.schema([pa.field(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+                                      for f in chunk.schema]))
+        csv_part = os.path.join(out_dir, f'.performance-{index:05d}.csv.part')
+        pa_csv.write_csv(plain, csv_part, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    return index, count, csv_part
+
+# ==================== DRIVER ====================
+
+def generate(out_dir, teachers=200, students=1000, rows=200, start='2024-01-01', end='2024-12-31',
+             seed=0, workers=None, chunk_rows=1_000_000, formats=('csv', 'parquet'), log=print):
+    """Write a full synthetic data set to out_dir, returning a summary dict"""
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    n_chunks = max(1, -(-rows // chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(3 + n_chunks)
+    teacher_seed, student_seed, credential_seed, chunk_seeds = seeds[0], seeds[1], seeds[2], seeds[3:]
+
+    teachers_df, effect, late_rate = generate_teachers(np.random.default_rng(teacher_seed), teachers)
+    students_df, ability, absence, left = generate_students(np.random.default_rng(student_seed), students, start)
+    credentials, staff = generate_credentials(np.random.default_rng(credential_seed), teachers_df)
+    for name, table in (('teachers', teachers_df), ('students', students_df),
+                        ('credentials', credentials), ('staff', staff)):
+        table.to_csv(os.path.join(out_dir, DATA_FILES[name]), index=False)
+    if 'parquet' in formats:
+        teachers_df.to_parquet(os.path.join(out_dir, 'teachers.parquet'), index=False, compression='zstd')
+        students_df.to_parquet(os.path.join(out_dir, 'students.parquet'), index=False, compression='zstd')
+        os.makedirs(os.path.join(out_dir, 'performance'), exist_ok=True)
+
+    # Teacher rows per section in CSR form, so a chunk picks a section's teacher with one gather
+    teacher_section = pd.Categorical(teachers_df['Sections_Taught'], categories=SECTIONS).codes
+    offsets = np.zeros(len(SECTIONS) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(teacher_section, minlength=len(SECTIONS)), out=offsets[1:])
+    model = {
+        'rows': max(rows, 1),
+        'start_day': np.datetime64(pd.Timestamp(start).date(), 'D'),
+        'day_labels': pd.date_range(start, end, freq='D').strftime('%Y-%m-%d'),
+        'student_ids': students_df['Student_ID'].to_numpy(),
+        'teacher_ids': teachers_df['Teacher_ID'].to_numpy(),
+        'student_section': pd.Categorical(students_df['Section'], categories=SECTIONS).codes.astype(np.int64),
+        'section_teachers': (np.argsort(teacher_section, kind='stable'), offsets),
+        'ability': ability,
+        'absence': absence,
+        'left': left,
+        'effect': effect,
+        'late_rate': late_rate,
+    }
+
+    bounds = [(i, i * rows // n_chunks, (i + 1) * rows // n_chunks) for i in range(n_chunks)]
+    csv_path = os.path.join(out_dir, DATA_FILES['performance'])
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+        futures = [pool.submit(generate_chunk, i, lo, hi, chunk_seeds[i], out_dir, tuple(formats))
+                   for i, lo, hi in bounds]
+        csv_out = open(csv_path + '.tmp', 'wb') if 'csv' in formats else None
+        try:
+            if csv_out is not None:
+                csv_out.write((','.join(PERFORMANCE_COLUMNS) + '\n').encode())
+            # Parts are appended in chunk order while later chunks are still being generated
+            for future in futures:
+                index, count, csv_part = future.result()
+                if csv_part is not None:
+                    with open(csv_part, 'rb') as part:
+                        while block := part.read(1 << 24):
+                            csv_out.write(block)
+                    os.remove(csv_part)
+                written += count
+                elapsed = time.perf_counter() - started
+                log(f"  chunk {index + 1}/{n_chunks}: {written:,} rows, {written / elapsed:,.0f} rows/s")
+        finally:
+            if csv_out is not None:
+                csv_out.close()
+    if 'csv' in formats:
+        os.replace(csv_path + '.tmp', csv_path)
+
+    return {
+        'out_dir': out_dir,
+        'teachers': teachers,
+        'students': students,
+        'rows': written,
+        'chunks': n_chunks,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic data set for scale testing")
+    parser.add_argument('--out', default='generated', help="Output directory (default: generated)")
+    parser.add_argument('--teachers', type=int, default=200, help="Teachers (default: 200)")
+    parser.add_argument('--students', type=int, default=1000, help="Students (default: 1000)")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Performance rows (default: 1000000)")
+    parser.add_argument('--start', default='2024-01-01', help="First performance date (default: 2024-01-01)")
+    parser.add_argument('--end', default='2024-12-31', help="Last performance date (default: 2024-12-31)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="Rows per chunk (default: 1000000)")
+    parser.add_argument('--format', nargs='+', choices=['csv', 'parquet'], default=['csv', 'parquet'],
+                        help="Performance output formats (default: csv parquet)")
+    parser.add_argument('--force', action='store_true', help="Allow overwriting existing data files in --out")
+    args = parser.parse_args()
+
+    targets = [os.path.join(args.out, f) for f in DATA_FILES.values()]
+    if not args.force and (os.path.abspath(args.out) == DATA_DIR or any(os.path.exists(t) for t in targets)):
+        sys.exit(f"❌ {args.out} already has data files; pass --force to overwrite them")
+    if args.teachers < 1 or args.students < 1 or args.rows < 0 or args.chunk_rows < 1:
+        sys.exit("❌ --teachers, --students and --chunk-rows must be positive and --rows not negative")
+
+    result = generate(args.out, args.teachers, args.students, args.rows, args.start, args.end,
+                      args.seed, args.workers, args.chunk_rows, args.format)
+    print(f"✅ {result['rows']:,} performance rows, {result['teachers']:,} teachers and "
+          f"{result['students']:,} students written to {result['out_dir']} in {result['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
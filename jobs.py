@@ -0,0 +1,341 @@
+"""Background precompute scheduler.
+
+Heavy analytics run as jobs on a small thread pool in the app process, never
+inside a user's rerun. Every job is recorded in a SQLite table on local disk
+with its data version, priority, status and timings; its result is pickled
+next to the table, so finished results survive restarts and are shared by
+every worker process that uses the same jobs directory.
+
+    set_data(data)      hand over the data the app serves; a new version
+                        queues every job for it
+    submit(name)        queue a job for the current data version; a job that
+                        is already queued, running or done for that version
+                        is not queued again unless force=True
+    result(name)        latest finished result for the current data version
+                        (None until its first run finishes)
+    set_version(v)      read the results of version v whose jobs another
+                        process runs, without running any (serve.py workers)
+
+Jobs compute from the tables and engines the app has loaded (a dict with
+their 'version'), never from a read of their own, so their results always
+belong to the version the page shows. A job still queued when the app moves
+to another version is marked superseded. Jobs with an `interval` are also
+re-run on that schedule. Lower priority numbers run first.
+
+A ticker thread runs scheduled jobs and prunes old work: rows and results of
+all but the latest KEEP_VERSIONS data versions, and finished rows older than
+HISTORY_HOURS except the newest result of each job and version.
+
+Settings come from the environment:
+    DASHBOARD_JOBS_DIR            job table and results (default .cache/jobs)
+    DASHBOARD_JOB_WORKERS         worker threads (default 2)
+    DASHBOARD_JOB_TICK_SECONDS    schedule and pruning check (default 30)
+    DASHBOARD_JOB_KEEP_VERSIONS   data versions whose results are kept (default 3)
+"""
+import heapq
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from data_loader import OUTPUT_DIR
+from drivers import DriverAnalysis
+
+JOBS_DIR = os.environ.get('DASHBOARD_JOBS_DIR', os.path.join(OUTPUT_DIR, '.cache', 'jobs'))
+SNAPSHOTS_DIR = os.path.join(OUTPUT_DIR, 'snapshots')
+
+KEEP_VERSIONS = int(os.environ.get('DASHBOARD_JOB_KEEP_VERSIONS', 3))
+HISTORY_HOURS = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    pid INTEGER,
+    enqueued REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT,
+    result_path TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_lookup ON jobs (name, version, status);
+"""
+
+# ==================== JOB DEFINITIONS ====================
+
+def _score_trend(data):
+    return data['aggregator'].summary('score', 'day', ('mean', 'min', 'max'), last=30)
+
+
+def _late_trend(data):
+    return data['aggregator'].summary('late', 'day', ('sum', 'mean'), last=30)
+
+
+def _risk_drivers(data):
+    return DriverAnalysis(data['teachers'], data['columns'])
+
+
+def _snapshot_report(data):
+    from snapshot import write_snapshot
+    return write_snapshot(SNAPSHOTS_DIR, force=True, version=data['version'], tables=data['tables'],
+                          aggregator=data['aggregator'], columns=data['columns'], keep=KEEP_VERSIONS)
+
+
+JOBS = {
+    'score_trend': {'run': _score_trend, 'priority': 1, 'interval': None,
+                    'description': 'Daily score trend, last 30 days'},
+    'late_trend': {'run': _late_trend, 'priority': 1, 'interval': None,
+                   'description': 'Daily late arrivals, last 30 days'},
+    'risk_drivers': {'run': _risk_drivers, 'priority': 2, 'interval': None,
+                     'description': 'Attrition risk drivers and correlations'},
+    'snapshot_report': {'run': _snapshot_report, 'priority': 9, 'interval': 6 * 3600,
+                        'description': 'Static HTML snapshot report'},
+}
+
+# ==================== SCHEDULER ====================
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+class JobScheduler:
+    """Prioritized, deduplicated background jobs with a persistent job table"""
+
+    def __init__(self, jobs=None, jobs_dir=None, workers=None, tick=None, keep_versions=None):
+        self.jobs = dict(jobs or JOBS)
+        self.jobs_dir = jobs_dir or JOBS_DIR
+        self.workers = workers or int(os.environ.get('DASHBOARD_JOB_WORKERS', 2))
+        self.tick = tick or float(os.environ.get('DASHBOARD_JOB_TICK_SECONDS', 30))
+        self.keep_versions = keep_versions or KEEP_VERSIONS
+
+        os.makedirs(os.path.join(self.jobs_dir, 'results'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []          # heap of (priority, job_id, name, version)
+        self._results = {}        # name -> (job_id, value)
+        self._data = None
+        self._threads = []
+        self._stopped = threading.Event()
+        self.version = None
+
+        # One connection per scheduler, used by its threads one at a time
+        self._db = sqlite3.connect(os.path.join(self.jobs_dir, 'jobs.db'), timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        with self._database() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _database(self):
+        with self._db_lock:
+            try:
+                yield self._db
+            except BaseException:
+                if self._db.in_transaction:
+                    self._db.rollback()
+                raise
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        """Recover the job table and start the threads; jobs are queued once data is set"""
+        self._recover()
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True))
+        self._threads.append(threading.Thread(target=self._tick, name='job-ticker', daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _recover(self):
+        # Jobs left queued or running by a process that is gone will never finish. A row with this
+        # process's pid is from an earlier process that had the same pid, since nothing was queued yet
+        with self._database() as db:
+            rows = db.execute("SELECT id, pid FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+            dead = [row['id'] for row in rows if row['pid'] == os.getpid() or not _pid_alive(row['pid'])]
+            db.executemany("UPDATE jobs SET status = 'abandoned', finished = ? WHERE id = ?",
+                           [(time.time(), job_id) for job_id in dead])
+
+    def set_data(self, data):
+        """Use the data the app has loaded for every job, queueing all jobs when its version is new"""
+        with self._lock:
+            if data is self._data:
+                return
+            trigger = 'startup' if self._data is None else 'data_change'
+            changed = data['version'] != self.version
+            self._data, self.version = data, data['version']
+        # A version of None means the files changed while being read; the app reloads them
+        if changed and self.version is not None:
+            self.submit_all(trigger=trigger)
+
+    def set_version(self, version):
+        """Serve the results of a data version whose jobs another process runs (never started here)"""
+        with self._lock:
+            self.version = version
+
+    @property
+    def running(self):
+        """Whether this scheduler runs jobs, rather than only reading their results"""
+        return bool(self._threads)
+
+    def _tick(self):
+        while not self._stopped.wait(self.tick):
+            try:
+                self._run_due()
+                self._prune()
+            except (OSError, sqlite3.Error):
+                # The jobs directory is busy or being cleaned; try again on the next tick
+                continue
+
+    def _run_due(self):
+        if self.version is None:
+            return
+        now = time.time()
+        for name, spec in self.jobs.items():
+            if not spec.get('interval'):
+                continue
+            with self._database() as db:
+                row = db.execute("SELECT MAX(finished) AS last FROM jobs WHERE name = ? AND status = 'done'",
+                                 (name,)).fetchone()
+            if row['last'] is None or now - row['last'] >= spec['interval']:
+                self.submit(name, trigger='schedule', force=True)
+
+    def _prune(self):
+        """Drop job rows and results of old data versions and finished history past the window"""
+        cutoff = time.time() - HISTORY_HOURS * 3600
+        with self._database() as db:
+            versions = [row['version'] for row in db.execute(
+                "SELECT version FROM jobs GROUP BY version ORDER BY MAX(enqueued) DESC")]
+            old = [v for v in versions[self.keep_versions:] if v != self.version]
+            db.executemany("DELETE FROM jobs WHERE version = ? AND status NOT IN ('queued', 'running')",
+                           [(v,) for v in old])
+            db.execute(
+                "DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND finished < ? AND id NOT IN "
+                "(SELECT MAX(id) FROM jobs WHERE status = 'done' GROUP BY name, version)", (cutoff,))
+            kept = {row['id'] for row in db.execute("SELECT id FROM jobs")}
+        # Results are named <job>-<id>.pkl; .tmp files are still being written
+        results_dir = os.path.join(self.jobs_dir, 'results')
+        for name in os.listdir(results_dir):
+            stem, ext = os.path.splitext(name)
+            job_id = stem.rpartition('-')[2]
+            if ext == '.pkl' and job_id.isdigit() and int(job_id) not in kept:
+                try:
+                    os.remove(os.path.join(results_dir, name))
+                except OSError:
+                    pass
+
+    # ==================== QUEUE ====================
+
+    def submit(self, name, trigger='manual', force=False):
+        """Queue a job for the current data version, returning its id (or the existing duplicate's)"""
+        spec = self.jobs[name]
+        version = self.version
+        with self._database() as db:
+            db.execute('BEGIN IMMEDIATE')
+            statuses = ('queued', 'running') if force else ('queued', 'running', 'done')
+            existing = db.execute(
+                f"SELECT id FROM jobs WHERE name = ? AND version = ? AND status IN ({','.join('?' * len(statuses))}) "
+                "ORDER BY id DESC LIMIT 1", (name, version, *statuses)).fetchone()
+            if existing is not None:
+                db.execute('COMMIT')
+                return existing['id']
+            job_id = db.execute(
+                "INSERT INTO jobs (name, version, priority, status, trigger, pid, enqueued) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (name, version, spec['priority'], trigger, os.getpid(), time.time())).lastrowid
+            db.execute('COMMIT')
+        with self._wakeup:
+            heapq.heappush(self._queue, (spec['priority'], job_id, name, version))
+            self._wakeup.notify()
+        return job_id
+
+    def submit_all(self, trigger='manual', force=False):
+        return [self.submit(name, trigger, force) for name in self.jobs]
+
+    # ==================== WORKERS ====================
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                while not self._queue and not self._stopped.is_set():
+                    self._wakeup.wait()
+                if self._stopped.is_set():
+                    return
+                entry = heapq.heappop(self._queue)
+            self._run(entry)
+
+    def _run(self, entry):
+        _, job_id, name, version = entry
+        with self._lock:
+            data = self._data
+        if data is None or data['version'] != version:
+            # The app moved on to another version, which has its own job
+            with self._database() as db:
+                db.execute("UPDATE jobs SET status = 'superseded', finished = ? WHERE id = ?",
+                           (time.time(), job_id))
+            return
+        with self._database() as db:
+            db.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (time.time(), job_id))
+        try:
+            value = self.jobs[name]['run'](data)
+            path = os.path.join(self.jobs_dir, 'results', f'{name}-{job_id}.pkl')
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+        except Exception as e:  # a failed job must not kill the worker thread
+            with self._database() as db:
+                db.execute("UPDATE jobs SET status = 'failed', finished = ?, error = ? WHERE id = ?",
+                           (time.time(), f'{type(e).__name__}: {e}', job_id))
+            return
+        with self._lock:
+            self._results[name] = (job_id, value)
+        with self._database() as db:
+            db.execute("UPDATE jobs SET status = 'done', finished = ?, result_path = ? WHERE id = ?",
+                       (time.time(), path, job_id))
+
+    # ==================== RESULTS ====================
+
+    def result(self, name):
+        """Latest finished result of a job for the current data version"""
+        with self._database() as db:
+            row = db.execute(
+                "SELECT id, result_path FROM jobs WHERE name = ? AND version = ? AND status = 'done' "
+                "ORDER BY finished DESC LIMIT 1", (name, self.version)).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            cached = self._results.get(name)
+            if cached is not None and cached[0] == row['id']:
+                return cached[1]
+        try:
+            with open(row['result_path'], 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        with self._lock:
+            self._results[name] = (row['id'], value)
+        return value
+
+    def status(self, limit=20):
+        """Most recent jobs for the admin panel"""
+        with self._database() as db:
+            rows = db.execute(
+                "SELECT id, name, version, priority, status, trigger, enqueued, started, finished, error "
+                "FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,220 @@
+"""Precomputed top-k teacher leaderboards per (metric, group).
+
+Every (metric, group, group value) slice keeps a min-heap of its k best
+teachers plus the sorted list served to readers, so opening any leaderboard
+is a dictionary lookup. Teacher data is held as columns: the Teacher_IDs, a
+float array per metric and integer codes per group, taken from the teachers
+frame without copying its rows.
+
+refresh() moves the index to a newer teachers frame. Rows are matched on
+Teacher_ID and compared column by column in vectorized passes. Only the
+changed rows are offered to the heaps of their slices, which costs O(log k)
+each, and only a slice that had a changed or removed teacher in its top k is
+rebuilt, from that slice's rows.
+
+An index can also start from a published `ranked` dict of the same frame
+(see shared_data.py); only the heaps of those top k rows are rebuilt.
+
+Ties rank the lowest Teacher_ID first, and heap entries order the same way
+((value, reversed Teacher_ID)), so the heap always evicts the entry that
+ranks last.
+"""
+import functools
+import heapq
+import threading
+
+import numpy as np
+import pandas as pd
+
+LEADERBOARD_METRICS = {
+    'Teaching_Score_Internal': 'Internal Teaching Score',
+    'Teaching_Score_External': 'External Teaching Score',
+    'Compliance_Score': 'Compliance Score',
+    'Training_Hours_Completed': 'Training Hours',
+    'Assignment_Completion_Rate_%': 'Assignment Completion',
+    'Attrition_Risk_Score': 'Attrition Risk',
+}
+
+LEADERBOARD_GROUPS = {
+    'all': None,
+    'subject': 'Subject',
+    'qualification': 'Qualification',
+    'section': 'Sections_Taught',
+    'status': 'Status',
+}
+
+
+@functools.total_ordering
+class _Reversed:
+    """Teacher_ID that sorts in reverse, so a min-heap evicts the highest ID among ties"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+
+class _Columns:
+    """Teacher_IDs, metric values and group codes of one teachers frame"""
+
+    def __init__(self, teachers_df, metrics, groups):
+        self.frame = teachers_df
+        self.ids = teachers_df['Teacher_ID'].to_numpy()
+        self.index = pd.Index(self.ids)
+        self.scores = {m: teachers_df[m].to_numpy(dtype=float, na_value=np.nan) for m in metrics}
+        self.codes, self.labels = {}, {}
+        for group, column in groups.items():
+            if column is None:
+                self.codes[group] = np.zeros(len(teachers_df), dtype=np.intp)
+                self.labels[group] = np.array(['*'], dtype=object)
+            else:
+                codes, labels = pd.factorize(teachers_df[column])
+                self.codes[group], self.labels[group] = codes, np.asarray(labels, dtype=object)
+
+    def slices(self, group, rows=None):
+        """(value, row positions) of every group value among rows (all rows by default)"""
+        rows = np.arange(len(self.ids)) if rows is None else rows
+        codes = self.codes[group][rows]
+        rows, codes = rows[codes >= 0], codes[codes >= 0]
+        order = np.argsort(codes, kind='stable')
+        rows, codes = rows[order], codes[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        for part in np.split(rows, bounds) if len(rows) else []:
+            yield self.labels[group][self.codes[group][part[0]]], part
+
+    def top(self, metric, rows, k):
+        """Best k (value, Teacher_ID) of the given rows, best first"""
+        scores = self.scores[metric][rows]
+        valid = ~np.isnan(scores)
+        rows, scores = rows[valid], scores[valid]
+        if len(rows) > k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            above = scores > kth
+            tied = heapq.nsmallest(k - int(above.sum()), self.ids[rows[scores == kth]])
+            entries = list(zip(scores[above].tolist(), self.ids[rows[above]])) + [(kth, tid) for tid in tied]
+        else:
+            entries = list(zip(scores.tolist(), self.ids[rows]))
+        return sorted(entries, key=lambda e: (-e[0], e[1]))
+
+
+class LeaderboardIndex:
+    """Top-k teachers per metric and group slice with incremental maintenance"""
+
+    def __init__(self, teachers_df, k=10, metrics=None, groups=None, ranked=None):
+        self.k = k
+        self.metrics = list(metrics or LEADERBOARD_METRICS)
+        self.groups = dict(groups or LEADERBOARD_GROUPS)
+        self._lock = threading.Lock()
+        self.heaps = {}        # (metric, group, value) -> min-heap of (value, _Reversed(Teacher_ID))
+        self.ranked = {}       # (metric, group, value) -> tuple of Teacher_IDs, best first
+        self._columns = _Columns(teachers_df, self.metrics, self.groups)
+
+        if ranked is not None:
+            for slice_key, ids in ranked.items():
+                rows = self._columns.index.get_indexer(ids)
+                self._fill(slice_key, list(zip(self._columns.scores[slice_key[0]][rows].tolist(), ids)))
+            return
+
+        # Initial build: the first k rows of every slice
+        for group in self.groups:
+            for value, rows in self._columns.slices(group):
+                for metric in self.metrics:
+                    self._fill((metric, group, value), self._columns.top(metric, rows, self.k))
+
+    # ==================== READS ====================
+
+    def _value_key(self, group, value):
+        return '*' if self.groups[group] is None else value
+
+    def top_ids(self, metric, group='all', value=None, n=None):
+        """Teacher_IDs of the best teachers in a slice, best first"""
+        ranked = self.ranked.get((metric, group, self._value_key(group, value)), ())
+        return list(ranked[:n] if n else ranked)
+
+    def top_frame(self, metric, group='all', value=None, n=None):
+        """Rows of the best teachers in a slice as a DataFrame, best first"""
+        columns = self._columns
+        ids = self.top_ids(metric, group, value, n)
+        return columns.frame.iloc[columns.index.get_indexer(ids)].reset_index(drop=True)
+
+    def group_values(self, group):
+        return sorted(self._columns.labels[group])
+
+    # ==================== INCREMENTAL UPDATES ====================
+
+    def _rank(self, slice_key):
+        heap = self.heaps.get(slice_key, [])
+        self.ranked[slice_key] = tuple(tid.value for _, tid in sorted(heap, reverse=True))
+
+    def _fill(self, slice_key, entries):
+        if not entries:
+            self.heaps.pop(slice_key, None)
+            self.ranked.pop(slice_key, None)
+            return
+        self.heaps[slice_key] = [(score, _Reversed(tid)) for score, tid in entries]
+        heapq.heapify(self.heaps[slice_key])
+        self.ranked[slice_key] = tuple(tid for _, tid in entries)
+
+    def _offer(self, slice_key, teacher_id, score):
+        heap = self.heaps.setdefault(slice_key, [])
+        entry = (score, _Reversed(teacher_id))
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        else:
+            return
+        self._rank(slice_key)
+
+    def _changes(self, new):
+        """Row positions in `new` of added or changed teachers, and the Teacher_IDs that changed or left"""
+        old = self._columns
+        matched = old.index.get_indexer(new.index)
+        present = matched >= 0
+        changed = ~present
+        old_rows, new_rows = matched[present], np.flatnonzero(present)
+        for metric in self.metrics:
+            a, b = new.scores[metric][new_rows], old.scores[metric][old_rows]
+            changed[new_rows] |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+        for group in self.groups:
+            # Old codes translated to the new frame's codes; -1 is a missing value, -2 a label that is gone
+            translate = pd.Index(new.labels[group]).get_indexer(old.labels[group])
+            translate = np.append(np.where(translate < 0, -2, translate), -1)
+            changed[new_rows] |= new.codes[group][new_rows] != translate[old.codes[group][old_rows]]
+        kept = np.zeros(len(old.ids), dtype=bool)
+        kept[old_rows[~changed[new_rows]]] = True
+        return np.flatnonzero(changed), set(old.ids[~kept])
+
+    def refresh(self, teachers_df):
+        """Apply the teacher rows added, changed or removed since the last frame, returning how many"""
+        with self._lock:
+            if teachers_df is self._columns.frame:
+                return 0
+            new = _Columns(teachers_df, self.metrics, self.groups)
+            rows, left = self._changes(new)
+            # Slices whose top k lost or changed a member are rebuilt from all their rows
+            stale = {key for key, ranked in self.ranked.items() if not left.isdisjoint(ranked)}
+            self._columns = new
+            for group in self.groups:
+                group_stale = {(metric, value) for metric, g, value in stale if g == group}
+                if group_stale:
+                    for value, slice_rows in new.slices(group):
+                        for metric in self.metrics:
+                            if (metric, value) in group_stale:
+                                self._fill((metric, group, value), new.top(metric, slice_rows, self.k))
+                    # Slices left without any teacher
+                    for metric, value in group_stale - {(m, v) for m in self.metrics for v in new.labels[group]}:
+                        self._fill((metric, group, value), [])
+                # Changed rows enter the other slices through their heaps
+                for value, slice_rows in new.slices(group, rows):
+                    for metric in self.metrics:
+                        if (metric, value) not in group_stale:
+                            for score, tid in new.top(metric, slice_rows, self.k):
+                                self._offer((metric, group, value), tid, score)
+            return len(rows) + len(left - set(new.ids[rows]))
@@ -0,0 +1,196 @@
+"""Multi-process serving mode.
+
+Usage:
+    python serve.py --workers 4 [--port 8500] [--base-port 8501] [--proxy nginx]
+
+Streamlit runs every session of one server in a single Python process, so
+pandas work from concurrent sessions is serialized by the GIL. This launcher
+publishes the validated data once (see shared_data.py), starts one
+`streamlit run appp.py` worker per port with DASHBOARD_SHARED_DIR pointing at
+the published directory, and writes an nginx config that balances browsers
+across the workers. ip_hash keeps each client on one worker, which the
+Streamlit websocket session and its media/upload endpoints require.
+
+With --proxy nginx the proxy is started too (nginx must be on PATH);
+otherwise the config path is printed so an existing proxy can include it.
+
+The launcher also runs the host's background work once, on the published
+version: the precompute jobs (jobs.py) and the anomaly monitor following
+performance.csv. Workers read the job results of the version they serve and
+the charts and alerts the monitor writes (see shared_data.py), instead of
+each computing them.
+
+While running, the launcher republishes when the data files change. Workers
+and the background work move to the new version together: each worker on its
+next rerun, the jobs and the monitor right after the publish. Versions no
+live process uses are removed.
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+from anomalies import AnomalyMonitor
+from data_loader import DATA_DIR, data_fingerprint
+from jobs import JobScheduler
+from shared_data import SHARED_ENV, anomalies_path, attach_job_data, default_root, lease, publish, release_others
+
+APP_PATH = os.path.join(DATA_DIR, 'appp.py')
+
+# How often the data files are checked for a republish
+REPUBLISH_SECONDS = 30
+
+NGINX_TEMPLATE = """worker_processes auto;
+pid {run_dir}/nginx.pid;
+error_log {run_dir}/nginx-error.log;
+
+events {{
+    worker_connections 4096;
+}}
+
+http {{
+    access_log off;
+    client_body_temp_path {run_dir}/client_body;
+    proxy_temp_path {run_dir}/proxy;
+
+    map $http_upgrade $connection_upgrade {{
+        default upgrade;
+        '' close;
+    }}
+
+    upstream dashboard {{
+        ip_hash;
+{servers}
+    }}
+
+    server {{
+        listen {port};
+
+        location / {{
+            proxy_pass http://dashboard;
+            proxy_http_version 1.1;
+            proxy_set_header Upgrade $http_upgrade;
+            proxy_set_header Connection $connection_upgrade;
+            proxy_set_header Host $host;
+            proxy_read_timeout 86400;
+        }}
+    }}
+}}
+"""
+
+
+def write_nginx_config(run_dir, port, worker_ports):
+    """nginx config balancing the proxy port across the worker ports"""
+    servers = '\n'.join(f"        server 127.0.0.1:{p};" for p in worker_ports)
+    path = os.path.join(run_dir, 'nginx.conf')
+    with open(path, 'w') as f:
+        f.write(NGINX_TEMPLATE.format(run_dir=run_dir, port=port, servers=servers))
+    return path
+
+
+def worker_env(shared_dir):
+    """Environment of one worker: attach the published data instead of loading the CSVs"""
+    env = dict(os.environ)
+    env[SHARED_ENV] = shared_dir
+    return env
+
+
+def start_workers(shared_dir, ports):
+    env = worker_env(shared_dir)
+    processes = [
+        subprocess.Popen([sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+                          '--server.port', str(port), '--server.address', '127.0.0.1',
+                          '--server.headless', 'true'], cwd=DATA_DIR, env=env)
+        for port in ports
+    ]
+    # Workers attach lazily on their first session; the leases keep the version until then
+    for process in processes:
+        lease(shared_dir, process.pid)
+    return processes
+
+
+def run_background(shared_dir, scheduler, monitor=None):
+    """Move the jobs and the anomaly monitor to a published version, returning the new monitor"""
+    data = attach_job_data(shared_dir)
+    scheduler.set_data(data)
+    if monitor is not None:
+        monitor.stop()
+    teachers, students, performance, _ = data['tables']
+    monitor = AnomalyMonitor(teachers, students).bootstrap(performance)
+    monitor.start(publish_to=anomalies_path(shared_dir))
+    release_others(shared_dir)
+    return monitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several dashboard workers behind a reverse proxy")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--port', type=int, default=8500, help="Public port of the reverse proxy")
+    parser.add_argument('--base-port', type=int, default=8501, help="First worker port")
+    parser.add_argument('--shared-root', default=None, help="Where to publish data (default: /dev/shm)")
+    parser.add_argument('--proxy', choices=['nginx', 'none'], default='none')
+    parser.add_argument('--republish', action='store_true', help="Publish even if this data version exists")
+    args = parser.parse_args()
+
+    root = args.shared_root or default_root()
+    fingerprint = data_fingerprint()
+    shared_dir = publish(root, force=args.republish)
+    print(f"📦 Data published to {shared_dir}")
+
+    ports = [args.base_port + i for i in range(args.workers)]
+    run_dir = os.path.join(root, 'run')
+    os.makedirs(run_dir, exist_ok=True)
+    config = write_nginx_config(run_dir, args.port, ports)
+
+    processes = start_workers(shared_dir, ports)
+    print(f"🚀 {len(ports)} workers on ports {ports[0]}-{ports[-1]}")
+    scheduler = JobScheduler().start()
+    monitor = run_background(shared_dir, scheduler)
+
+    if args.proxy == 'nginx':
+        nginx = shutil.which('nginx')
+        if nginx is None:
+            print("❌ nginx not found on PATH; start it yourself with the config below")
+        else:
+            processes.append(subprocess.Popen([nginx, '-c', config, '-g', 'daemon off;']))
+            print(f"🌐 Serving on http://localhost:{args.port}")
+    print(f"⚙️ nginx config: {config}")
+
+    def stop(*_):
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        last_check = time.monotonic()
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+            if time.monotonic() - last_check < REPUBLISH_SECONDS:
+                continue
+            last_check = time.monotonic()
+            try:
+                current = data_fingerprint()
+                if current != fingerprint:
+                    published = publish(root)
+                    print(f"📦 Data changed, published to {published}")
+                    if published != shared_dir:
+                        monitor = run_background(published, scheduler, monitor)
+                        shared_dir = published
+                    fingerprint = current
+            except (OSError, ValueError):
+                # A data file is being replaced; check again next time
+                continue
+        print("❌ A worker exited, shutting down")
+    except KeyboardInterrupt:
+        pass
+    stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Per-session memory accounting and eviction of derived data.
+
+Immutable tables are loaded once and shared by every session (they are only
+registered here so they show up in the usage report). Anything a session
+derives from them -- filtered frames, export bytes -- is stored through
+SessionResourceManager.get_or_compute, which tracks its size, keeps one LRU
+order across all sessions and evicts the least recently used entries when a
+session or the whole server exceeds its budget. Sessions idle for longer
+than the idle timeout lose all derived entries.
+
+Budgets come from the environment:
+    DASHBOARD_SESSION_BUDGET_MB      per-session derived data (default 64)
+    DASHBOARD_GLOBAL_BUDGET_MB       all sessions together (default 1024)
+    DASHBOARD_SESSION_IDLE_MINUTES   idle eviction timeout (default 30)
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+
+
+def estimate_bytes(value):
+    """Approximate memory held by a derived value"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class SessionResourceManager:
+    """Budgeted LRU store of per-session derived data"""
+
+    def __init__(self, session_budget=None, global_budget=None, idle_timeout=None):
+        self.session_budget = session_budget or int(float(os.environ.get('DASHBOARD_SESSION_BUDGET_MB', 64)) * MB)
+        self.global_budget = global_budget or int(float(os.environ.get('DASHBOARD_GLOBAL_BUDGET_MB', 1024)) * MB)
+        self.idle_timeout = idle_timeout or float(os.environ.get('DASHBOARD_SESSION_IDLE_MINUTES', 30)) * 60
+
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()   # (session_id, key) -> (value, nbytes)
+        self._session_bytes = {}
+        self._last_seen = {}
+        self._shared = {}               # name -> (value, nbytes)
+        self.evictions = 0              # entries dropped to stay within a budget
+
+    # ==================== SHARED DATA ====================
+
+    def register_shared(self, name, value):
+        """Record an immutable object shared by all sessions (reported, never evicted)"""
+        with self._lock:
+            self._shared[name] = (value, estimate_bytes(value))
+        return value
+
+    def _is_shared(self, value):
+        return any(value is shared for shared, _ in self._shared.values())
+
+    # ==================== DERIVED DATA ====================
+
+    def touch(self, session_id):
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            self._session_bytes.setdefault(session_id, 0)
+
+    def get_or_compute(self, session_id, key, compute):
+        """Cached derived value for this session, computed and budgeted on a miss"""
+        entry_key = (session_id, key)
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return self._entries[entry_key][0]
+
+        value = compute()
+        with self._lock:
+            if self._is_shared(value):
+                # Nothing was derived (e.g. no filter applied); shared data is not charged to a session
+                return value
+        nbytes = estimate_bytes(value)
+        with self._lock:
+            if nbytes > self.session_budget:
+                # Too large to keep: hand it out without caching
+                return value
+            if entry_key not in self._entries:
+                self._entries[entry_key] = (value, nbytes)
+                self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + nbytes
+            self._enforce(session_id)
+        return value
+
+    def _drop(self, entry_key):
+        _, nbytes = self._entries.pop(entry_key)
+        session_id = entry_key[0]
+        self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) - nbytes
+
+    def _evict(self, entry_key):
+        self._drop(entry_key)
+        self.evictions += 1
+
+    def _enforce(self, session_id):
+        if self._session_bytes.get(session_id, 0) > self.session_budget:
+            for entry_key in [k for k in self._entries if k[0] == session_id]:
+                if self._session_bytes[session_id] <= self.session_budget:
+                    break
+                self._evict(entry_key)
+        while self._entries and self.total_bytes() > self.global_budget:
+            self._evict(next(iter(self._entries)))
+
+    def evict_idle(self):
+        """Drop derived data of sessions not seen within the idle timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [sid for sid, seen in self._last_seen.items() if seen < cutoff]
+            for session_id in idle:
+                self.release(session_id)
+        return len(idle)
+
+    def release(self, session_id):
+        """Forget a session and everything it derived"""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == session_id]:
+                self._drop(entry_key)
+            self._session_bytes.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+
+    # ==================== REPORTING ====================
+
+    def total_bytes(self):
+        return sum(self._session_bytes.values())
+
+    def usage(self):
+        """Current memory accounting for the admin report"""
+        with self._lock:
+            return {
+                'sessions': len(self._last_seen),
+                'derived_bytes': self.total_bytes(),
+                'shared_bytes': sum(nbytes for _, nbytes in self._shared.values()),
+                'session_budget': self.session_budget,
+                'global_budget': self.global_budget,
+                'evictions': self.evictions,
+                'per_session': dict(sorted(self._session_bytes.items(), key=lambda kv: -kv[1])),
+                'shared': {name: nbytes for name, (_, nbytes) in self._shared.items()},
+            }
@@ -0,0 +1,285 @@
+"""Validated tables published once and attached by every app process.
+
+In multi-worker mode (see serve.py) the data is validated and prepared by a
+single publisher, along with the indexes the dashboard derives from it. The
+result is written into one directory per data version, under /dev/shm when
+available so the files live in shared memory:
+
+    <root>/<version>/manifest.json      version, tables and row counts
+    <root>/<version>/<table>.arrow      Arrow IPC file per table
+    <root>/<version>/performance/       columnar cache (see columnar_cache.py)
+    <root>/<version>/student_index/     StudentIndex arrays (.npy)
+    <root>/<version>/access_index/      AccessIndex performance partitions (.npy)
+    <root>/<version>/sketches/          score sketch arrays (.npy), located by
+    <root>/<version>/sketch_keys.arrow  group, value and period of each sketch
+    <root>/<version>/leaderboards.json  top k Teacher_IDs per leaderboard slice
+    <root>/<version>/validation_report.json
+    <root>/<version>/leases/<pid>       one file per process using the version
+    <root>/current                      name of the latest published version
+    <root>/anomalies.pkl                charts and alerts of the host's anomaly monitor
+
+Workers find the directory through DASHBOARD_SHARED_DIR and move to the
+latest version on their next rerun after a publish. They memory-map the
+Arrow and .npy files; numeric columns without nulls become zero-copy NumPy
+views of the shared pages, and only string columns and small per-teacher and
+per-student lookups are built per process. Workers never build the columnar
+cache, the indexes or the sketches themselves.
+
+After a publish, version directories without a lease held by a live process
+are removed, so old versions do not pile up in shared memory.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+
+from access import AccessIndex
+from analytics import PerformanceAggregator
+from columnar_cache import ColumnarPerformance, build_cache
+from data_loader import OUTPUT_DIR, data_path, data_version
+from leaderboards import LeaderboardIndex
+from sketches import SKETCH_GROUPS, ScoreSketchIndex
+from student_index import StudentIndex
+from validation import load_clean_tables
+
+SHARED_ENV = 'DASHBOARD_SHARED_DIR'
+
+TABLES = ['teachers', 'students', 'performance', 'credentials']
+
+CURRENT = 'current'
+LEASES = 'leases'
+ANOMALIES = 'anomalies.pkl'
+
+
+def default_root():
+    """Shared-memory filesystem when the host has one, the local cache otherwise"""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm/school-dashboard'
+    return os.path.join(OUTPUT_DIR, '.cache', 'shared')
+
+# ==================== LEASES ====================
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def lease(shared_dir, pid=None):
+    """Mark a published version as used by a process (this one by default) so publish keeps it"""
+    leases = os.path.join(shared_dir, LEASES)
+    os.makedirs(leases, exist_ok=True)
+    open(os.path.join(leases, str(pid or os.getpid())), 'w').close()
+
+
+def release(shared_dir, pid=None):
+    """Drop a process's lease (this one by default) so a later publish can remove the version"""
+    try:
+        os.remove(os.path.join(shared_dir, LEASES, str(pid or os.getpid())))
+    except OSError:
+        pass
+
+
+def release_others(shared_dir):
+    """Drop this process's leases on every version but shared_dir"""
+    root = os.path.dirname(os.path.normpath(shared_dir))
+    for name in os.listdir(root):
+        if name != os.path.basename(os.path.normpath(shared_dir)):
+            release(os.path.join(root, name))
+
+
+def _in_use(shared_dir):
+    """Whether a live process holds a lease on the version, dropping the leases of exited ones"""
+    leases = os.path.join(shared_dir, LEASES)
+    alive = False
+    for name in os.listdir(leases) if os.path.isdir(leases) else []:
+        if name.isdigit() and _pid_alive(int(name)):
+            alive = True
+        else:
+            try:
+                os.remove(os.path.join(leases, name))
+            except OSError:
+                pass
+    return alive
+
+
+def _remove_unused(root, keep):
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        # Only finished versions; .tmp directories may belong to a publish in progress
+        if name == keep or not os.path.isfile(os.path.join(path, 'manifest.json')):
+            continue
+        if not _in_use(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def latest(shared_dir):
+    """Latest published version directory next to shared_dir (shared_dir itself if none is recorded)"""
+    root = os.path.dirname(os.path.normpath(shared_dir))
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            path = os.path.join(root, f.read().strip())
+    except OSError:
+        return shared_dir
+    return path if os.path.isfile(os.path.join(path, 'manifest.json')) else shared_dir
+
+
+def _point(root, version):
+    pointer = os.path.join(root, f'{CURRENT}.{os.getpid()}.tmp')
+    with open(pointer, 'w') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, CURRENT))
+
+
+def anomalies_path(shared_dir):
+    """File the anomaly monitor of serve.py writes for the workers, next to the versions"""
+    return os.path.join(os.path.dirname(os.path.normpath(shared_dir)), ANOMALIES)
+
+# ==================== PUBLISH ====================
+
+def _write_arrow(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _write_arrays(directory, arrays):
+    os.makedirs(directory)
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.asarray(values))
+
+
+def _publish_indexes(tmp_dir, frames):
+    """Build the student, access, sketch and leaderboard indexes once and write them next to the tables"""
+    columns = ColumnarPerformance(os.path.join(tmp_dir, 'performance'))
+    _write_arrays(os.path.join(tmp_dir, 'student_index'), StudentIndex(frames['students'], columns).arrays())
+    _write_arrays(os.path.join(tmp_dir, 'access_index'),
+                  AccessIndex(frames['teachers'], frames['students'], columns).arrays())
+
+    keys, arrays = ScoreSketchIndex(SKETCH_GROUPS).ingest(frames['aggregator']).to_arrays()
+    _write_arrow(keys, os.path.join(tmp_dir, 'sketch_keys.arrow'))
+    _write_arrays(os.path.join(tmp_dir, 'sketches'), arrays)
+
+    ranked = LeaderboardIndex(frames['teachers']).ranked
+    with open(os.path.join(tmp_dir, 'leaderboards.json'), 'w') as f:
+        json.dump([[*slice_key, list(ids)] for slice_key, ids in ranked.items()], f)
+
+
+def publish(root=None, force=False):
+    """Validate the CSV files and publish them for the current data version, returning its directory"""
+    root = root or default_root()
+    version = data_version()
+    target = os.path.join(root, version)
+    if not force and os.path.exists(os.path.join(target, 'manifest.json')):
+        _point(root, version)
+        return target
+
+    tables, report = load_clean_tables()
+    frames = dict(zip(TABLES, tables))
+    frames['aggregator'] = PerformanceAggregator(
+        frames['performance'], frames['teachers'], frames['students']).frame.reset_index()
+
+    tmp_dir = target + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, df in frames.items():
+        _write_arrow(df, os.path.join(tmp_dir, f'{name}.arrow'))
+    build_cache(data_path('performance'), os.path.join(tmp_dir, 'performance'), frames['performance'])
+    _publish_indexes(tmp_dir, frames)
+    with open(os.path.join(tmp_dir, 'validation_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    manifest = {
+        'version': version,
+        'published': datetime.now().isoformat(timespec='seconds'),
+        'tables': {name: len(df) for name, df in frames.items()},
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+    _point(root, version)
+    _remove_unused(root, version)
+    return target
+
+# ==================== ATTACH ====================
+
+def published_version(shared_dir):
+    """Data version recorded in a published directory's manifest"""
+    with open(os.path.join(shared_dir, 'manifest.json')) as f:
+        return json.load(f)['version']
+
+
+def attach_frame(shared_dir, name):
+    """Memory-mapped DataFrame of one published table"""
+    lease(shared_dir)
+    source = pa.memory_map(os.path.join(shared_dir, f'{name}.arrow'), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def attach_tables(shared_dir):
+    """Published (teachers, students, performance, credentials) tables and the validation report"""
+    tables = tuple(attach_frame(shared_dir, name) for name in TABLES)
+    with open(os.path.join(shared_dir, 'validation_report.json')) as f:
+        report = json.load(f)
+    return tables, report
+
+
+def attach_aggregator(shared_dir):
+    """PerformanceAggregator over the published, already prepared frame"""
+    return PerformanceAggregator.from_frame(attach_frame(shared_dir, 'aggregator').set_index('Date'))
+
+
+def attach_columns(shared_dir):
+    """Columnar performance cache built by publish, opened as is (workers never rebuild it)"""
+    lease(shared_dir)
+    return ColumnarPerformance(os.path.join(shared_dir, 'performance'))
+
+
+def _attach_arrays(shared_dir, name):
+    lease(shared_dir)
+    directory = os.path.join(shared_dir, name)
+    return {os.path.splitext(file)[0]: np.load(os.path.join(directory, file), mmap_mode='r')
+            for file in os.listdir(directory) if file.endswith('.npy')}
+
+
+def attach_student_index(shared_dir, students_df, columns):
+    """StudentIndex over the published, memory-mapped index arrays"""
+    return StudentIndex(students_df, columns, arrays=_attach_arrays(shared_dir, 'student_index'))
+
+
+def attach_access_index(shared_dir, teachers_df, students_df, columns):
+    """AccessIndex over the published, memory-mapped performance partitions"""
+    return AccessIndex(teachers_df, students_df, columns, arrays=_attach_arrays(shared_dir, 'access_index'))
+
+
+def attach_sketches(shared_dir):
+    """ScoreSketchIndex whose sketches are read-only views of the published arrays"""
+    keys = attach_frame(shared_dir, 'sketch_keys')
+    return ScoreSketchIndex.from_arrays(SKETCH_GROUPS, keys, _attach_arrays(shared_dir, 'sketches'))
+
+
+def attach_leaderboards(shared_dir, teachers_df):
+    """LeaderboardIndex of the attached teachers table, starting from the published ranking"""
+    with open(os.path.join(shared_dir, 'leaderboards.json')) as f:
+        ranked = {tuple(entry[:3]): tuple(entry[3]) for entry in json.load(f)}
+    return LeaderboardIndex(teachers_df, ranked=ranked)
+
+
+def attach_job_data(shared_dir):
+    """What the background jobs of serve.py compute from: one version's published tables and engines"""
+    tables, _ = attach_tables(shared_dir)
+    return {
+        'version': published_version(shared_dir),
+        'tables': tables,
+        'teachers': tables[0],
+        'aggregator': attach_aggregator(shared_dir),
+        'columns': attach_columns(shared_dir),
+    }
@@ -0,0 +1,361 @@
+"""Mergeable streaming sketches for score distributions.
+
+Sketches are maintained per (group, day) while rows are ingested, along with
+monthly and all-time rollups per group value, and can be merged across any
+set of groups and dates, so distribution charts never rescan performance
+rows and a query merges at most a few dozen sketches. to_arrays() flattens an
+index into a few arrays and from_arrays() serves them back as read-only
+sketch views, so processes can share one memory-mapped copy.
+
+Error bounds:
+    ScoreSketch.count / total / mean / min / max   exact
+    FixedBinHistogram counts                       exact for bin-aligned ranges
+                                                   (unit bins, so exact for any
+                                                   integer score band)
+    KLLSketch quantiles                            exact while fewer than k values
+                                                   have been added; beyond that the
+                                                   normalized rank error is about
+                                                   1.7% for k=200 with 99% confidence
+                                                   (KLL bound, roughly 1/k scaling)
+                                                   and does not grow with merging
+"""
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Score sketch groups of the dashboard: group name -> performance frame column
+SKETCH_GROUPS = {'teacher': 'Teacher_ID', 'section': 'Section', 'subject': 'Subject'}
+
+# ==================== QUANTILES ====================
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang, Liberty 2016) with compaction on numpy buffers"""
+
+    def __init__(self, k=200, seed=0, levels=None, count=0):
+        self.k = k
+        self.count = count
+        self.levels = [np.empty(0)] if levels is None else list(levels)
+        self.seed = seed
+        self._rng = None    # created on the first compaction, which most day sketches never reach
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self):
+        return sum(len(buf) for buf in self.levels)
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self):
+        while self._size() > self._max_size():
+            if self._rng is None:
+                self._rng = np.random.default_rng(self.seed)
+            for h, buf in enumerate(self.levels):
+                if len(buf) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append(np.empty(0))
+                    buf = np.sort(buf)
+                    # An odd item stays behind so weights remain exact powers of two
+                    keep = buf[-1:] if len(buf) % 2 else buf[:0]
+                    even = buf[:len(buf) - len(keep)]
+                    promoted = even[int(self._rng.integers(2))::2]
+                    self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                    self.levels[h] = keep
+                    break
+
+    def update(self, values):
+        """Add one value or an array of values"""
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, buf in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], buf])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(buf), 2 ** h) for h, buf in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), NaN when empty"""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values, cum = self._weighted()
+        targets = np.asarray(qs, dtype=float) * cum[-1]
+        idx = np.searchsorted(cum, targets, side='left')
+        return values[np.clip(idx, 0, len(values) - 1)]
+
+    def rank(self, x):
+        """Approximate fraction of values <= x"""
+        if self.count == 0:
+            return np.nan
+        values, cum = self._weighted()
+        pos = np.searchsorted(values, x, side='right')
+        return cum[pos - 1] / cum[-1] if pos > 0 else 0.0
+
+# ==================== HISTOGRAM ====================
+
+class FixedBinHistogram:
+    """Counts over fixed bins [lo, lo+width), ..., out-of-range values clamp to the edge bins"""
+
+    def __init__(self, lo=0, hi=101, width=1, counts=None):
+        self.lo, self.hi, self.width = lo, hi, width
+        self.counts = np.zeros(int(math.ceil((hi - lo) / width)), dtype=np.int64) if counts is None else counts
+
+    def update(self, values):
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        bins = np.clip(((values - self.lo) // self.width).astype(np.int64), 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if (self.lo, self.hi, self.width) != (other.lo, other.hi, other.width):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        return self
+
+    def count_between(self, start, stop):
+        """Values in [start, stop), exact when both bounds fall on bin edges"""
+        first = int(max(0, (start - self.lo) // self.width))
+        last = int(min(len(self.counts), math.ceil((stop - self.lo) / self.width)))
+        return int(self.counts[first:last].sum())
+
+    def edges(self):
+        return self.lo + np.arange(len(self.counts) + 1) * self.width
+
+# ==================== SCORE SKETCH ====================
+
+class ScoreSketch:
+    """Exact moments plus a histogram and a KLL sketch for one slice of scores"""
+
+    def __init__(self, k=200):
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.histogram = FixedBinHistogram()
+        self.kll = KLLSketch(k)
+
+    @classmethod
+    def view(cls, moments, counts, levels, k=200):
+        """Sketch over existing arrays: (count, total, min, max), histogram counts and KLL levels"""
+        sketch = cls.__new__(cls)
+        sketch.count = int(moments[0])
+        sketch.total, sketch.min, sketch.max = float(moments[1]), float(moments[2]), float(moments[3])
+        sketch.histogram = FixedBinHistogram(counts=counts)
+        sketch.kll = KLLSketch(k, levels=levels, count=sketch.count)
+        return sketch
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.histogram.update(values)
+        self.kll.update(values)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram.merge(other.histogram)
+        self.kll.merge(other.kll)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def quantile(self, q):
+        return self.kll.quantile(q)
+
+
+def _grouped(work, keys):
+    """(key tuple, row positions) of work grouped by keys"""
+    for key, positions in work.groupby(keys).indices.items():
+        yield (key if isinstance(key, tuple) else (key,)), positions
+
+
+def _month(ts):
+    return ts.year * 12 + ts.month - 1
+
+
+class ScoreSketchIndex:
+    """ScoreSketch per group -> value -> day, with monthly and total rollups.
+
+    ``groups`` maps a group name to the frame column holding its value. The
+    'all' group always exists and covers every row.
+
+    Ingestion also keeps a sketch per value and month and one per value over
+    all days. A query without dates reads the total, and a date range merges
+    whole months plus the days of the months it cuts. Merged results are
+    cached until the next ingest and shared by all callers, so treat them as
+    read-only.
+    """
+
+    MERGED_CACHE_SIZE = 1024
+
+    def __init__(self, groups=None, k=200):
+        self.groups = dict(groups or {})
+        self.k = k
+        self.sketches = {'all': {}}     # group -> value -> day -> ScoreSketch
+        self.months = {'all': {}}       # group -> value -> month number -> ScoreSketch
+        self.totals = {'all': {}}       # group -> value -> ScoreSketch
+        for group in self.groups:
+            self.sketches[group], self.months[group], self.totals[group] = {}, {}, {}
+        self._merged = OrderedDict()    # (group, value, start, end) -> merged ScoreSketch
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _slot(sketches, key, k):
+        if key not in sketches:
+            sketches[key] = ScoreSketch(k)
+        return sketches[key]
+
+    def ingest(self, frame, score_col='Score', date_col='Date'):
+        """Fold a chunk of rows (Score, Date and the group columns) into the index"""
+        work = pd.DataFrame({
+            'day': pd.to_datetime(frame[date_col], errors='coerce').dt.normalize().to_numpy(),
+            'score': frame[score_col].to_numpy(dtype=float),
+        }).dropna(subset=['day'])
+        work['month'] = work['day'].dt.year * 12 + work['day'].dt.month - 1
+        scores = work['score'].to_numpy()
+
+        for group, column in [('all', None)] + list(self.groups.items()):
+            # The 'all' group has one value, None
+            keys = [] if column is None else ['value']
+            if column is not None:
+                work['value'] = frame[column].to_numpy()[work.index]
+            for key, positions in _grouped(work, keys + ['day']):
+                days = self.sketches[group].setdefault(key[0] if keys else None, {})
+                self._slot(days, pd.Timestamp(key[-1]), self.k).update(scores[positions])
+            for key, positions in _grouped(work, keys + ['month']):
+                months = self.months[group].setdefault(key[0] if keys else None, {})
+                self._slot(months, int(key[-1]), self.k).update(scores[positions])
+            if keys:
+                for key, positions in _grouped(work, keys):
+                    self._slot(self.totals[group], key[0], self.k).update(scores[positions])
+            else:
+                self._slot(self.totals[group], None, self.k).update(scores)
+        with self._lock:
+            self._merged.clear()
+        return self
+
+    def _merge_range(self, merged, group, value, start, end):
+        """Fold the sketches of one group value within [start, end] into merged"""
+        first = _month(start) if start is not None else None
+        last = _month(end) if end is not None else None
+        partial = set()
+        for month, sketch in self.months[group].get(value, {}).items():
+            if (first is not None and month < first) or (last is not None and month > last):
+                continue
+            month_start = pd.Timestamp(year=month // 12, month=month % 12 + 1, day=1)
+            month_end = month_start + pd.offsets.MonthEnd(0)
+            if (start is None or start <= month_start) and (end is None or end >= month_end):
+                merged.merge(sketch)
+            else:
+                partial.add(month)
+        if partial:
+            for day, sketch in self.sketches[group][value].items():
+                if (_month(day) in partial and (start is None or day >= start)
+                        and (end is None or day <= end)):
+                    merged.merge(sketch)
+
+    def query(self, group='all', value=None, start=None, end=None):
+        """Merged sketch for one group value (or every value of the group) within [start, end]"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if value is not None and start is None and end is None:
+            return self.totals[group].get(value) or ScoreSketch(self.k)
+
+        key = (group, value, start, end)
+        with self._lock:
+            if key in self._merged:
+                self._merged.move_to_end(key)
+                return self._merged[key]
+        merged = ScoreSketch(self.k)
+        for v in (self.sketches[group] if value is None else [value]):
+            if start is None and end is None:
+                merged.merge(self.totals[group][v])
+            elif v in self.months[group]:
+                self._merge_range(merged, group, v, start, end)
+        with self._lock:
+            self._merged[key] = merged
+            if len(self._merged) > self.MERGED_CACHE_SIZE:
+                self._merged.popitem(last=False)
+        return merged
+
+    def values(self, group):
+        """Distinct values seen for a group"""
+        return sorted(v for v in self.sketches[group] if v is not None)
+
+    # ==================== SHARING ====================
+
+    def to_arrays(self):
+        """Every day, month and total sketch as flat arrays, plus a frame of where each one belongs"""
+        entries = []    # (group, value, kind, period, sketch); a day's period is its Timestamp in ns
+        for group in self.sketches:
+            for value, days in self.sketches[group].items():
+                entries += [(group, value, 'day', day.value, sketch) for day, sketch in days.items()]
+            for value, months in self.months[group].items():
+                entries += [(group, value, 'month', month, sketch) for month, sketch in months.items()]
+            entries += [(group, value, 'total', 0, sketch) for value, sketch in self.totals[group].items()]
+        sketches = [entry[-1] for entry in entries]
+        levels = [buf for sketch in sketches for buf in sketch.kll.levels]
+        keys = pd.DataFrame([entry[:4] for entry in entries], columns=['group', 'value', 'kind', 'period'])
+        arrays = {
+            'moments': np.array([(s.count, s.total, s.min, s.max) for s in sketches], dtype=np.float64).reshape(-1, 4),
+            'histograms': np.array([s.histogram.counts for s in sketches], dtype=np.int64).reshape(
+                len(sketches), len(FixedBinHistogram().counts)),
+            'levels': np.cumsum([0] + [len(s.kll.levels) for s in sketches], dtype=np.int64),
+            'level_offsets': np.cumsum([0] + [len(buf) for buf in levels], dtype=np.int64),
+            'kll': np.concatenate(levels) if levels else np.empty(0),
+        }
+        return keys, arrays
+
+    @classmethod
+    def from_arrays(cls, groups, keys, arrays, k=200):
+        """Index over the output of to_arrays without copying it; its sketches are read-only views"""
+        index = cls(groups, k)
+        moments, histograms, levels, offsets, kll = (
+            np.asarray(arrays[name]) for name in ['moments', 'histograms', 'levels', 'level_offsets', 'kll'])
+        for i, (group, value, kind, period) in enumerate(keys.itertuples(index=False)):
+            value = None if group == 'all' else value    # the frame may hold it as NaN
+            buffers = [kll[offsets[h]:offsets[h + 1]] for h in range(levels[i], levels[i + 1])]
+            sketch = ScoreSketch.view(moments[i], histograms[i], buffers, k)
+            if kind == 'day':
+                index.sketches[group].setdefault(value, {})[pd.Timestamp(period)] = sketch
+            elif kind == 'month':
+                index.months[group].setdefault(value, {})[int(period)] = sketch
+            else:
+                index.totals[group][value] = sketch
+        return index
@@ -0,0 +1,200 @@
+"""Render the Dashboard and Attrition tabs to a static HTML bundle.
+
+Usage:
+    python snapshot.py [--out snapshots] [--force] [--keep 5]
+
+One bundle is written per data version to ``<out>/<version>/index.html`` and
+copied to ``<out>/index.html`` so any static file server can serve the latest
+snapshot to read-only viewers without starting a Streamlit session. Only the
+latest ``--keep`` version bundles are kept.
+"""
+import argparse
+import html
+import os
+import shutil
+from datetime import datetime
+
+import charts
+from analytics import PerformanceAggregator
+from columnar_cache import open_performance_cache
+from data_loader import DATA_DIR, data_version
+from drivers import DriverAnalysis
+from sketches import ScoreSketchIndex
+from validation import load_clean_tables
+
+STYLES_PATH = os.path.join(DATA_DIR, 'static', 'styles.css')
+
+# ==================== HTML HELPERS ====================
+
+def _kpi_block(kpis):
+    """KPI metrics as themed metric boxes"""
+    items = []
+    for label, value, delta in kpis:
+        items.append(
+            f"<div class='stMetric'>"
+            f"<div>{html.escape(str(label))}</div>"
+            f"<div class='snapshot-kpi-value'>{html.escape(str(value))}</div>"
+            f"<div class='snapshot-kpi-delta'>{html.escape(str(delta))}</div>"
+            f"</div>"
+        )
+    return f"<div class='snapshot-kpis'>{''.join(items)}</div>"
+
+
+def _chart_grid(titled_figures, include_plotlyjs):
+    """Figures laid out in a responsive grid, plotly.js embedded only if requested"""
+    cells = []
+    for title, fig in titled_figures:
+        fig_html = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs,
+                               config={'displayModeBar': False})
+        include_plotlyjs = False
+        cells.append(f"<div><h4>{html.escape(title)}</h4>{fig_html}</div>")
+    return f"<div class='snapshot-grid'>{''.join(cells)}</div>"
+
+
+def _table(df):
+    """DataFrame as a themed static table"""
+    return f"<div class='stDataFrame'>{df.to_html(index=False, classes='snapshot-table', border=0)}</div>"
+
+# ==================== SECTIONS ====================
+
+def render_dashboard(teachers_df, students_df, performance_df, aggregator=None, columns=None):
+    """Static HTML for the Dashboard tab, embeds plotly.js for the whole page"""
+    perf, teachers = performance_df, teachers_df
+    if columns is None:
+        columns = open_performance_cache(frame=perf)
+    if aggregator is None:
+        aggregator = PerformanceAggregator(perf, teachers, students_df)
+    trend_data = aggregator.summary('score', 'day', ('mean', 'min', 'max'), last=30)
+    late_trend = aggregator.summary('late', 'day', ('sum',), last=30)
+    score_sketches = ScoreSketchIndex({'section': 'Section'}).ingest(aggregator.frame.reset_index())
+    score_dist = charts.score_distribution(score_sketches.query())
+    parts = [
+        "<section id='dashboard'>",
+        "<h2>📊 MS Dashboard Overview</h2>",
+        _kpi_block(charts.dashboard_kpis(teachers, students_df, columns)),
+        "<h3>📈 Performance Analytics</h3>",
+        _chart_grid([
+            ("Performance Trend (Last 30 Days)", charts.create_performance_trend_chart(trend_data)),
+            ("Score Distribution Analysis", charts.create_score_distribution_chart(score_dist)),
+        ], include_plotlyjs=True),
+        _chart_grid([
+            ("Median & P90 Score by Section", charts.create_section_percentile_chart(score_sketches)),
+            ("Score Histogram", charts.create_score_histogram_chart(score_sketches.query())),
+        ], include_plotlyjs=False),
+        "<h3>📚 Subject & Status Analytics</h3>",
+        _chart_grid([
+            ("Teachers Distribution by Subject", charts.create_subject_distribution_chart(teachers)),
+            ("Teacher Status Distribution", charts.create_status_distribution_chart(teachers)),
+        ], include_plotlyjs=False),
+        "<h3>📊 Attendance Impact Analysis</h3>",
+        _chart_grid([
+            ("Attendance vs Performance Score", charts.create_attendance_impact_chart(columns.group_mean('Score', 'Attendance'))),
+            ("Late Arrival Trend (30 Days)", charts.create_late_trend_chart(late_trend)),
+        ], include_plotlyjs=False),
+        "</section>",
+    ]
+    return '\n'.join(parts)
+
+
+def render_attrition(teachers_df, performance_df, columns=None):
+    """Static HTML for the Attrition tab"""
+    t = teachers_df
+    risk_dist = charts.risk_distribution(t)
+    analysis = DriverAnalysis(t, columns if columns is not None else open_performance_cache(frame=performance_df))
+    hr_display = charts.high_risk_table(t)
+    parts = [
+        "<section id='attrition'>",
+        "<h2>⚠️ Attrition & Risk Analysis</h2>",
+        _kpi_block(charts.attrition_kpis(t)),
+        _chart_grid([
+            ("Risk Distribution", charts.create_risk_pie_chart(risk_dist)),
+            ("Teachers by Risk Level", charts.create_risk_bar_chart(risk_dist)),
+        ], include_plotlyjs=False),
+        "<h3>🔍 What Drives Attrition Risk</h3>",
+        _chart_grid([
+            ("Feature Importance", charts.create_driver_importance_chart(analysis)),
+            ("Correlation Matrix", charts.create_driver_correlation_chart(analysis)),
+        ], include_plotlyjs=False),
+        "<h3>🚨 High Risk Teachers - Immediate Attention Required</h3>",
+        _table(hr_display) if len(hr_display) > 0 else
+        "<p>✅ No high-risk teachers identified! Great work on employee retention.</p>",
+        "</section>",
+    ]
+    return '\n'.join(parts)
+
+
+def render_page(version, tables, aggregator=None, columns=None):
+    """Complete self-contained HTML page for one data version"""
+    teachers_df, students_df, performance_df, _ = tables
+    with open(STYLES_PATH, 'r') as f:
+        custom_css = f.read()
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>MY SCHOOL Dashboard - Snapshot</title>
+<style>{custom_css}</style>
+</head>
+<body>
+<div data-testid="stAppViewContainer" class="snapshot-page">
+<h1 class="dashboard-title">🎓 MY SCHOOL Dashboard</h1>
+<p class="dashboard-subtitle">📊 Read-only snapshot</p>
+<nav class="snapshot-nav"><a href="#dashboard">📊 Dashboard</a><a href="#attrition">⚠️ Attrition</a></nav>
+{render_dashboard(teachers_df, students_df, performance_df, aggregator, columns)}
+{render_attrition(teachers_df, performance_df, columns)}
+<p class="snapshot-footer">Data version {version} · generated {generated}</p>
+</div>
+</body>
+</html>
+"""
+
+# ==================== WRITER ====================
+
+def _remove_old(out_dir, keep, current):
+    """Remove all but the `keep` most recently written version bundles"""
+    bundles = [entry.path for entry in os.scandir(out_dir)
+               if entry.is_dir() and os.path.isfile(os.path.join(entry.path, 'index.html'))]
+    bundles.sort(key=lambda path: os.path.getmtime(os.path.join(path, 'index.html')), reverse=True)
+    for path in [p for p in bundles if p != current][max(keep - 1, 0):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def write_snapshot(out_dir='snapshots', force=False, version=None, tables=None, aggregator=None,
+                   columns=None, keep=None):
+    """Write the bundle for a data version (the files' current one unless tables are given)"""
+    if tables is None:
+        version = data_version()
+    version_dir = os.path.join(out_dir, version)
+    target = os.path.join(version_dir, 'index.html')
+
+    if force or not os.path.exists(target):
+        os.makedirs(version_dir, exist_ok=True)
+        if tables is None:
+            tables, _ = load_clean_tables()
+        page = render_page(version, tables, aggregator, columns)
+        tmp = target + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(page)
+        os.replace(tmp, target)
+
+    latest = os.path.join(out_dir, 'index.html')
+    shutil.copyfile(target, latest + '.tmp')
+    os.replace(latest + '.tmp', latest)
+    if keep:
+        _remove_old(out_dir, keep, version_dir)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a static HTML snapshot of the dashboard")
+    parser.add_argument('--out', default='snapshots', help="Output directory (default: snapshots)")
+    parser.add_argument('--force', action='store_true', help="Re-render even if this data version exists")
+    parser.add_argument('--keep', type=int, default=5, help="Version bundles kept (default: 5)")
+    args = parser.parse_args()
+    print(f"✅ Snapshot written to {write_snapshot(args.out, args.force, keep=args.keep)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Indexed per-student lookups over the performance log.
+
+Two structures are built once per data version:
+
+    CSR offsets   performance row numbers sorted by Student_ID code, plus an
+                  offsets array with one slot per student. The rows of
+                  student code c are order[offsets[c]:offsets[c + 1]], so a
+                  drill-down reads O(rows of that student) and never scans.
+    Search keys   sorted lowercase keys (ID, full name and every name word)
+                  pointing at students.csv rows. A prefix search is two
+                  binary searches over the keys.
+
+Both are plain arrays (arrays()); a process given them, e.g. memory-mapped
+from a published version, skips the build.
+
+Row data comes from the memory-mapped columnar cache, so a lookup gathers a
+handful of array elements instead of filtering a DataFrame. Lookups take an
+optional ascending array of allowed rows (an access scope, see access.py)
+and keep only the matches that are in it.
+"""
+import numpy as np
+import pandas as pd
+
+from columnar_cache import MISSING_DAY
+
+
+def _member(rows, allowed):
+    # rows that also appear in the ascending array allowed (None allows every row)
+    if allowed is None:
+        return rows
+    if len(allowed) == 0:
+        return rows[:0]
+    pos = np.minimum(np.searchsorted(allowed, rows), len(allowed) - 1)
+    return rows[allowed[pos] == rows]
+
+
+class StudentIndex:
+    """Student search and O(k) performance history lookup by Student_ID"""
+
+    ARRAYS = ['order', 'offsets', 'keys', 'key_rows']
+
+    def __init__(self, students_df, columns, arrays=None):
+        self.students = students_df.reset_index(drop=True)
+        self.columns = columns
+        self._row_of_id = pd.Series(self.students.index, index=self.students['Student_ID'])
+        if arrays is not None:
+            self.order, self.offsets, self.keys, self.key_rows = (arrays[name] for name in self.ARRAYS)
+            return
+
+        # CSR offsets over the dictionary codes of the Student_ID column
+        codes = np.asarray(columns['Student_ID'])
+        n_codes = len(columns.categories('Student_ID'))
+        order = np.argsort(codes, kind='stable')
+        self.order = order[np.count_nonzero(codes < 0):]
+        counts = np.bincount(codes[codes >= 0], minlength=n_codes)
+        self.offsets = np.zeros(n_codes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+        # Prefix search keys -> row position in students_df
+        names = self.students['Student_Name'].astype(str).str.lower()
+        keys = pd.concat([
+            self.students['Student_ID'].astype(str).str.lower(),
+            names,
+            names.str.split().explode(),
+        ])
+        keys = keys[keys != '']
+        ordered = np.argsort(keys.to_numpy(dtype=str), kind='stable')
+        self.keys = keys.to_numpy(dtype=str)[ordered]
+        self.key_rows = keys.index.to_numpy()[ordered]
+
+    def arrays(self):
+        """The built index arrays by name, to share with other processes"""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    # ==================== SEARCH ====================
+
+    def search(self, query, limit=50, within=None):
+        """Students whose ID, name or a name word starts with query, as a DataFrame"""
+        query = query.strip().lower()
+        if not query:
+            return self.students.head(limit) if within is None else self.students.iloc[within[:limit]]
+        lo = np.searchsorted(self.keys, query, side='left')
+        hi = np.searchsorted(self.keys, query + '\uffff', side='left')
+        rows = pd.unique(_member(self.key_rows[lo:hi], within))[:limit]
+        return self.students.iloc[np.sort(rows)]
+
+    def student(self, student_id):
+        """students.csv row of one student, None if unknown"""
+        row = self._row_of_id.get(student_id)
+        return None if row is None else self.students.iloc[row]
+
+    # ==================== HISTORY ====================
+
+    def rows(self, student_id, within=None):
+        """Performance row numbers of one student (empty if the student has no records)"""
+        code = self.columns.code_of('Student_ID', student_id)
+        if code < 0:
+            return self.order[:0]
+        return _member(self.order[self.offsets[code]:self.offsets[code + 1]], within)
+
+    def history(self, student_id, within=None):
+        """Performance history of one student, oldest first"""
+        rows = self.rows(student_id, within)
+        cols = self.columns
+        days = cols['Date'][rows]
+        dates = days.astype('datetime64[D]')
+        dates[days == MISSING_DAY] = np.datetime64('NaT')
+        history = pd.DataFrame({
+            'Date': pd.to_datetime(dates),
+            'Teacher_ID': self._decode('Teacher_ID', rows),
+            'Score': cols['Score'][rows].astype(np.float64),
+            'Attendance': self._decode('Attendance', rows),
+            'Late_Count': cols['Late_Count'][rows].astype(np.float64),
+        })
+        return history.sort_values('Date', kind='stable').reset_index(drop=True)
+
+    def _decode(self, col, rows):
+        # -1 codes (missing values) become NaN
+        return pd.Categorical.from_codes(self.columns[col][rows], self.columns.categories(col)).astype(object)
+
+    @staticmethod
+    def teacher_breakdown(history, teachers_df=None):
+        """Records, average score, attendance rate and late total per teacher of one student's history"""
+        breakdown = history.assign(Present=(history['Attendance'] == 'Present') * 100.0).groupby('Teacher_ID').agg(
+            Records=('Score', 'size'),
+            Avg_Score=('Score', 'mean'),
+            Attendance_Rate=('Present', 'mean'),
+            Late_Total=('Late_Count', 'sum'),
+            Last_Seen=('Date', 'max'),
+        ).reset_index()
+        if teachers_df is not None:
+            names = teachers_df.set_index('Teacher_ID')[['Teacher_Name', 'Subject']]
+            breakdown = breakdown.join(names, on='Teacher_ID')
+        return breakdown.sort_values('Records', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,94 @@
+"""Precompiled HTML fragments for the dashboard cards.
+
+Every fragment is compiled once at import into a string.Template with all
+indentation and line breaks removed; styling lives in static/styles.css, so
+the HTML only carries class names. render() caches the output per
+(fragment, values), so a rerun for the same teacher does no string building.
+"""
+import html
+from functools import lru_cache
+from string import Template
+
+FRAGMENTS = {
+    'avatar': """
+        <div class="profile-avatar"><img src="$avatar_url" alt="$name"></div>
+    """,
+    'profile_header': """
+        <div class="profile-header">
+            <h2>$name</h2>
+            <p class="profile-subject">📚 $subject</p>
+            <p>🆔 ID: $teacher_id</p>
+            <p>📍 Status: <span class="value-green">$status</span></p>
+            <p>🎓 Qualification: <span class="value-orange">$qualification</span></p>
+        </div>
+    """,
+    'experience': """
+        <div class="experience-card">
+            <div class="experience-label">Total Experience</div>
+            <div class="experience-total">$total</div>
+            <div class="experience-label">Years</div>
+            <div class="experience-current">
+                <div class="experience-label">At Current School</div>
+                <div class="experience-years">$current</div>
+                <div class="experience-label">Years</div>
+            </div>
+        </div>
+    """,
+    'info_card': """
+        <div class="info-card accent-$accent info-card-$size">
+            <b class="info-card-title">$title</b><br>
+            <p class="info-card-value value-$tone">$value</p>
+            <p class="info-card-note">$note</p>
+        </div>
+    """,
+    'rating_card': """
+        <div class="rating-card accent-$accent">
+            <b class="info-card-title">$title</b><br>
+            <div class="rating-card-value value-$tone">$rating/5</div>
+            <div class="rating-card-stars">$stars</div>
+        </div>
+    """,
+    'risk_card': """
+        <div class="risk-card accent-$accent">
+            <h4>Risk Score: $score/5</h4>
+            <p>$message</p>
+        </div>
+    """,
+    'quick_stats': """
+        <div class="stats-card">
+            <h4>📊 Quick Stats</h4>
+            <ul>
+                <li>Late Count: <b class="value-orange">$late times</b></li>
+                <li>Assignment Completion: <b class="value-green">$completion%</b></li>
+                <li>Training Hours: <b class="value-purple">$training</b></li>
+                <li>Co-Curricular Contribution: <b class="value-pink">$cocurricular%</b></li>
+            </ul>
+        </div>
+    """,
+    'teacher_card': """
+        <div class="teacher-card">
+            <img src="$avatar_url" class="teacher-avatar">
+            <div class="teacher-name">$name</div>
+            <div class="teacher-subject">$subject</div>
+            <div class="teacher-score">$score</div>
+            <div class="teacher-label">$label</div>
+        </div>
+    """,
+}
+
+
+def _compile(fragment):
+    return Template(''.join(line.strip() for line in fragment.strip().splitlines()))
+
+
+TEMPLATES = {name: _compile(fragment) for name, fragment in FRAGMENTS.items()}
+
+
+@lru_cache(maxsize=4096)
+def _render_cached(name, items):
+    return TEMPLATES[name].substitute({key: html.escape(str(value)) for key, value in items})
+
+
+def render(fragment, /, **values):
+    """HTML for a fragment with its values escaped, cached per distinct values"""
+    return _render_cached(fragment, tuple(sorted(values.items())))
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from anomalies import AnomalyFeed, AnomalyMonitor
+from data_loader import data_path, read_tables
+from validation import validate_tables
+
+
+@pytest.fixture(scope='module')
+def tables():
+    (teachers, students, performance, _), _, _ = validate_tables(*read_tables())
+    return teachers, students, performance
+
+
+@pytest.fixture
+def monitor(tmp_path, tables):
+    teachers, students, performance = tables
+    csv_path = str(tmp_path / 'performance.csv')
+    pd.read_csv(data_path('performance')).to_csv(csv_path, index=False)
+    return AnomalyMonitor(teachers, students, csv_path=csv_path).bootstrap(performance)
+
+
+def _append(csv_path, n):
+    rows = pd.read_csv(data_path('performance')).head(n)
+    rows.to_csv(csv_path, mode='a', header=False, index=False)
+
+
+def test_follow_reads_only_appended_rows(monitor):
+    assert monitor.follow(min_interval=0) == 0
+    _append(monitor.csv_path, 5)
+    assert monitor.follow(min_interval=0) == 5
+    assert monitor.follow(min_interval=0) == 0
+
+
+def test_concurrent_follow_ingests_each_row_once(monitor):
+    rows = monitor.rows
+    _append(monitor.csv_path, 40)
+    threads = [threading.Thread(target=monitor.follow, kwargs={'min_interval': 0}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert monitor.rows == rows + 40
+
+
+def test_in_place_rewrite_is_not_read_mid_row(monitor):
+    with open(monitor.csv_path, 'rb') as f:
+        header = f.readline()
+        rows = f.read()
+    # Same file, one row longer: every old row moves past its previous offset
+    with open(monitor.csv_path, 'wb') as f:
+        f.write(header + rows.splitlines(keepends=True)[0] + rows)
+    assert monitor.follow(min_interval=0) == 0
+    _append(monitor.csv_path, 3)
+    assert monitor.follow(min_interval=0) == 3
+
+
+def test_replaced_larger_file_is_not_read_mid_row(monitor, tmp_path):
+    replacement = str(tmp_path / 'replacement.csv')
+    rows = pd.read_csv(monitor.csv_path)
+    pd.concat([rows, rows.head(50)]).to_csv(replacement, index=False)
+    os.replace(replacement, monitor.csv_path)
+    assert monitor.follow(min_interval=0) == 0
+    _append(monitor.csv_path, 2)
+    assert monitor.follow(min_interval=0) == 2
+
+
+def test_background_follower_publishes_appended_rows(monitor):
+    rows = monitor.rows
+    before = monitor.current('teacher', 'late')
+    monitor.start(interval=0.05)
+    _append(monitor.csv_path, 5)
+    deadline = time.monotonic() + 10
+    while monitor.rows < rows + 5:
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+    monitor.stop()
+    assert monitor.rows == rows + 5
+    assert monitor.current('teacher', 'late')['Rows'].sum() == before['Rows'].sum() + 5
+
+
+def test_feed_reads_what_the_monitor_writes(monitor, tmp_path):
+    path = str(tmp_path / 'anomalies.pkl')
+    feed = AnomalyFeed(path)
+    assert feed.rows == 0 and feed.recent().empty
+
+    monitor.write(path)
+    assert feed.rows == monitor.rows
+    assert feed.recent().equals(monitor.recent())
+    assert feed.current('section', 'absent').equals(monitor.current('section', 'absent'))
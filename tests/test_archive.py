@@ -0,0 +1,70 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import archive
+from archive import PerformanceArchive, compact
+from data_loader import data_path
+
+
+@pytest.fixture
+def hot_csv(tmp_path):
+    path = str(tmp_path / 'performance.csv')
+    shutil.copy(data_path('performance'), path)
+    return path
+
+
+def test_compacting_again_moves_nothing(tmp_path, hot_csv):
+    archive_dir = str(tmp_path / 'archive')
+    first = compact(archive_dir, hot_csv)
+    assert first['archived'] > 0
+    assert compact(archive_dir, hot_csv)['archived'] == 0
+    assert len(PerformanceArchive(archive_dir)) == first['archived']
+
+
+def test_backfilled_identical_rows_are_kept(tmp_path, hot_csv):
+    archive_dir = str(tmp_path / 'archive')
+    archived = compact(archive_dir, hot_csv)['archived']
+    old = PerformanceArchive(archive_dir).read().head(3)
+    old['Date'] = old['Date'].dt.strftime('%Y-%m-%d')
+    old.to_csv(hot_csv, mode='a', header=False, index=False)
+
+    assert compact(archive_dir, hot_csv)['archived'] == 3
+    cold = PerformanceArchive(archive_dir)
+    assert len(cold) == len(cold.read()) == archived + 3
+    assert cold.summary['Records'].sum() == archived + 3
+
+
+def test_interrupted_compaction_leaves_no_duplicates(tmp_path, hot_csv, monkeypatch):
+    archive_dir = str(tmp_path / 'archive')
+    original = os.replace
+
+    def fail_on_manifest(src, dst):
+        if dst.endswith('manifest.json'):
+            raise OSError('disk full')
+        original(src, dst)
+
+    archived = compact(archive_dir, hot_csv)['archived']
+    old = PerformanceArchive(archive_dir).read().head(3)
+    old['Date'] = old['Date'].dt.strftime('%Y-%m-%d')
+    old.to_csv(hot_csv, mode='a', header=False, index=False)
+
+    rows = len(pd.read_csv(hot_csv))
+    monkeypatch.setattr(archive.os, 'replace', fail_on_manifest)
+    with pytest.raises(OSError):
+        compact(archive_dir, hot_csv)
+    monkeypatch.setattr(archive.os, 'replace', original)
+    assert len(pd.read_csv(hot_csv)) == rows
+
+    interrupted = PerformanceArchive(archive_dir)
+    assert len(interrupted.read()) == archived
+    assert interrupted.summary['Records'].sum() == archived
+
+    assert compact(archive_dir, hot_csv)['archived'] == 3
+    cold = PerformanceArchive(archive_dir)
+    assert len(cold) == len(cold.read()) == archived + 3
+    assert cold.summary['Records'].sum() == archived + 3
+    assert len(pd.read_csv(hot_csv)) == rows - 3
+    assert sorted(f for f in os.listdir(archive_dir) if f.startswith('daily_summary')) == [cold.manifest['summary']]
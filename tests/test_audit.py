@@ -0,0 +1,38 @@
+import os
+import time
+
+from audit import AuditLog
+
+
+def test_query_reads_only_new_index_lines(tmp_path):
+    log = AuditLog(audit_dir=str(tmp_path), flush_interval=0.01)
+    log.log('login', user='a')
+    log.flush()
+    assert [e['user'] for e in log.query()] == ['a']
+    parsed = {name: entry[0] for name, entry in log._index.items()}
+
+    log.log('export', user='b')
+    log.flush()
+    assert [e['user'] for e in log.query()] == ['b', 'a']
+    assert all(log._index[name][0] > offset for name, offset in parsed.items())
+    assert [e['user'] for e in log.query(events=['export'])] == ['b']
+
+
+def test_query_skips_days_outside_the_range(tmp_path):
+    log = AuditLog(audit_dir=str(tmp_path), flush_interval=0.01)
+    log.log('login', user='a')
+    log.flush()
+    assert log.query(end=time.time() - 3 * 86400) == []
+    assert log._index == {}
+
+
+def test_days_past_retention_are_removed(tmp_path):
+    for name in ['audit-20000101-1-001.jsonl', 'index-20000101-1.jsonl', 'notes.txt']:
+        (tmp_path / name).write_text('')
+    log = AuditLog(audit_dir=str(tmp_path), flush_interval=0.01, retention_days=30)
+    log.log('login', user='a')
+    log.flush()
+    names = os.listdir(tmp_path)
+    assert 'audit-20000101-1-001.jsonl' not in names and 'index-20000101-1.jsonl' not in names
+    assert 'notes.txt' in names
+    assert [e['user'] for e in log.query()] == ['a']
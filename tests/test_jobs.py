@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import threading
+import time
+
+from jobs import SCHEMA, JobScheduler
+
+
+def _wait(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _scheduler(tmp_path, jobs=None, **kwargs):
+    jobs = jobs or {'count': {'run': lambda data: data['value'], 'priority': 1, 'interval': None}}
+    return JobScheduler(jobs=jobs, jobs_dir=str(tmp_path), workers=1, **kwargs)
+
+
+def test_results_follow_the_data_version(tmp_path):
+    scheduler = _scheduler(tmp_path, tick=3600).start()
+    scheduler.set_data({'version': 'v1', 'value': 1})
+    _wait(lambda: scheduler.result('count') == 1)
+
+    scheduler.set_data({'version': 'v2', 'value': 2})
+    assert scheduler.result('count') in (None, 2)
+    _wait(lambda: scheduler.result('count') == 2)
+    scheduler.stop()
+
+
+def test_start_abandons_rows_left_with_a_reused_pid(tmp_path):
+    with sqlite3.connect(os.path.join(tmp_path, 'jobs.db')) as db:
+        db.executescript(SCHEMA)
+        db.execute("INSERT INTO jobs (name, version, priority, status, trigger, pid, enqueued) "
+                   "VALUES ('count', 'v1', 1, 'queued', 'startup', ?, 0)", (os.getpid(),))
+    scheduler = _scheduler(tmp_path, tick=3600).start()
+    assert scheduler.status()[0]['status'] == 'abandoned'
+
+    scheduler.set_data({'version': 'v1', 'value': 1})
+    _wait(lambda: scheduler.result('count') == 1)
+    scheduler.stop()
+
+
+def test_job_queued_for_a_replaced_version_is_superseded(tmp_path):
+    release = threading.Event()
+    jobs = {
+        'slow': {'run': lambda data: release.wait(10), 'priority': 1, 'interval': None},
+        'count': {'run': lambda data: data['value'], 'priority': 2, 'interval': None},
+    }
+    scheduler = _scheduler(tmp_path, jobs=jobs, tick=3600).start()
+    scheduler.set_data({'version': 'v1', 'value': 1})
+    _wait(lambda: any(job['status'] == 'running' for job in scheduler.status()))
+    scheduler.set_data({'version': 'v2', 'value': 2})
+    release.set()
+    _wait(lambda: scheduler.result('count') == 2)
+
+    statuses = {(job['name'], job['version']): job['status'] for job in scheduler.status()}
+    assert statuses[('count', 'v1')] == 'superseded'
+    assert statuses[('slow', 'v1')] == 'done'
+    scheduler.stop()
+
+
+def test_old_versions_and_their_results_are_pruned(tmp_path):
+    scheduler = _scheduler(tmp_path, tick=0.05, keep_versions=1).start()
+    for value, version in enumerate(['v1', 'v2', 'v3']):
+        scheduler.set_data({'version': version, 'value': value})
+        _wait(lambda: scheduler.result('count') == value)
+
+    _wait(lambda: {job['version'] for job in scheduler.status()} == {'v3'})
+    _wait(lambda: len(os.listdir(os.path.join(tmp_path, 'results'))) == 1)
+    assert scheduler.result('count') == 2
+    scheduler.stop()
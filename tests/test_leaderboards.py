@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from leaderboards import LeaderboardIndex
+from validation import validate_table
+
+METRIC = 'Teaching_Score_Internal'
+SUBJECTS = ['Math', 'Science', 'English']
+TEACHERS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'teachers.csv')
+
+
+def _row(rng, teacher_id):
+    # Coarse scores so that ties are common
+    return {'Teacher_ID': teacher_id, 'Subject': rng.choice(SUBJECTS),
+            METRIC: float(rng.integers(0, 6))}
+
+
+def _expected(rows, k, subject=None):
+    frame = pd.DataFrame(list(rows.values()))
+    if subject is not None:
+        frame = frame[frame['Subject'] == subject]
+    frame = frame.sort_values([METRIC, 'Teacher_ID'], ascending=[False, True])
+    return list(frame['Teacher_ID'].head(k))
+
+
+def _frame(rows):
+    return pd.DataFrame(list(rows.values()), columns=['Teacher_ID', 'Subject', METRIC])
+
+
+def _index(rows, k):
+    groups = {'all': None, 'subject': 'Subject'}
+    return LeaderboardIndex(_frame(rows), k=k, metrics=[METRIC], groups=groups)
+
+
+def _assert_matches(index, rows, k):
+    assert index.top_ids(METRIC) == _expected(rows, k)
+    for subject in SUBJECTS:
+        assert index.top_ids(METRIC, 'subject', subject) == _expected(rows, k, subject)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_updates_match_a_full_sort(seed):
+    rng = np.random.default_rng(seed)
+    k = 4
+    rows = {f'T{i:03d}': _row(rng, f'T{i:03d}') for i in range(30)}
+    index = _index(rows, k)
+    _assert_matches(index, rows, k)
+
+    for _ in range(300):
+        for _ in range(rng.integers(1, 4)):
+            teacher_id = f'T{rng.integers(0, 40):03d}'
+            if teacher_id in rows and rng.random() < 0.3:
+                del rows[teacher_id]
+            else:
+                rows[teacher_id] = _row(rng, teacher_id)
+        index.refresh(_frame(rows))
+        _assert_matches(index, rows, k)
+
+
+def test_ties_keep_the_lowest_teacher_id():
+    rows = {tid: {'Teacher_ID': tid, 'Subject': 'Math', METRIC: 5.0}
+            for tid in ['T002', 'T004']}
+    index = _index(rows, k=2)
+    for tid in ['T003', 'T001']:
+        rows[tid] = {'Teacher_ID': tid, 'Subject': 'Math', METRIC: 5.0}
+        index.refresh(_frame(rows))
+    assert index.top_ids(METRIC) == ['T001', 'T002']
+
+
+def test_refresh_applies_changed_rows():
+    teachers, _, _ = validate_table('teachers', pd.read_csv(TEACHERS_CSV), {})
+    index = LeaderboardIndex(teachers)
+    assert index.refresh(teachers) == 0
+    assert index.refresh(teachers.copy()) == 0
+
+    teachers = teachers.copy()
+    best = index.top_ids(METRIC)[0]
+    teachers.loc[teachers['Teacher_ID'] == best, METRIC] = 0.0
+    teachers = teachers[teachers['Teacher_ID'] != index.top_ids(METRIC)[1]]
+    assert index.refresh(teachers) == 2
+    assert index.top_ids(METRIC) == list(
+        teachers.sort_values([METRIC, 'Teacher_ID'], ascending=[False, True])['Teacher_ID'].head(10))
+    for status in index.group_values('status'):
+        expected = teachers[teachers['Status'] == status].sort_values(
+            [METRIC, 'Teacher_ID'], ascending=[False, True])['Teacher_ID'].head(10)
+        assert index.top_ids(METRIC, 'status', status) == list(expected)
+    assert list(index.top_frame(METRIC, n=3)['Teacher_ID']) == index.top_ids(METRIC, n=3)
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from session_manager import MB, SessionResourceManager
+
+
+def _manager():
+    return SessionResourceManager(session_budget=MB, global_budget=10 * MB, idle_timeout=60)
+
+
+def test_shared_frame_is_not_charged_to_the_session():
+    manager = _manager()
+    teachers = manager.register_shared('teachers', pd.DataFrame({'x': range(1000)}))
+    assert manager.get_or_compute('s1', 'unfiltered', lambda: teachers) is teachers
+    assert manager.usage()['derived_bytes'] == 0
+    assert manager.usage()['shared_bytes'] > 0
+
+
+def test_only_budget_drops_count_as_evictions():
+    manager = _manager()
+    for key in range(3):
+        manager.get_or_compute('s1', key, lambda: bytes(400 * 1024))
+    assert manager.usage()['evictions'] == 1
+
+    manager.get_or_compute('s2', 'export', lambda: bytes(1024))
+    manager.release('s1')
+    manager.release('s2')
+    assert manager.usage()['evictions'] == 1
+    assert manager.usage()['derived_bytes'] == 0
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import FixedBinHistogram, KLLSketch, ScoreSketch, ScoreSketchIndex
+
+# Documented normalized rank error for k=200 (sketches.py module docstring)
+RANK_ERROR = 0.017
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def _max_rank_error(sketch, values):
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(QUANTILES)
+    true_ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return float(np.max(np.abs(true_ranks - QUANTILES)))
+
+
+def _scores(seed, n):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(65, 15, n), 0, 100).round(2)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_kll_rank_error_within_documented_bound(seed):
+    values = _scores(seed, 200_000)
+    sketch = KLLSketch(k=200, seed=seed).update(values)
+    assert sketch.count == len(values)
+    assert _max_rank_error(sketch, values) <= RANK_ERROR
+
+
+def test_kll_exact_below_k():
+    values = _scores(1, 150)
+    sketch = KLLSketch(k=200).update(values)
+    ordered = np.sort(values)
+    for q in QUANTILES:
+        assert sketch.quantile(q) == ordered[int(np.ceil(q * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_kll_merge_matches_single_stream(seed):
+    values = _scores(seed, 200_000)
+    single = KLLSketch(k=200, seed=seed).update(values)
+
+    merged = KLLSketch(k=200, seed=seed)
+    for i, part in enumerate(np.array_split(values, 37)):
+        merged.merge(KLLSketch(k=200, seed=seed + i).update(part))
+
+    assert merged.count == single.count == len(values)
+    assert _max_rank_error(merged, values) <= RANK_ERROR
+    # Both estimate the same ranks, so they stay within twice the bound of each other
+    grid = np.linspace(0, 100, 201)
+    assert max(abs(merged.rank(x) - single.rank(x)) for x in grid) <= 2 * RANK_ERROR
+
+
+def test_histogram_band_counts_are_exact():
+    values = np.random.default_rng(3).integers(0, 101, 50_000).astype(float)
+    histogram = FixedBinHistogram().update(values)
+    for start in range(0, 101, 7):
+        for stop in range(start, 102, 11):
+            assert histogram.count_between(start, stop) == int(((values >= start) & (values < stop)).sum())
+
+
+def test_histogram_merge_is_exact():
+    values = np.random.default_rng(4).integers(0, 101, 20_000).astype(float)
+    merged = FixedBinHistogram()
+    for part in np.array_split(values, 9):
+        merged.merge(FixedBinHistogram().update(part))
+    assert np.array_equal(merged.counts, FixedBinHistogram().update(values).counts)
+    with pytest.raises(ValueError):
+        merged.merge(FixedBinHistogram(width=5))
+
+
+def test_score_sketch_moments_are_exact_after_merge():
+    values = _scores(5, 10_000)
+    merged = ScoreSketch()
+    for part in np.array_split(values, 13):
+        merged.merge(ScoreSketch().update(part))
+    assert merged.count == len(values)
+    assert merged.total == pytest.approx(values.sum())
+    assert merged.mean == pytest.approx(values.mean())
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_index_query_matches_filtered_rows():
+    rng = np.random.default_rng(6)
+    frame = pd.DataFrame({
+        'Score': rng.integers(0, 101, 5_000).astype(float),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, 5_000), unit='D'),
+        'Section': rng.choice(list('ABCD'), 5_000),
+    })
+    index = ScoreSketchIndex({'section': 'Section'})
+    for lo in range(0, len(frame), 1_250):
+        index.ingest(frame.iloc[lo:lo + 1_250])
+
+    sketch = index.query('section', 'B', start='2024-01-10', end='2024-02-10')
+    rows = frame[(frame['Section'] == 'B') & frame['Date'].between('2024-01-10', '2024-02-10')]
+    assert sketch.count == len(rows)
+    assert sketch.histogram.count_between(50, 80) == int(rows['Score'].between(50, 79).sum())
+    assert index.query().count == len(frame)
+
+
+def test_rollups_match_day_sketches_and_cache_until_ingest():
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({
+        'Score': rng.integers(0, 101, 20_000).astype(float),
+        'Date': pd.Timestamp('2023-11-15') + pd.to_timedelta(rng.integers(0, 200, 20_000), unit='D'),
+        'Section': rng.choice(list('AB'), 20_000),
+    })
+    index = ScoreSketchIndex({'section': 'Section'}).ingest(frame)
+
+    for start, end in [(None, None), ('2023-12-01', '2024-02-29'), ('2023-12-10', '2024-03-05'),
+                       (None, '2024-01-20'), ('2024-02-01', None)]:
+        rows = frame[frame['Section'] == 'A']
+        if start is not None:
+            rows = rows[rows['Date'] >= start]
+        if end is not None:
+            rows = rows[rows['Date'] <= end]
+        sketch = index.query('section', 'A', start, end)
+        assert sketch.count == len(rows)
+        assert np.array_equal(sketch.histogram.counts,
+                              FixedBinHistogram().update(rows['Score'].to_numpy()).counts)
+
+    cached = index.query('section', start='2024-01-01', end='2024-01-31')
+    assert index.query('section', start='2024-01-01', end='2024-01-31') is cached
+    index.ingest(frame.head(100))
+    assert index.query('section', start='2024-01-01', end='2024-01-31') is not cached
+    assert index.query().count == len(frame) + 100
+
+
+def test_index_rebuilt_from_arrays_answers_the_same_queries(tmp_path):
+    rng = np.random.default_rng(8)
+    frame = pd.DataFrame({
+        'Score': rng.integers(0, 101, 20_000).astype(float),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, 20_000), unit='D'),
+        'Section': rng.choice(list('ABC'), 20_000),
+    })
+    index = ScoreSketchIndex({'section': 'Section'}).ingest(frame)
+    keys, arrays = index.to_arrays()
+    for name, values in arrays.items():
+        np.save(tmp_path / f'{name}.npy', values)
+    mapped = {name: np.load(tmp_path / f'{name}.npy', mmap_mode='r') for name in arrays}
+    shared = ScoreSketchIndex.from_arrays({'section': 'Section'}, keys, mapped)
+
+    assert shared.values('section') == index.values('section')
+    for group, value, start, end in [('all', None, None, None), ('section', 'B', None, None),
+                                     ('section', None, '2024-01-10', '2024-02-20')]:
+        expected, actual = index.query(group, value, start, end), shared.query(group, value, start, end)
+        assert (actual.count, actual.total) == (expected.count, expected.total)
+        assert np.array_equal(actual.histogram.counts, expected.histogram.counts)
+        assert np.array_equal(actual.kll.quantiles(QUANTILES), expected.kll.quantiles(QUANTILES))
+    with pytest.raises(ValueError):
+        shared.query('section', 'A').histogram.update([50.0])
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from validation import validate_table
+
+
+def _teachers(**columns):
+    rows = {'Teacher_ID': ['T1', 'T2', 'T3'], 'Teacher_Name': ['A', 'B', 'C'], 'Status': ['Active'] * 3}
+    return pd.DataFrame({**rows, **columns})
+
+
+def test_missing_scores_are_filled_with_the_median():
+    df = _teachers(Teaching_Score_Internal=[60.0, None, 80.0])
+    clean, _, report = validate_table('teachers', df, {})
+    assert clean['Teaching_Score_Internal'].tolist() == [60.0, 70.0, 80.0]
+    assert report['filled_defaults']['Teaching_Score_Internal'] == 1
+
+
+def test_fractional_counts_are_quarantined():
+    df = _teachers(Late_Count_Current_Month=[1, 2.5, None])
+    clean, quarantine, report = validate_table('teachers', df, {})
+    assert clean['Late_Count_Current_Month'].tolist() == [1, 0]
+    assert quarantine['Teacher_ID'].tolist() == ['T2']
+    assert report['issues'] == {'Late_Count_Current_Month: not a whole number': 1}
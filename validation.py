@@ -0,0 +1,256 @@
+"""Schema-driven validation and cleaning of the CSV tables at ingest.
+
+Each table is checked once with vectorized column passes. Rows that fail a
+hard check (missing required value, unparseable date or number, fraction in
+an integer column, value out of range, unknown category, duplicate key,
+unknown referenced ID) are moved to a quarantine file with the reasons.
+Missing optional values are filled with the column default ('median' fills
+with the median of the column's valid values), so rendering code can format
+every value without guards.
+
+Outputs (written by write_outputs):
+    quarantine/<table>.csv         rejected rows plus a _reason column
+    quarantine/validation_report.json
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_loader import OUTPUT_DIR, normalize_ids, read_tables
+
+QUARANTINE_DIR = os.path.join(OUTPUT_DIR, 'quarantine')
+
+STATUS_VALUES = ['Active', 'At Risk', 'Left']
+
+STAFF_ROLES = ['Department Head', 'Section Coordinator']
+
+
+def _score(required=False):
+    # 0 would read as a failing score and drag down every mean
+    return {'type': 'float', 'range': (0, 100), 'required': required, 'fill': 'median'}
+
+
+def _rating():
+    # 0 would be outside the 1-5 scale and drag down stakeholder means
+    return {'type': 'float', 'range': (1, 5), 'required': False, 'fill': 'median'}
+
+
+def _count(kind='int'):
+    return {'type': kind, 'range': (0, None), 'required': False, 'fill': 0}
+
+
+def _text(required=False, fill='N/A'):
+    return {'type': 'str', 'required': required, 'fill': fill}
+
+
+SCHEMAS = {
+    'teachers': {
+        'key': 'Teacher_ID',
+        'columns': {
+            'Teacher_ID': {'type': 'id', 'pattern': r'^T\d+$', 'required': True},
+            'Teacher_Name': _text(required=True),
+            'Date_of_Birth': {'type': 'date', 'required': False, 'fill': 'N/A'},
+            'Qualification': _text(),
+            'Subject': _text(),
+            'Experience_Current_School_Years': _count(),
+            'Total_Experience_Years': _count(),
+            'Classes_Taught': _text(),
+            'Sections_Taught': _text(),
+            'Compliance_Score': {'type': 'float', 'range': (0, 10), 'required': False, 'fill': 0.0},
+            'Training_Hours_Completed': _count(),
+            'Assignment_Completion_Rate_%': _score(),
+            'Teaching_Score_Internal': _score(),
+            'Teaching_Score_External': _score(),
+            'Contribution_CoCurricular_%': _score(),
+            'Alignment_Head_Rating': _rating(),
+            'Alignment_Peer_Rating': _rating(),
+            'Alignment_Student_Rating': _rating(),
+            'Alignment_Parent_Rating': _rating(),
+            'Late_Count_Current_Month': _count(),
+            'Attrition_Risk_Score': {'type': 'float', 'range': (0, 5), 'required': False, 'fill': 0.0},
+            'Status': {'type': 'category', 'allowed': STATUS_VALUES, 'required': True},
+            'Avatar_URL': _text(fill=''),
+        },
+    },
+    'students': {
+        'key': 'Student_ID',
+        'columns': {
+            'Student_ID': {'type': 'id', 'pattern': r'^S\d+$', 'required': True},
+            'Student_Name': _text(required=True),
+            'Section': _text(required=True),
+            'Admission_Date': {'type': 'date', 'required': False, 'fill': 'N/A'},
+        },
+    },
+    'performance': {
+        'key': None,
+        'columns': {
+            'Student_ID': {'type': 'id', 'pattern': r'^S\d+$', 'required': True,
+                           'references': ('students', 'Student_ID')},
+            'Teacher_ID': {'type': 'id', 'pattern': r'^T\d+$', 'required': True,
+                           'references': ('teachers', 'Teacher_ID')},
+            'Date': {'type': 'date', 'required': True},
+            'Score': _score(required=True),
+            'Attendance': {'type': 'category', 'allowed': ['Present', 'Absent'], 'required': True},
+            'Late_Count': _count(),
+            'Status': {'type': 'category', 'allowed': ['Active', 'Left'], 'required': False, 'fill': 'Active'},
+        },
+    },
+    'credentials': {
+        'key': 'username',
+        'columns': {
+            'Teacher_ID': {'type': 'id', 'pattern': r'^T\d+$', 'required': True,
+                           'references': ('teachers', 'Teacher_ID')},
+            'username': _text(required=True),
+            'password': _text(required=True),
+        },
+    },
+    'staff': {
+        'key': 'username',
+        'columns': {
+            'username': _text(required=True),
+            'password': _text(required=True),
+            'Role': {'type': 'category', 'allowed': STAFF_ROLES, 'required': True},
+            'Scope': _text(required=True),
+        },
+    },
+}
+
+# Validation order so referenced tables are already clean
+TABLE_ORDER = ['teachers', 'students', 'performance', 'credentials']
+
+# ==================== CHECKS ====================
+
+def _is_blank(series):
+    return series.isna() | (series.astype(str).str.strip().isin(['', 'nan', 'NaN', 'None']))
+
+
+def validate_table(name, df, clean_tables):
+    """Validate one table, returning (clean_df, quarantine_df, table_report)"""
+    schema = SCHEMAS[name]
+    df = df.copy()
+    reasons = pd.Series('', index=df.index)
+    issues = {}
+    filled = {}
+
+    def flag(mask, message):
+        nonlocal reasons
+        count = int(mask.sum())
+        if count:
+            reasons = reasons.where(~mask, reasons + message + '; ')
+            issues[message] = count
+
+    missing_columns = [col for col in schema['columns'] if col not in df.columns]
+    for col in missing_columns:
+        df[col] = np.nan
+
+    for col, spec in schema['columns'].items():
+        kind = spec['type']
+        blank = _is_blank(df[col])
+
+        if kind in ('id', 'str', 'category'):
+            df[col] = df[col].where(blank, df[col].astype(str).str.strip())
+        if kind == 'id' and name == 'performance' and col == 'Student_ID' and 'students' in clean_tables:
+            df[col] = normalize_ids(df[col], clean_tables['students']['Student_ID'])
+
+        if kind in ('float', 'int'):
+            values = pd.to_numeric(df[col], errors='coerce')
+            flag(~blank & values.isna(), f"{col}: not a number")
+            lo, hi = spec.get('range', (None, None))
+            if lo is not None:
+                flag(values < lo, f"{col}: below {lo}")
+            if hi is not None:
+                flag(values > hi, f"{col}: above {hi}")
+            if kind == 'int':
+                flag(values % 1 > 0, f"{col}: not a whole number")
+            df[col] = values
+        elif kind == 'date':
+            parsed = pd.to_datetime(df[col], errors='coerce', format='ISO8601')
+            flag(~blank & parsed.isna(), f"{col}: invalid date")
+            df[col] = parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), df[col])
+        elif kind == 'id':
+            flag(~blank & ~df[col].astype(str).str.match(spec['pattern']), f"{col}: bad ID format")
+        elif kind == 'category':
+            flag(~blank & ~df[col].isin(spec['allowed']), f"{col}: unknown value")
+
+        if spec.get('required'):
+            flag(blank, f"{col}: missing")
+        elif blank.any() and 'fill' in spec:
+            filled[col] = int(blank.sum())
+            fill = spec['fill']
+            if fill == 'median':
+                lo, hi = spec['range']
+                fill = df[col][~blank].loc[lambda v: v.between(lo, hi)].median()
+                fill = (lo + hi) / 2 if pd.isna(fill) else fill
+            df[col] = df[col].where(~blank, fill)
+
+        if 'references' in spec:
+            ref_table, ref_col = spec['references']
+            if ref_table in clean_tables:
+                known = clean_tables[ref_table][ref_col]
+                flag(~blank & ~df[col].isin(known), f"{col}: unknown {ref_table} ID")
+
+    if schema['key']:
+        flag(df.duplicated(subset=[schema['key']], keep='first'), f"{schema['key']}: duplicate")
+
+    bad = reasons != ''
+    clean = df[~bad].reset_index(drop=True)
+    for col, spec in schema['columns'].items():
+        if spec['type'] == 'int':
+            clean[col] = clean[col].astype('int64')
+    quarantine = df[bad].assign(_reason=reasons[bad].str.rstrip('; '))
+
+    report = {
+        'rows_in': len(df),
+        'rows_clean': len(clean),
+        'rows_quarantined': int(bad.sum()),
+        'missing_columns': missing_columns,
+        'issues': issues,
+        'filled_defaults': filled,
+    }
+    return clean, quarantine, report
+
+
+def validate_tables(teachers_df, students_df, performance_df, teacher_credentials):
+    """Validate all tables, returning (clean tables tuple, quarantine dict, report dict)"""
+    raw = {
+        'teachers': teachers_df,
+        'students': students_df,
+        'performance': performance_df,
+        'credentials': teacher_credentials,
+    }
+    clean, quarantine = {}, {}
+    report = {'generated': datetime.now().isoformat(timespec='seconds'), 'tables': {}}
+    for name in TABLE_ORDER:
+        clean[name], quarantine[name], report['tables'][name] = validate_table(name, raw[name], clean)
+    tables = tuple(clean[name] for name in ['teachers', 'students', 'performance', 'credentials'])
+    return tables, quarantine, report
+
+# ==================== OUTPUTS ====================
+
+def write_outputs(quarantine, report, out_dir=QUARANTINE_DIR):
+    """Write quarantined rows per table and the validation report"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, rows in quarantine.items():
+        path = os.path.join(out_dir, f'{name}.csv')
+        if len(rows) > 0:
+            rows.to_csv(path, index=False)
+        elif os.path.exists(path):
+            os.remove(path)
+    with open(os.path.join(out_dir, 'validation_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_clean_tables(out_dir=QUARANTINE_DIR):
+    """Read, validate and clean all tables, writing the quarantine outputs"""
+    tables, quarantine, report = validate_tables(*read_tables())
+    write_outputs(quarantine, report, out_dir)
+    return tables, report
+
+
+if __name__ == '__main__':
+    _, summary = load_clean_tables()
+    for table, info in summary['tables'].items():
+        print(f"{table:<12} {info['rows_clean']:>8} clean  {info['rows_quarantined']:>6} quarantined  {info['issues']}")